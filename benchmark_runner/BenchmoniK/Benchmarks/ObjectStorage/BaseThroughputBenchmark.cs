@@ -6,6 +6,7 @@ using BenchmarkDotNet.Engines;
 using BenchmarkDotNet.Jobs;
 using BenchmoniK.Utils;
 using System.Collections.Concurrent; 
+using System.Diagnostics;
 
 namespace BenchmoniK.Benchmarks.ObjectStorage;
 
@@ -17,26 +18,35 @@ public class BaseThroughputBenchmark
     protected IObjectStorage[] _objectStorageClients = null!;
     protected byte[] _testData = null!;
     protected ConcurrentBag<byte[]> _objectIdsForDeletion = new ConcurrentBag<byte[]>();
-    protected List<Task> _tasks = new List<Task>();
+    // Started by the benchmark methods, each one completes with the task doing the work of a runner
+    protected List<Task<Task>> _tasks = new List<Task<Task>>();
+    // Latency of every operation of every runner task, printed at the end of each iteration
+    protected LatencyHistogram[] _latencies = Array.Empty<LatencyHistogram>();
 
     protected String adapterDllPath;
     
-    // ---
-    public static IEnumerable<(int, int)> TransferParameterSource => new[]
-    {
+    // --- Defaults, overridden by the "Benchmark" section of the config (see BenchmarkParameters)
+    public static IEnumerable<(int, int)> TransferParameterSource => BenchmarkParameters.GetPairs(
+        nameof(TransferParameters),
         // (65536, 1048576),    // 64KB download, 1MB upload
         // (1048576, 5242880)     // 1MB download, 5MB upload
         (1048576, 5242880)
-    };
+    );
+
+    public static IEnumerable<int> NumConcurrentRunnersSource =>
+        BenchmarkParameters.Get(nameof(NumConcurrentRunners), 5, 10);
+
+    public static IEnumerable<int> NumObjectsPerRunnerSource =>
+        BenchmarkParameters.Get(nameof(NumObjectsPerRunner), 20);
 
     [ParamsSource(nameof(TransferParameterSource))]
     public (int ChunkDownloadSize, int ChunkUploadSize) TransferParameters { get; set; }
     
     // Found out about this really late, might be useful: https://github.com/timcassell/ProtoBenchmarkHelpers  
-    [Params(5, 10)] 
+    [ParamsSource(nameof(NumConcurrentRunnersSource))]
     public int NumConcurrentRunners { get; set; }
     
-    [Params(20)]  // Each runner will work with this many objects
+    [ParamsSource(nameof(NumObjectsPerRunnerSource))]  // Each runner will work with this many objects
     public int NumObjectsPerRunner { get; set; }
     
     [IterationSetup(Target = nameof(AddObject))]
@@ -44,11 +54,12 @@ public class BaseThroughputBenchmark
     {
         _objectIdsForDeletion.Clear();
         _tasks.Clear();
+        _latencies = LatencyHistogram.ForRunners("AddOrUpdateAsync", NumConcurrentRunners);
         
         for (var runnerIndex = 0; runnerIndex < NumConcurrentRunners; runnerIndex++)
         {
             var clientIndex = runnerIndex; // Capture for closure
-            _tasks.Add(new Task(async () =>
+            _tasks.Add(new Task<Task>(async () =>
             {
                 var client = _objectStorageClients[clientIndex];
                 
@@ -56,12 +67,14 @@ public class BaseThroughputBenchmark
                 for (int objectIndex = 0; objectIndex < NumObjectsPerRunner; objectIndex++)
                 {
                     var chunks = CreateChunks(_testData, TransferParameters.ChunkUploadSize);
+                    var start = Stopwatch.GetTimestamp();
                     var result = await client.AddOrUpdateAsync(
                         new ObjectData { 
                             ResultId = Guid.NewGuid().ToString(), 
                             SessionId = $"throughput-session-runner-{clientIndex}" 
                         }, 
                         chunks);
+                    _latencies[clientIndex].RecordSince(start);
                     _objectIdsForDeletion.Add(result.id);
                 }
             }));
@@ -72,6 +85,7 @@ public class BaseThroughputBenchmark
     public void SetupGetObject()
     {
         _tasks.Clear();
+        _latencies = LatencyHistogram.ForRunners("GetValuesAsync", NumConcurrentRunners);
         
         // Pre-create objects for each runner
         var objectIdsByRunner = new List<byte[]>[NumConcurrentRunners];
@@ -104,17 +118,19 @@ public class BaseThroughputBenchmark
             var clientIndex = runnerIndex; // Capture for closure
             var objectIds = objectIdsByRunner[runnerIndex];
             
-            _tasks.Add(new Task(async () =>
+            _tasks.Add(new Task<Task>(async () =>
             {
                 var client = _objectStorageClients[clientIndex];
                 
                 foreach (var objectId in objectIds)
                 {
                     var bytes = new List<byte>();
+                    var start = Stopwatch.GetTimestamp();
                     await foreach (var chunk in client.GetValuesAsync(objectId, CancellationToken.None))
                     {
                         bytes.AddRange(chunk);
                     }
+                    _latencies[clientIndex].RecordSince(start);
         
                     // Validate to ensure we got the right data
                     if (bytes.Count != _testData.Length)
@@ -131,6 +147,8 @@ public class BaseThroughputBenchmark
     public void SetupDeleteObject()
     {
         _tasks.Clear();
+        // A single call deletes all the objects of a runner
+        _latencies = LatencyHistogram.ForRunners("TryDeleteAsync", NumConcurrentRunners);
         
         // Pre-create objects for each runner
         var objectIdsByRunner = new List<byte[]>[NumConcurrentRunners];
@@ -163,10 +181,12 @@ public class BaseThroughputBenchmark
             var clientIndex = runnerIndex; // Capture for closure
             var objectIds = objectIdsByRunner[runnerIndex];
             
-            _tasks.Add(new Task(async () => 
+            _tasks.Add(new Task<Task>(async () => 
             { 
                 var client = _objectStorageClients[clientIndex];
+                var start = Stopwatch.GetTimestamp();
                 await client.TryDeleteAsync(objectIds); 
+                _latencies[clientIndex].RecordSince(start);
             }));
         }
     }
@@ -175,6 +195,8 @@ public class BaseThroughputBenchmark
     public void SetupGetObjectSize()
     {
         _tasks.Clear();
+        // A single call gets the sizes of all the objects of a runner
+        _latencies = LatencyHistogram.ForRunners("GetSizesAsync", NumConcurrentRunners);
         
         // Pre-create objects for each runner
         var objectIdsByRunner = new List<byte[]>[NumConcurrentRunners];
@@ -207,10 +229,12 @@ public class BaseThroughputBenchmark
             var clientIndex = runnerIndex; // Capture for closure
             var objectIds = objectIdsByRunner[runnerIndex];
             
-            _tasks.Add(new Task(async () =>
+            _tasks.Add(new Task<Task>(async () =>
             {
                 var client = _objectStorageClients[clientIndex];
+                var start = Stopwatch.GetTimestamp();
                 var sizes = await client.GetSizesAsync(objectIds);
+                _latencies[clientIndex].RecordSince(start);
                 
                 // Validate all sizes
                 foreach (var objectId in objectIds)
@@ -229,6 +253,8 @@ public class BaseThroughputBenchmark
     [IterationCleanup]
     public void IterationCleanup()
     {
+        LatencyHistogram.Print(_latencies);
+        
         if (_objectIdsForDeletion.Any())
         {
             Task.Run(async () =>
@@ -246,14 +272,14 @@ public class BaseThroughputBenchmark
         Parallel.ForEach(_tasks, task =>
             task.Start()
         );
-        await Task.WhenAll(_tasks);
+        await Task.WhenAll(_tasks.Select(task => task.Unwrap()));
     }
 
     [Benchmark]
     public async Task GetObject()
     {
         Parallel.ForEach(_tasks, task => { task.Start(); });
-        await Task.WhenAll(_tasks);
+        await Task.WhenAll(_tasks.Select(task => task.Unwrap()));
     }
     
     [Benchmark]
@@ -261,14 +287,14 @@ public class BaseThroughputBenchmark
     {
         Parallel.ForEach(_tasks,
             task => task.Start());
-        await Task.WhenAll(_tasks);
+        await Task.WhenAll(_tasks.Select(task => task.Unwrap()));
     }
     
     [Benchmark]
     public async Task GetObjectSize()
     {
         Parallel.ForEach(_tasks, task => task.Start());
-        await Task.WhenAll(_tasks);
+        await Task.WhenAll(_tasks.Select(task => task.Unwrap()));
     }
 
     // Helper method to create memory chunks from byte array
@@ -10,7 +10,10 @@ namespace BenchmoniK.Benchmarks;
 public class RedisThroughputBenchmark: BaseThroughputBenchmark
 {
     // Object sizes to test
-    [Params(1024, 1048576, 2 * 10485760, 104857600)] // 1KB, 1MB, 20MB, 100MB
+    public static IEnumerable<int> ObjectSizeBytesSource =>
+        BenchmarkParameters.Get(nameof(ObjectSizeBytes), 1024, 1048576, 2 * 10485760, 104857600); // 1KB, 1MB, 20MB, 100MB
+
+    [ParamsSource(nameof(ObjectSizeBytesSource))]
     public int ObjectSizeBytes { get; set; }
 
     IServiceProvider _serviceProvider;
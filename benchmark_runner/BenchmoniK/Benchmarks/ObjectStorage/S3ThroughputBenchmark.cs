@@ -18,11 +18,17 @@ namespace BenchmoniK.Benchmarks;
 public class S3ThroughputBenchmark : BaseThroughputBenchmark
 {
     // Parameters to test
-    [Params(4)] 
+    public static IEnumerable<int> DegreeOfParallelismSource =>
+        BenchmarkParameters.Get(nameof(DegreeOfParallelism), 4);
+
+    [ParamsSource(nameof(DegreeOfParallelismSource))]
     public int DegreeOfParallelism { get; set; }
 
     // Object sizes to test
-    [Params(1024, 1048576, 20971520)] // 1KB, 1MB, 20MB
+    public static IEnumerable<int> ObjectSizeBytesSource =>
+        BenchmarkParameters.Get(nameof(ObjectSizeBytes), 1024, 1048576, 20971520); // 1KB, 1MB, 20MB
+
+    [ParamsSource(nameof(ObjectSizeBytesSource))]
     public int ObjectSizeBytes { get; set; }
 
     IServiceProvider _serviceProvider;
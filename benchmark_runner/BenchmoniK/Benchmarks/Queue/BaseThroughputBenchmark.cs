@@ -6,6 +6,7 @@ using BenchmarkDotNet.Engines;
 using BenchmarkDotNet.Jobs;
 using BenchmoniK.Utils;
 using System.Collections.Concurrent;
+using System.Diagnostics;
 
 [MemoryDiagnoser]
 [SimpleJob(RunStrategy.Monitoring, RuntimeMoniker.Net10_0, launchCount: 1, warmupCount: 1, iterationCount: 5)]
@@ -19,21 +20,35 @@ public abstract class BaseThroughputBenchmark
     protected readonly ConcurrentBag<IQueueMessageHandler> _pulledMessages = new();
     protected readonly string _partitionName = "benchmonik";
 
+    // Latency of every push and pull call of every runner task, printed at the end of each iteration
+    protected LatencyHistogram[] _pushLatencies = Array.Empty<LatencyHistogram>();
+    protected LatencyHistogram[] _pullLatencies = Array.Empty<LatencyHistogram>();
+
+    // Defaults, overridden by the "Benchmark" section of the config (see BenchmarkParameters)
+    public static IEnumerable<int> MaxMessagesPerOperationSource =>
+        BenchmarkParameters.Get(nameof(MaxMessagesPerOperation), 1, 10);
+
+    public static IEnumerable<int> NumMessagesSource =>
+        BenchmarkParameters.Get(nameof(NumMessages), 100);
+
+    public static IEnumerable<int> NumConcurrentRunnersSource =>
+        BenchmarkParameters.Get(nameof(NumConcurrentRunners), 1, 5, 25, 50, 75); //100, 125, 150, 175, 200
+
     // Maximum messages to pull in a single operation
-    [Params(1, 10)]
-    // [Params(10)]
+    [ParamsSource(nameof(MaxMessagesPerOperationSource))]
     public int MaxMessagesPerOperation { get; set; }
 
-    [Params(100)]
+    [ParamsSource(nameof(NumMessagesSource))]
     public int NumMessages { get; set; }
     
-    [Params(1, 5, 25, 50, 75)] //100, 125, 150, 175, 200)] 
-    // [Params(10)] 
+    [ParamsSource(nameof(NumConcurrentRunnersSource))]
     public int NumConcurrentRunners { get; set; }
 
     [IterationSetup(Target = nameof(PullMessagesNack))]
     public void SetupPullMessagesNackAsync()
     {
+        ResetLatencies();
+        
         // Push messages for each runner using their dedicated client
         var pushTasks = new List<Task>();
         
@@ -56,11 +71,12 @@ public abstract class BaseThroughputBenchmark
         for (var runnerIdx = 0; runnerIdx < NumConcurrentRunners; runnerIdx++)
         {
             var pullQueue = _pullQueueClients[runnerIdx];
+            var pullLatencies = _pullLatencies[runnerIdx];
             var messagesToPull = NumMessages;
             
             pullTasks.Add(Task.Run(async () =>
             {
-                await PullMessagesInChunks(_partitionName,pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Cancelled);
+                await PullMessagesInChunks(_partitionName,pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Cancelled, pullLatencies);
             }));
         }
         
@@ -70,6 +86,8 @@ public abstract class BaseThroughputBenchmark
     [IterationSetup(Target = nameof(PullMessagesAck))]
     public void SetupPullMessagesAckAsync()
     {
+        ResetLatencies();
+        
         // Push messages for each runner using their dedicated client
         var pushTasks = new List<Task>();
         
@@ -92,11 +110,12 @@ public abstract class BaseThroughputBenchmark
         for (var runnerIdx = 0; runnerIdx < NumConcurrentRunners; runnerIdx++)
         {
             var pullQueue = _pullQueueClients[runnerIdx];
+            var pullLatencies = _pullLatencies[runnerIdx];
             var messagesToPull = NumMessages;
             
             pullTasks.Add(Task.Run(async () =>
             {
-                await PullMessagesInChunks(_partitionName,pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Processed);
+                await PullMessagesInChunks(_partitionName,pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Processed, pullLatencies);
             }));
         }
         
@@ -106,7 +125,7 @@ public abstract class BaseThroughputBenchmark
     [IterationSetup(Target = nameof(PushMessages))]
     public void SetupPushMessages()
     {
-        // No setup needed for push benchmark
+        ResetLatencies();
     }
 
     [Benchmark]
@@ -118,10 +137,11 @@ public abstract class BaseThroughputBenchmark
         {
             var messages = CreateMessages(runnerIdx, NumMessages);
             var pushQueue = _pushQueueClients[runnerIdx];
+            var pushLatencies = _pushLatencies[runnerIdx];
             
             pushTasks.Add(Task.Run(async () =>
             {
-                await PushMessagesInChunks(pushQueue, messages, _partitionName, MaxMessagesPerOperation);
+                await PushMessagesInChunks(pushQueue, messages, _partitionName, MaxMessagesPerOperation, pushLatencies);
             }));
         }
         
@@ -131,6 +151,8 @@ public abstract class BaseThroughputBenchmark
     [IterationCleanup(Target = nameof(PushMessages))]
     public void CleanupPushMessagesAsync()
     {
+        PrintLatencies();
+        
         // Clean up messages using the first available pull queue
         var pullQueue = _pullQueueClients[0];
         int totalMessagesToDelete = NumConcurrentRunners * NumMessages;
@@ -138,6 +160,23 @@ public abstract class BaseThroughputBenchmark
         PullMessagesInChunks(_partitionName, pullQueue, totalMessagesToDelete, MaxMessagesPerOperation, QueueMessageStatus.Cancelled).GetAwaiter().GetResult();
     }
 
+    [IterationCleanup]
+    public void IterationCleanup()
+    {
+        PrintLatencies();
+    }
+
+    private void ResetLatencies()
+    {
+        _pushLatencies = LatencyHistogram.ForRunners("PushMessagesAsync", NumConcurrentRunners);
+        _pullLatencies = LatencyHistogram.ForRunners("PullMessagesAsync", NumConcurrentRunners);
+    }
+
+    private void PrintLatencies()
+    {
+        LatencyHistogram.Print(_pushLatencies.Concat(_pullLatencies));
+    }
+
     private static IEnumerable<MessageData> CreateMessages(int runnerIdx, int messageCount)
     {
         return Enumerable.Range(0, messageCount).Select(msgIdx => new MessageData(
@@ -151,7 +190,8 @@ public abstract class BaseThroughputBenchmark
         IPushQueueStorage pushQueue,
         IEnumerable<MessageData> messages,
         string partitionName,
-        int maxMessagesPerPush)
+        int maxMessagesPerPush,
+        LatencyHistogram? latencies = null)
     {
         var messagesList = messages.ToList();
         int messagesPushed = 0;
@@ -162,7 +202,9 @@ public abstract class BaseThroughputBenchmark
             int messagesInThisChunk = Math.Min(maxMessagesPerPush, totalMessages - messagesPushed);
             var chunk = messagesList.Skip(messagesPushed).Take(messagesInThisChunk);
             
+            var start = Stopwatch.GetTimestamp();
             await pushQueue.PushMessagesAsync(chunk, partitionName);
+            latencies?.RecordSince(start);
             messagesPushed += messagesInThisChunk;
         }
     }
@@ -172,7 +214,8 @@ public abstract class BaseThroughputBenchmark
         IPullQueueStorage pullQueue, 
         int totalMessagesToPull, 
         int MaxMessagesPerOperation,
-        QueueMessageStatus status)
+        QueueMessageStatus status,
+        LatencyHistogram? latencies = null)
     {
         int messagesPulled = 0;
         var allHandlers = new List<IQueueMessageHandler>();
@@ -181,6 +224,7 @@ public abstract class BaseThroughputBenchmark
         {
             int messagesInThisChunk = Math.Min(MaxMessagesPerOperation, totalMessagesToPull - messagesPulled);
             var chunkHandlers = new List<IQueueMessageHandler>();
+            var start = Stopwatch.GetTimestamp();
             
             await foreach (var qmh in pullQueue.PullMessagesAsync(partitionName,messagesInThisChunk))
             {
@@ -191,6 +235,7 @@ public abstract class BaseThroughputBenchmark
                     break;
             }
             
+            latencies?.RecordSince(start);
             allHandlers.AddRange(chunkHandlers);
             
             // If we got fewer messages than requested, we've reached the end of the queue
@@ -211,7 +256,7 @@ public abstract class BaseThroughputBenchmark
 [IterationSetup(Target = nameof(PushThenPull))]
 public void SetupPushThenPull()
 {
-    // No setup needed - benchmark handles its own pushing
+    ResetLatencies();
 }
 
 [Benchmark]
@@ -224,10 +269,11 @@ public async Task PushThenPull()
     {
         var messages = CreateMessages(runnerIdx, NumMessages);
         var pushQueue = _pushQueueClients[runnerIdx];
+        var pushLatencies = _pushLatencies[runnerIdx];
         
         pushTasks.Add(Task.Run(async () =>
         {
-            await PushMessagesInChunks(pushQueue, messages, _partitionName, MaxMessagesPerOperation);
+            await PushMessagesInChunks(pushQueue, messages, _partitionName, MaxMessagesPerOperation, pushLatencies);
         }));
     }
     
@@ -239,11 +285,12 @@ public async Task PushThenPull()
     for (var runnerIdx = 0; runnerIdx < NumConcurrentRunners; runnerIdx++)
     {
         var pullQueue = _pullQueueClients[runnerIdx];
+        var pullLatencies = _pullLatencies[runnerIdx];
         var messagesToPull = NumMessages;
         
         pullTasks.Add(Task.Run(async () =>
         {
-            await PullMessagesInChunks(_partitionName, pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Processed);
+            await PullMessagesInChunks(_partitionName, pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Processed, pullLatencies);
         }));
     }
     
@@ -253,7 +300,7 @@ public async Task PushThenPull()
 [IterationSetup(Target = nameof(PushThenPullPerRunner))]
 public void SetupPushThenPullPerRunner()
 {
-    // No setup needed - benchmark handles its own pushing
+    ResetLatencies();
 }
 
 [Benchmark]
@@ -266,15 +313,17 @@ public async Task PushThenPullPerRunner()
         var messages = CreateMessages(runnerIdx, NumMessages);
         var pushQueue = _pushQueueClients[runnerIdx];
         var pullQueue = _pullQueueClients[runnerIdx];
+        var pushLatencies = _pushLatencies[runnerIdx];
+        var pullLatencies = _pullLatencies[runnerIdx];
         var messagesToPull = NumMessages;
         
         runnerTasks.Add(Task.Run(async () =>
         {
             // Push messages first
-            await PushMessagesInChunks(pushQueue, messages, _partitionName, MaxMessagesPerOperation);
+            await PushMessagesInChunks(pushQueue, messages, _partitionName, MaxMessagesPerOperation, pushLatencies);
             
             // Then pull the same number of messages
-            await PullMessagesInChunks(_partitionName, pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Processed);
+            await PullMessagesInChunks(_partitionName, pullQueue, messagesToPull, MaxMessagesPerOperation, QueueMessageStatus.Processed, pullLatencies);
         }));
     }
     
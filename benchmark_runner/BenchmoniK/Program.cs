@@ -4,6 +4,7 @@ using BenchmarkDotNet.Attributes;
 using BenchmarkDotNet.Running;
 using BenchmoniK.Benchmarks;
 using BenchmoniK.Benchmarks.Queue;
+using BenchmoniK.Utils;
 
 namespace BenchmoniK;
 
@@ -243,7 +244,7 @@ static void ExecuteBenchmark(string filePath)
                 var redisThroughputConfig =
                     BenchmarkConverter.TypeToBenchmarks(typeof(RedisThroughputBenchmark));
                 // BenchmarkRunner.Run(redisBenchmark);
-                BenchmarkRunner.Run(redisThroughputConfig);
+                BenchmarkRunner.Run(BenchmarkParameters.FilterCases(redisThroughputConfig));
                 break;
                 
             case "s3":
@@ -251,7 +252,7 @@ static void ExecuteBenchmark(string filePath)
                 var s3Benchmark = BenchmarkConverter.TypeToBenchmarks(typeof(S3Benchmark));
                 var s3ThroughputBenchmark = BenchmarkConverter.TypeToBenchmarks(typeof(S3ThroughputBenchmark));
                 // BenchmarkRunner.Run(s3Benchmark);
-                BenchmarkRunner.Run(s3ThroughputBenchmark);
+                BenchmarkRunner.Run(BenchmarkParameters.FilterCases(s3ThroughputBenchmark));
                 break;
             
             case "localstorage":
@@ -259,13 +260,13 @@ static void ExecuteBenchmark(string filePath)
                 var localStorageBenchmark = BenchmarkConverter.TypeToBenchmarks(typeof(LocalStorageBenchmark));
                 var localStorageThroughputBenchmark = BenchmarkConverter.TypeToBenchmarks(typeof(LocalStorageThroughputBenchmark));
                 // BenchmarkRunner.Run(localStorageBenchmark);
-                BenchmarkRunner.Run(localStorageThroughputBenchmark);
+                BenchmarkRunner.Run(BenchmarkParameters.FilterCases(localStorageThroughputBenchmark));
                 break;
             
             case "sqs":
                 Console.WriteLine("Starting SQS Queue benchmark...");
                 var sqsThroughputBenchmark = BenchmarkConverter.TypeToBenchmarks(typeof(SqsThroughputBenchmark));
-                BenchmarkRunner.Run(sqsThroughputBenchmark);
+                BenchmarkRunner.Run(BenchmarkParameters.FilterCases(sqsThroughputBenchmark));
                 break;
             
             case "rabbitmq":
@@ -273,7 +274,7 @@ static void ExecuteBenchmark(string filePath)
                 Console.WriteLine("Starting ActiveMQ Queue benchmark");
                 var activemqThroughputBenchmark =
                     BenchmarkConverter.TypeToBenchmarks(typeof(ActivemqThroughputBenchmark));
-                BenchmarkRunner.Run(activemqThroughputBenchmark);
+                BenchmarkRunner.Run(BenchmarkParameters.FilterCases(activemqThroughputBenchmark));
                 break;
             default:
                 throw new Exception($"Unknown component type: {component}");
@@ -0,0 +1,78 @@
+using BenchmarkDotNet.Running;
+using Microsoft.Extensions.Configuration;
+
+namespace BenchmoniK.Utils;
+
+/// <summary>
+/// Values of the benchmark parameters, read from the "Benchmark" section of the config file in BENCHMARK_CONFIG.
+/// The hard-coded values of a benchmark are used for the parameters the config does not list, e.g.:
+/// <code>
+/// "Benchmark": {
+///   "NumConcurrentRunners": [8, 16],
+///   "TransferParameters": [[1048576, 5242880]]
+/// }
+/// </code>
+/// "Cases" restricts a run to some benchmark cases, named like "AddObject(TransferParameters=(1048576, 5242880), NumConcurrentRunners=5)"
+/// </summary>
+public static class BenchmarkParameters
+{
+    public const string SectionName = "Benchmark";
+
+    // Read on every call: a BenchmoniK process runs several config files one after the other
+    private static IConfigurationSection GetSection(string name)
+    {
+        var configuration = ConfigUtils.LoadConfig(Environment.GetEnvironmentVariable("BENCHMARK_CONFIG") ?? "");
+        return configuration.GetSection($"{SectionName}:{name}");
+    }
+
+    /// <summary>
+    /// Gets the values of an integer parameter
+    /// </summary>
+    /// <param name="name">Name of the benchmark property (e.g., "NumConcurrentRunners")</param>
+    /// <param name="defaults">Values used when the config does not list any</param>
+    public static IEnumerable<int> Get(string name, params int[] defaults)
+    {
+        var values = GetSection(name).Get<int[]>();
+        return values is { Length: > 0 } ? values : defaults;
+    }
+
+    /// <summary>
+    /// Gets the values of a parameter made of two integers, listed as two-element arrays in the config
+    /// </summary>
+    /// <param name="name">Name of the benchmark property (e.g., "TransferParameters")</param>
+    /// <param name="defaults">Values used when the config does not list any</param>
+    public static IEnumerable<(int, int)> GetPairs(string name, params (int, int)[] defaults)
+    {
+        var values = GetSection(name).Get<int[][]>();
+        if (values is not { Length: > 0 })
+            return defaults;
+
+        return values.Select(pair => pair.Length == 2
+            ? (pair[0], pair[1])
+            : throw new InvalidOperationException(
+                $"Each value of {SectionName}:{name} must be a pair of integers, got [{string.Join(", ", pair)}]"));
+    }
+
+    /// <summary>
+    /// Name of a benchmark case, as the method and the parameters printed by BenchmarkDotNet
+    /// </summary>
+    public static string CaseName(BenchmarkCase benchmarkCase)
+    {
+        var parameters = benchmarkCase.Parameters.Items.Select(p => $"{p.Name}={p.ToDisplayText()}");
+        return $"{benchmarkCase.Descriptor.WorkloadMethod.Name}({string.Join(", ", parameters)})";
+    }
+
+    /// <summary>
+    /// Keeps only the benchmark cases listed in "Cases", if the config lists any
+    /// </summary>
+    public static BenchmarkRunInfo FilterCases(BenchmarkRunInfo runInfo)
+    {
+        var cases = GetSection("Cases").Get<string[]>();
+        if (cases is not { Length: > 0 })
+            return runInfo;
+
+        var selected = runInfo.BenchmarksCases.Where(c => cases.Contains(CaseName(c))).ToArray();
+        Console.WriteLine($"Running {selected.Length} of {runInfo.BenchmarksCases.Length} benchmark cases of {runInfo.Type.Name}");
+        return new BenchmarkRunInfo(selected, runInfo.Type, runInfo.Config);
+    }
+}
@@ -0,0 +1,87 @@
+using System.Diagnostics;
+using System.Numerics;
+
+namespace BenchmoniK.Utils;
+
+/// <summary>
+/// Log-linear histogram of the latencies of one operation of one runner task, in nanoseconds, like HdrHistogram.
+/// Values below 2^(SubBucketBits + 1) get their own bucket, larger values share buckets whose width is at most
+/// 2^-SubBucketBits (0.8 %) of their value. The bucket of a value only depends on SubBucketBits, so histograms are
+/// merged losslessly by adding the counts of their buckets.
+/// Recording is not thread-safe: every runner task has its own histograms.
+/// </summary>
+public class LatencyHistogram
+{
+    public const int SubBucketBits = 7;
+    private const int SubBucketCount = 1 << SubBucketBits;
+
+    // Printed once per runner task and operation at the end of every iteration, and parsed from the output, e.g.
+    // // LatencyHistogram: operation=AddOrUpdateAsync runner=3 bits=7 counts=23011:1,15:2,7:1
+    public const string LinePrefix = "// LatencyHistogram:";
+
+    private readonly Dictionary<int, long> _counts = new();
+
+    public string Operation { get; }
+    public int Runner { get; }
+
+    public LatencyHistogram(string operation, int runner)
+    {
+        Operation = operation;
+        Runner = runner;
+    }
+
+    /// <summary>
+    /// Creates one histogram per runner task
+    /// </summary>
+    public static LatencyHistogram[] ForRunners(string operation, int numRunners)
+    {
+        return Enumerable.Range(0, numRunners).Select(runner => new LatencyHistogram(operation, runner)).ToArray();
+    }
+
+    public static int BucketIndex(long nanoseconds)
+    {
+        var value = (ulong)Math.Max(nanoseconds, 0);
+        var shift = Math.Max(0, 64 - BitOperations.LeadingZeroCount(value) - (SubBucketBits + 1));
+        return shift * SubBucketCount + (int)(value >> shift);
+    }
+
+    public void Record(long nanoseconds)
+    {
+        var index = BucketIndex(nanoseconds);
+        _counts[index] = _counts.GetValueOrDefault(index) + 1;
+    }
+
+    /// <summary>
+    /// Records the time elapsed since a Stopwatch.GetTimestamp() value
+    /// </summary>
+    public void RecordSince(long startTimestamp)
+    {
+        Record((long)((Stopwatch.GetTimestamp() - startTimestamp) * (1e9 / Stopwatch.Frequency)));
+    }
+
+    /// <summary>
+    /// Output line of the histogram: the non-empty buckets as "index delta:count" pairs, by increasing index
+    /// </summary>
+    public string ToLine()
+    {
+        var previous = 0;
+        var counts = _counts.OrderBy(bucket => bucket.Key).Select(bucket =>
+        {
+            var delta = bucket.Key - previous;
+            previous = bucket.Key;
+            return $"{delta}:{bucket.Value}";
+        });
+        return $"{LinePrefix} operation={Operation} runner={Runner} bits={SubBucketBits} counts={string.Join(",", counts)}";
+    }
+
+    /// <summary>
+    /// Prints the histograms that recorded something
+    /// </summary>
+    public static void Print(IEnumerable<LatencyHistogram> histograms)
+    {
+        foreach (var histogram in histograms.Where(h => h._counts.Count > 0))
+        {
+            Console.WriteLine(histogram.ToLine());
+        }
+    }
+}
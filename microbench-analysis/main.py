@@ -1,6 +1,689 @@
-def main():
-    print("Hello from microbench-analysis!")
+from pathlib import Path
+
+import json
+import sys
+
+import click
+import pyarrow.parquet as pq
+
+from microbench_analysis.calibration import (
+    calibration_scores,
+    degraded_metrics,
+    fingerprint_differences,
+    study_calibrations,
+)
+from microbench_analysis.compare import compare_samples
+from microbench_analysis.dashboard import build_dashboard, run_aggregates
+from microbench_analysis.history import update_change_points, update_history
+from microbench_analysis.host_metrics import align_study
+from microbench_analysis.ingest import ingest
+from microbench_analysis.latency import latency_summary, load_latencies
+from microbench_analysis.measurements import load_samples
+from microbench_analysis.remote import DEFAULT_PATTERNS, cat_study, fetch_study
+from microbench_analysis.scalability import MIN_CONCURRENCIES, fit_scalability, throughput_series
+
+
+@click.group()
+def cli():
+    """Analysis of ArmoniK.Microbench study results."""
+    pass
+
+
+@cli.command("ingest")
+@click.argument(
+    "results_dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "--study",
+    "studies",
+    multiple=True,
+    help="Only ingest these studies (default: every study in the results tree)",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Parquet file to write (default: <results_dir>/cases.parquet)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of the per-archive cache (default: <results_dir>/.cache/cases)",
+)
+@click.option(
+    "--jobs", "-j", type=click.IntRange(min=1), help="Number of parsing processes"
+)
+def ingest_command(
+    results_dir: Path,
+    studies: tuple,
+    output: Path | None,
+    cache_dir: Path | None,
+    jobs: int | None,
+):
+    """Ingest a synced results tree into a Parquet dataset with one row per benchmark case"""
+    output = output or results_dir / "cases.parquet"
+    cache_dir = cache_dir or results_dir / ".cache" / "cases"
+
+    failures = []
+
+    def on_progress(source, rows, cached, error):
+        if error is not None:
+            failures.append(source)
+            click.echo(f"{source.study}/run_{source.run_index}/{source.benchmark}: {error}", err=True)
+            return
+        state = "cached" if cached else "parsed"
+        click.echo(
+            f"{source.study}/run_{source.run_index}/{source.benchmark}: {rows} case(s) {state}"
+        )
+
+    table = ingest(results_dir, cache_dir, studies, jobs, on_progress)
+    pq.write_table(table, output)
+    click.echo(f"Wrote {table.num_rows} benchmark case(s) to {output}")
+    if failures:
+        raise click.ClickException(f"{len(failures)} source(s) could not be parsed")
+
+
+@cli.command("compare")
+@click.argument("baseline_study")
+@click.argument("candidate_study", required=False)
+@click.option(
+    "--results-dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    help="Synced results tree",
+)
+@click.option(
+    "--baseline-run",
+    type=int,
+    help="Run index of the baseline (default: every run of the baseline study)",
+)
+@click.option(
+    "--candidate-run",
+    type=int,
+    help="Run index of the candidate (default: every run of the candidate study)",
+)
+@click.option(
+    "--threshold",
+    default=0.05,
+    show_default=True,
+    help="Relative slowdown of the mean above which a significant change is a regression",
+)
+@click.option(
+    "--alpha", default=0.05, show_default=True, help="Significance level of the tests"
+)
+@click.option(
+    "--resamples", default=2000, show_default=True, help="Number of bootstrap resamples"
+)
+@click.option(
+    "--calibration-threshold",
+    default=0.2,
+    show_default=True,
+    help="Relative shortfall of a runner calibration metric, against the median of its hardware, above which the "
+    "runner is reported as degraded",
+)
+@click.option(
+    "--json",
+    "json_output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the full comparison to this JSON file",
+)
+def compare_command(
+    baseline_study: str,
+    candidate_study: str | None,
+    results_dir: Path,
+    baseline_run: int | None,
+    candidate_run: int | None,
+    threshold: float,
+    alpha: float,
+    resamples: int,
+    calibration_threshold: float,
+    json_output: Path | None,
+):
+    """Compare the time per operation of the cases of two runs or two studies
+
+    Exits with status 1 when a case is significantly slower in the candidate by more than the threshold. The runs
+    whose environment differs or whose runners were degraded when calibrated are reported on stderr.
+    """
+    candidate_study = candidate_study or baseline_study
+    try:
+        baseline = load_samples(results_dir / baseline_study, baseline_run)
+        candidate = load_samples(results_dir / candidate_study, candidate_run)
+        comparison = compare_samples(baseline, candidate, resamples=resamples)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    warn_calibrations(
+        results_dir,
+        (baseline_study, baseline_run),
+        (candidate_study, candidate_run),
+        calibration_threshold,
+    )
+
+    regressions = comparison.regressions(threshold, alpha)
+    improvements = comparison.improvements(threshold, alpha)
+    for i, case in enumerate(comparison.cases):
+        flag = "REGRESSION" if regressions[i] else "improved" if improvements[i] else ""
+        click.echo(
+            f"{comparison.change[i]:+8.1%} [{comparison.ci_low[i]:+7.1%}, {comparison.ci_high[i]:+7.1%}] "
+            f"p={comparison.p_value[i]:.3f} {flag:<10} {case}"
+        )
+    skipped = (baseline.keys() | candidate.keys()) - set(comparison.cases)
+    if skipped:
+        click.echo(f"{len(skipped)} case(s) only present on one side were skipped")
+
+    if json_output:
+        json_output.write_text(
+            json.dumps(
+                [
+                    {
+                        "case": case,
+                        "baseline_mean_ns": comparison.baseline_mean[i],
+                        "candidate_mean_ns": comparison.candidate_mean[i],
+                        "change": comparison.change[i],
+                        "ci_low": comparison.ci_low[i],
+                        "ci_high": comparison.ci_high[i],
+                        "p_value": comparison.p_value[i],
+                        "regression": bool(regressions[i]),
+                        "improvement": bool(improvements[i]),
+                    }
+                    for i, case in enumerate(comparison.cases)
+                ],
+                indent=2,
+            )
+        )
+
+    click.echo(
+        f"{len(comparison.cases)} case(s) compared: {regressions.sum()} regression(s), "
+        f"{improvements.sum()} improvement(s)"
+    )
+    if regressions.any():
+        raise SystemExit(1)
+
+
+def warn_calibrations(results_dir: Path, baseline: tuple, candidate: tuple, threshold: float):
+    """Report on stderr the environment differences and the degraded runners of the compared runs"""
+    selected = []
+    for study, run_index in (baseline, candidate):
+        study_file = results_dir / study / "study.json"
+        calibrations = []
+        if study_file.exists():
+            calibrations = study_calibrations(json.loads(study_file.read_text(encoding="utf-8")))
+        selected.append([c for c in calibrations if run_index is None or c.run_index == run_index])
+    if not all(selected):
+        click.echo("Warning: some compared runs have no runner calibration, they cannot be checked", err=True)
+        return
+
+    for key, (baseline_values, candidate_values) in fingerprint_differences(*selected).items():
+        click.echo(
+            f"Warning: {key} differs between the baseline ({', '.join(map(str, sorted(baseline_values, key=str)))}) "
+            f"and the candidate ({', '.join(map(str, sorted(candidate_values, key=str)))})",
+            err=True,
+        )
+    for calibration, metrics in degraded_metrics(selected[0] + selected[1], threshold):
+        click.echo(
+            f"Warning: runner {calibration.runner} of {calibration.study} run {calibration.run_index} was degraded: "
+            + ", ".join(f"{name} at {score:.0%} of the median" for name, score in metrics.items()),
+            err=True,
+        )
+
+
+@cli.command("calibration")
+@click.argument("studies", nargs=-1, required=True)
+@click.option(
+    "--results-dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    help="Synced results tree",
+)
+@click.option(
+    "--threshold",
+    default=0.2,
+    show_default=True,
+    help="Relative shortfall of a metric, against the median of the runners of the same hardware, above which a "
+    "runner is reported as degraded",
+)
+def calibration_command(studies: tuple, results_dir: Path, threshold: float):
+    """Score the runner calibrations of studies against the runners of the same hardware, and flag degraded runners
+
+    The calibrations of all the given studies are pooled, so that a run can be checked against the others.
+    Exits with status 1 when a runner is degraded.
+    """
+    calibrations = [
+        calibration
+        for study in studies
+        for calibration in study_calibrations(load_study_snapshot(results_dir, study))
+    ]
+    if not calibrations:
+        raise click.ClickException("No runner calibration found, run the studies with --calibrate")
+
+    names, scores = calibration_scores(calibrations)
+    for calibration, row in zip(calibrations, scores):
+        click.echo(f"{calibration.study} run {calibration.run_index} {calibration.runner} ({calibration.hardware})")
+        for name, score in zip(names, row):
+            if name in calibration.metrics:
+                value, _ = calibration.metrics[name]
+                flag = "DEGRADED" if score < 1 - threshold else ""
+                click.echo(f"    {name:<40} {value:12.2f} {score:6.0%} {flag}".rstrip())
+
+    degraded = degraded_metrics(calibrations, threshold)
+    click.echo(f"{len(calibrations)} runner calibration(s), {len(degraded)} degraded")
+    if degraded:
+        raise SystemExit(1)
+
+
+@cli.command("latency")
+@click.argument("study")
+@click.option(
+    "--results-dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    help="Synced results tree",
+)
+@click.option("--run", "run_index", type=int, help="Only use this run (default: every run of the study)")
+@click.option(
+    "--percentile",
+    "quantiles",
+    multiple=True,
+    type=click.FloatRange(0, 100),
+    default=(50, 90, 99, 99.9),
+    show_default=True,
+    help="Percentile to report. Can be given multiple times",
+)
+@click.option(
+    "--json",
+    "json_output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the percentiles to this JSON file",
+)
+def latency_command(
+    study: str, results_dir: Path, run_index: int | None, quantiles: tuple, json_output: Path | None
+):
+    """Report the latency percentiles of every operation of the throughput benchmarks of a study
+
+    The histograms of the runner tasks, measured iterations, launches and runs of each case are merged before the
+    percentiles are computed.
+    """
+    try:
+        summary = latency_summary(load_latencies(results_dir / study, run_index), list(quantiles))
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    if not summary:
+        raise click.ClickException(f"No latency histogram found in {results_dir / study}")
+
+    for row in summary:
+        values = " ".join(f"{name}={value / 1e6:.3f}" for name, value in row["percentiles_ns"].items())
+        click.echo(
+            f"{row['operation']:<18} n={row['count']:<7} {values} max={row['max_ns'] / 1e6:.3f} (ms) {row['case']}"
+        )
+    if json_output:
+        json_output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+@cli.command("metrics")
+@click.argument("study")
+@click.option(
+    "--results-dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    help="Synced results tree",
+)
+@click.option("--run", "run_index", type=int, help="Only align this run (default: every run)")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Parquet file to write (default: <results_dir>/<study>/iteration_metrics.parquet)",
+)
+def metrics_command(study: str, results_dir: Path, run_index: int | None, output: Path | None):
+    """Align the host metrics sampled on the runners with the measured iterations of a study"""
+    output = output or results_dir / study / "iteration_metrics.parquet"
+    try:
+        table, overheads = align_study(results_dir / study, run_index)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+    for benchmark, overhead in overheads.items():
+        click.echo(f"{benchmark}: sampler used {overhead:.2%} of one CPU")
+    if table.num_rows:
+        samples = table["samples"].to_numpy()
+        click.echo(
+            f"{(samples == 0).sum()} of {table.num_rows} iteration(s) were shorter than the sampling "
+            "interval and use the nearest sample"
+        )
+    pq.write_table(table, output)
+    click.echo(f"Wrote {table.num_rows} iteration(s) to {output}")
+
+
+def load_study_snapshot(results_dir: Path, study: str) -> dict:
+    study_file = results_dir / study / "study.json"
+    if not study_file.exists():
+        raise click.ClickException(
+            f"{study_file} not found, write it with 'microbenchmark.py study extract' or 'study sync'"
+        )
+    return json.loads(study_file.read_text(encoding="utf-8"))
+
+
+def archives_s3_client(study_data: dict, profile: str | None, endpoint_url: str | None):
+    """S3 client to read the archives of a study, None when they are all in a local artifact store"""
+    if not any(
+        b.get("results", "").startswith("s3://")
+        for run in study_data["runs"]
+        for b in run["benchmarks"].values()
+    ):
+        return None
+    try:
+        import boto3
+    except ImportError:
+        raise click.ClickException(
+            "Reading from S3 needs boto3: uv sync --project microbench-analysis --extra s3"
+        )
+    return boto3.Session(profile_name=profile).client("s3", endpoint_url=endpoint_url)
+
+
+# Options of the commands reading members of the results archives of a study
+ARCHIVE_OPTIONS = [
+    click.option(
+        "--results-dir",
+        default="./results",
+        type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+        help="Results tree holding the study.json snapshot of the study",
+    ),
+    click.option("--run", "run_index", type=int, help="Only read this run (default: every run)"),
+    click.option(
+        "--benchmark",
+        "benchmark_patterns",
+        multiple=True,
+        help="Only read the benchmarks whose name matches this glob. Can be given multiple times",
+    ),
+    click.option("--profile", envvar="AWS_PROFILE", help="AWS profile to use"),
+    click.option("--endpoint-url", envvar="AWS_ENDPOINT_URL", help="Custom S3 endpoint (e.g. a local MinIO)"),
+]
+
+
+def archive_options(command):
+    for option in reversed(ARCHIVE_OPTIONS):
+        command = option(command)
+    return command
+
+
+@cli.command("fetch")
+@click.argument("study")
+@click.option(
+    "--pattern",
+    "patterns",
+    multiple=True,
+    default=DEFAULT_PATTERNS,
+    show_default=True,
+    help="Glob of the archive members to extract. Can be given multiple times",
+)
+@archive_options
+def fetch_command(
+    study: str,
+    patterns: tuple,
+    results_dir: Path,
+    run_index: int | None,
+    benchmark_patterns: tuple,
+    profile: str | None,
+    endpoint_url: str | None,
+):
+    """Extract some files of the results archives of a study with ranged reads, instead of syncing whole archives"""
+    study_data = load_study_snapshot(results_dir, study)
+    s3 = archives_s3_client(study_data, profile, endpoint_url)
+
+    def on_archive(benchmark_dir, members, bytes_read, error):
+        if error is not None:
+            click.echo(f"{benchmark_dir.relative_to(results_dir)}: {error}", err=True)
+        else:
+            click.echo(f"{benchmark_dir.relative_to(results_dir)}: {members} file(s), {bytes_read / 1e3:.0f} kB read")
+
+    try:
+        stats = fetch_study(results_dir / study, s3, patterns, run_index, on_archive, benchmark_patterns)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Extracted {stats['members']} file(s) from {stats['archives'] - stats['failures']}/{stats['archives']} "
+        f"archive(s), reading {stats['read'] / 1e6:.1f} MB of {stats['size'] / 1e6:.1f} MB"
+    )
+    if stats["failures"]:
+        raise click.ClickException(f"{stats['failures']} archive(s) could not be read")
+
+
+@cli.command("cat")
+@click.argument("study")
+@click.argument("patterns", nargs=-1, required=True)
+@archive_options
+def cat_command(
+    study: str,
+    patterns: tuple,
+    results_dir: Path,
+    run_index: int | None,
+    benchmark_patterns: tuple,
+    profile: str | None,
+    endpoint_url: str | None,
+):
+    """Print the files of the results archives of a study matching glob patterns, without downloading the archives.
+
+    Each file is announced on stderr, so that stdout only holds the file contents.
+    """
+    study_data = load_study_snapshot(results_dir, study)
+    s3 = archives_s3_client(study_data, profile, endpoint_url)
+    try:
+        for path, contents in cat_study(study_data, patterns, s3, run_index, benchmark_patterns):
+            click.echo(f"==> {path} <==", err=True)
+            sys.stdout.buffer.write(contents)
+            sys.stdout.buffer.flush()
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command("dashboard")
+@click.argument(
+    "results_dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "--study",
+    "studies",
+    multiple=True,
+    help="Only include these studies (default: every study in the results tree)",
+)
+@click.option(
+    "--output-dir",
+    "-o",
+    default="./docs/dashboard",
+    show_default=True,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of the dashboard page and charts, published with the documentation",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of the per-archive and per-run caches (default: <results_dir>/.cache)",
+)
+@click.option(
+    "--jobs", "-j", type=click.IntRange(min=1), help="Number of parsing processes"
+)
+def dashboard_command(
+    results_dir: Path,
+    studies: tuple,
+    output_dir: Path,
+    cache_dir: Path | None,
+    jobs: int | None,
+):
+    """Generate a static performance dashboard (markdown and SVG charts) from a synced results tree"""
+    cache_dir = cache_dir or results_dir / ".cache"
+
+    def on_progress(source, rows, cached, error):
+        if error is not None:
+            click.echo(f"{source.study}/run_{source.run_index}/{source.benchmark}: {error}", err=True)
+
+    table = ingest(results_dir, cache_dir / "cases", studies, jobs, on_progress)
+    if not table.num_rows:
+        raise click.ClickException(f"No benchmark report found in {results_dir}")
+    aggregates, computed = run_aggregates(table, cache_dir / "dashboard")
+    page = build_dashboard(aggregates, output_dir)
+    click.echo(
+        f"Aggregated {computed} of {len(aggregates)} run(s) ({len(aggregates) - computed} cached), wrote {page}"
+    )
+
+
+@cli.command("history")
+@click.argument(
+    "results_dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "--history-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of the history of the cases across studies (default: <results_dir>/history)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of the per-archive and per-run caches (default: <results_dir>/.cache)",
+)
+@click.option(
+    "--min-size",
+    default=2,
+    show_default=True,
+    type=click.IntRange(min=2),
+    help="Studies a throughput level must last on both sides of a change point",
+)
+@click.option(
+    "--min-shift",
+    default=0.05,
+    show_default=True,
+    help="Smallest relative change of the throughput reported",
+)
+@click.option(
+    "--threshold",
+    default=4.0,
+    show_default=True,
+    help="t statistic of the shift above which a change point is significant",
+)
+@click.option(
+    "--json",
+    "json_output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the change points to this JSON file",
+)
+@click.option(
+    "--jobs", "-j", type=click.IntRange(min=1), help="Number of parsing processes"
+)
+def history_command(
+    results_dir: Path,
+    history_dir: Path | None,
+    cache_dir: Path | None,
+    min_size: int,
+    min_shift: float,
+    threshold: float,
+    json_output: Path | None,
+    jobs: int | None,
+):
+    """Add the studies of a results tree to the history of the cases, and report where their throughput shifted
+
+    Studies are ordered by ArmoniK.Core version. Only the studies added since the last call are examined for
+    new change points.
+    """
+    history_dir = history_dir or results_dir / "history"
+    cache_dir = cache_dir or results_dir / ".cache"
+
+    def on_progress(source, rows, cached, error):
+        if error is not None:
+            click.echo(f"{source.study}/run_{source.run_index}/{source.benchmark}: {error}", err=True)
+
+    table = ingest(results_dir, cache_dir / "cases", (), jobs, on_progress)
+    aggregates, _ = run_aggregates(table, cache_dir / "dashboard")
+    updated = update_history(aggregates, history_dir)
+    click.echo(f"Added or updated {len(updated)} stud{'y' if len(updated) == 1 else 'ies'} in {history_dir}")
+
+    change_points, reused = update_change_points(history_dir, min_size, min_shift, threshold)
+    if reused:
+        click.echo(f"Kept the change points found up to the first {reused} stud{'y' if reused == 1 else 'ies'}")
+    for point in change_points:
+        click.echo(f"{point.change:+8.1%} from {point.core_version or point.study:<12} t={point.t_stat:6.1f} {point.case}")
+    click.echo(f"{len(change_points)} change point(s)")
+
+    if json_output:
+        json_output.write_text(
+            json.dumps([vars(point) for point in change_points], indent=2), encoding="utf-8"
+        )
+
+
+@cli.command("scalability")
+@click.argument(
+    "results_dir",
+    default="./results",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "--study",
+    "studies",
+    multiple=True,
+    help="Only fit these studies (default: every study in the results tree)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of the per-archive and per-run caches (default: <results_dir>/.cache)",
+)
+@click.option(
+    "--json",
+    "json_output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the fits to this JSON file",
+)
+@click.option(
+    "--jobs", "-j", type=click.IntRange(min=1), help="Number of parsing processes"
+)
+def scalability_command(
+    results_dir: Path,
+    studies: tuple,
+    cache_dir: Path | None,
+    json_output: Path | None,
+    jobs: int | None,
+):
+    """Fit the Universal Scalability Law to the throughput of every case against NumConcurrentRunners
+
+    Reports the single-runner throughput λ, the contention σ, the coherency delay κ and the concurrency N* where
+    the throughput peaks, with their standard errors. Cases whose κ is not significant are fitted with Amdahl's law,
+    which has no peak.
+    """
+    cache_dir = cache_dir or results_dir / ".cache"
+
+    def on_progress(source, rows, cached, error):
+        if error is not None:
+            click.echo(f"{source.study}/run_{source.run_index}/{source.benchmark}: {error}", err=True)
+
+    table = ingest(results_dir, cache_dir / "cases", studies, jobs, on_progress)
+    if not table.num_rows:
+        raise click.ClickException(f"No benchmark report found in {results_dir}")
+    aggregates, _ = run_aggregates(table, cache_dir / "dashboard")
+    series = throughput_series(aggregates)
+    fits = fit_scalability(series)
+
+    for fit in fits:
+        study, component, benchmark_type, method, family = fit.series
+        click.echo(f"{study} {component}: {benchmark_type}.{method}({family}) [{fit.model}, {fit.points} points]")
+        click.echo(
+            f"  λ={fit.lambda_:.4g} items/s  σ={fit.sigma:.4f}±{fit.sigma_se:.4f}"
+            f"  κ={fit.kappa:.2e}±{fit.kappa_se:.1e}  relative RMSE={fit.relative_rmse:.1%}"
+        )
+        if fit.peak_concurrency is not None:
+            click.echo(
+                f"  peak at N*={fit.peak_concurrency:.1f}±{fit.peak_concurrency_se:.1f}"
+                f" runners, {fit.peak_throughput:.4g}±{fit.peak_throughput_se:.2g} items/s"
+            )
+        else:
+            click.echo(f"  no peak, throughput bound {fit.peak_throughput:.4g}±{fit.peak_throughput_se:.2g} items/s")
+    click.echo(f"Fitted {len(fits)} of {len(series)} series (at least {MIN_CONCURRENCIES} concurrencies needed)")
+
+    if json_output:
+        json_output.write_text(json.dumps([vars(fit) for fit in fits], indent=2), encoding="utf-8")
 
 
 if __name__ == "__main__":
-    main()
+    cli()
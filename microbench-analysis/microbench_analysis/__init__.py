@@ -0,0 +1 @@
+"""Analysis of ArmoniK.Microbench study results synced with `microbenchmark.py study sync`."""
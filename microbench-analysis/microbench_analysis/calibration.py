@@ -0,0 +1,123 @@
+"""Calibration of the runners, to flag the results taken on a degraded runner.
+
+With `--calibrate` (the default), `study run` and `study submit` record in every run entry the environment of each
+runner under `environment.<runner>`: a fingerprint (instance type, CPU, kernel, CPU governor, .NET SDK, ArmoniK.Core
+commit) and a short calibration of its CPU, disks and TCP round trips to the backends.
+
+A calibration metric is only meaningful relative to runners of the same hardware: every metric is scored against
+the median of the runner calibrations sharing its hardware (instance type, or CPU model and count off EC2), 1 being
+the median and lower being worse.
+"""
+
+from dataclasses import dataclass
+import warnings
+
+import numpy as np
+
+# Fingerprint entries that make two runs not directly comparable
+FINGERPRINT_KEYS = ("instance_type", "cpu_model", "cpus", "kernel", "cpu_governor", "dotnet_sdk")
+
+
+@dataclass
+class RunnerCalibration:
+    """Calibration of one runner in one study run"""
+
+    study: str
+    run_index: int
+    runner: str
+    hardware: str
+    fingerprint: dict
+    # Metric name -> (value, higher is better)
+    metrics: dict[str, tuple[float, bool]]
+
+
+def hardware_key(fingerprint: dict) -> str:
+    return fingerprint.get("instance_type") or f"{fingerprint.get('cpu_model')} x{fingerprint.get('cpus')}"
+
+
+def calibration_metrics(environment: dict) -> dict[str, tuple[float, bool]]:
+    """Metrics of a runner calibration, by name, with whether higher is better"""
+    metrics = {
+        "sha256_mb_s": (environment["cpu"]["sha256_mb_s"], True),
+        "loop_mops": (environment["cpu"]["loop_mops"], True),
+    }
+    for disk in environment.get("disks", []):
+        if "error" not in disk:
+            metrics[f"{disk['path']} write_mb_s"] = (disk["write_mb_s"], True)
+            metrics[f"{disk['path']} read_mb_s"] = (disk["read_mb_s"], True)
+            metrics[f"{disk['path']} fsync_ms"] = (disk["fsync_ms"], False)
+    for endpoint in environment.get("endpoints", []):
+        if "error" not in endpoint:
+            metrics[f"{endpoint['component']} connect_ms"] = (endpoint["connect_ms"], False)
+    return metrics
+
+
+def study_calibrations(study_data: dict) -> list[RunnerCalibration]:
+    """Calibrations of every runner of every run of a study snapshot (`study.json`)"""
+    calibrations = []
+    for run_index, run in enumerate(study_data.get("runs", [])):
+        for runner, environment in run.get("environment", {}).items():
+            calibrations.append(
+                RunnerCalibration(
+                    study=study_data.get("name"),
+                    run_index=run_index,
+                    runner=runner,
+                    hardware=hardware_key(environment["fingerprint"]),
+                    fingerprint=environment["fingerprint"],
+                    metrics=calibration_metrics(environment),
+                )
+            )
+    return calibrations
+
+
+def calibration_scores(calibrations: list[RunnerCalibration]) -> tuple[list[str], np.ndarray]:
+    """Score of every metric of every calibration relative to the median of its hardware group.
+
+    Returns the metric names and a (calibrations x metrics) matrix, NaN where a calibration lacks the metric.
+    """
+    names = sorted({name for calibration in calibrations for name in calibration.metrics})
+    columns = {name: i for i, name in enumerate(names)}
+    values = np.full((len(calibrations), len(names)), np.nan)
+    higher_is_better = np.zeros(len(names), dtype=bool)
+    for i, calibration in enumerate(calibrations):
+        for name, (value, higher) in calibration.metrics.items():
+            values[i, columns[name]] = value
+            higher_is_better[columns[name]] = higher
+
+    groups = np.array([calibration.hardware for calibration in calibrations])
+    medians = np.full_like(values, np.nan)
+    for group in np.unique(groups):
+        rows = groups == group
+        with warnings.catch_warnings():
+            # A metric no runner of the group has stays NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            medians[rows] = np.nanmedian(values[rows], axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(higher_is_better, values / medians, medians / values)
+    return names, scores
+
+
+def degraded_metrics(
+    calibrations: list[RunnerCalibration], threshold: float
+) -> list[tuple[RunnerCalibration, dict[str, float]]]:
+    """Calibrations with a metric more than `threshold` worse than the median of their hardware, and those metrics"""
+    names, scores = calibration_scores(calibrations)
+    degraded = []
+    for calibration, row in zip(calibrations, scores):
+        low = {name: score for name, score in zip(names, row) if score < 1 - threshold}
+        if low:
+            degraded.append((calibration, low))
+    return degraded
+
+
+def fingerprint_differences(
+    baseline: list[RunnerCalibration], candidate: list[RunnerCalibration]
+) -> dict[str, tuple[set, set]]:
+    """Fingerprint entries taking different values in the baseline and the candidate runs"""
+    differences = {}
+    for key in FINGERPRINT_KEYS:
+        baseline_values = {c.fingerprint.get(key) for c in baseline}
+        candidate_values = {c.fingerprint.get(key) for c in candidate}
+        if baseline_values != candidate_values:
+            differences[key] = (baseline_values, candidate_values)
+    return differences
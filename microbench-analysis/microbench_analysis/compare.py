@@ -0,0 +1,131 @@
+"""Statistical comparison of matching benchmark cases between two runs or two studies.
+
+All cases are processed at once: the samples are stored in NaN-padded (cases x samples) matrices, on which the
+bootstrap confidence intervals and the Mann-Whitney U test are computed with array operations.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Coefficients of the Chebyshev fit of erfc of Numerical Recipes (fractional error below 1.2e-7), highest degree first
+ERFC_COEFFICIENTS = np.array(
+    [
+        0.17087277,
+        -0.82215223,
+        1.48851587,
+        -1.13520398,
+        0.27886807,
+        -0.18628806,
+        0.09678418,
+        0.37409196,
+        1.00002368,
+        -1.26551223,
+    ]
+)
+
+
+def erfc(x: np.ndarray) -> np.ndarray:
+    """Complementary error function of every element, without a per-element Python call"""
+    x = np.asarray(x, dtype=np.float64)
+    t = 1 / (1 + 0.5 * np.abs(x))
+    y = t * np.exp(-x * x + np.polyval(ERFC_COEFFICIENTS, t))
+    return np.where(x >= 0, y, 2 - y)
+
+
+@dataclass
+class Comparison:
+    """Comparison of the time per operation of each case, candidate relative to baseline"""
+
+    cases: list[str]
+    baseline_mean: np.ndarray
+    candidate_mean: np.ndarray
+    # Relative change of the mean time (> 0 means the candidate is slower)
+    change: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+    p_value: np.ndarray
+
+    def regressions(self, threshold: float, alpha: float) -> np.ndarray:
+        """Cases significantly slower than the baseline by more than `threshold`"""
+        return (self.p_value < alpha) & (self.ci_low > 0) & (self.change > threshold)
+
+    def improvements(self, threshold: float, alpha: float) -> np.ndarray:
+        """Cases significantly faster than the baseline by more than `threshold`"""
+        return (self.p_value < alpha) & (self.ci_high < 0) & (self.change < -threshold)
+
+
+def pad(samples: list[np.ndarray]) -> np.ndarray:
+    """Stack samples of different lengths into a NaN-padded matrix"""
+    matrix = np.full((len(samples), max(len(s) for s in samples)), np.nan)
+    for i, s in enumerate(samples):
+        matrix[i, : len(s)] = s
+    return matrix
+
+
+def bootstrap_means(
+    matrix: np.ndarray, counts: np.ndarray, resamples: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Means of `resamples` bootstrap resamples of every row, shape (resamples, cases)"""
+    width = matrix.shape[1]
+    # Draw indices within each row's valid samples, the padding positions are masked out of the mean
+    indices = (rng.random((resamples, *matrix.shape)) * counts[None, :, None]).astype(np.intp)
+    resampled = np.take_along_axis(
+        np.broadcast_to(matrix, (resamples, *matrix.shape)), indices, axis=2
+    )
+    mask = np.arange(width)[None, None, :] < counts[None, :, None]
+    return np.where(mask, resampled, 0.0).sum(axis=2) / counts[None, :]
+
+
+def mann_whitney_p_values(baseline: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Two-sided p-values of the Mann-Whitney U test of every row, with the normal approximation"""
+    n = np.sum(~np.isnan(baseline), axis=1)
+    m = np.sum(~np.isnan(candidate), axis=1)
+    x = baseline[:, :, None]
+    y = candidate[:, None, :]
+    # Comparisons with NaN padding are False on both sides and don't count
+    u = np.sum(x > y, axis=(1, 2)) + 0.5 * np.sum(x == y, axis=(1, 2))
+    mean = n * m / 2
+    sigma = np.sqrt(n * m * (n + m + 1) / 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.maximum(np.abs(u - mean) - 0.5, 0) / sigma
+    return np.where(sigma > 0, erfc(z / np.sqrt(2)), 1.0)
+
+
+def compare_samples(
+    baseline: dict[str, np.ndarray],
+    candidate: dict[str, np.ndarray],
+    resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> Comparison:
+    """Compare the cases present in both `baseline` and `candidate`"""
+    cases = sorted(baseline.keys() & candidate.keys())
+    if not cases:
+        raise ValueError("No benchmark case in common between baseline and candidate")
+
+    base = pad([baseline[case] for case in cases])
+    cand = pad([candidate[case] for case in cases])
+    base_counts = np.array([len(baseline[case]) for case in cases])
+    cand_counts = np.array([len(candidate[case]) for case in cases])
+    base_mean = np.nanmean(base, axis=1)
+    cand_mean = np.nanmean(cand, axis=1)
+
+    rng = np.random.default_rng(seed)
+    change_distribution = (
+        bootstrap_means(cand, cand_counts, resamples, rng)
+        / bootstrap_means(base, base_counts, resamples, rng)
+        - 1
+    )
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(change_distribution, [tail, 100 - tail], axis=0)
+
+    return Comparison(
+        cases=cases,
+        baseline_mean=base_mean,
+        candidate_mean=cand_mean,
+        change=cand_mean / base_mean - 1,
+        ci_low=ci_low,
+        ci_high=ci_high,
+        p_value=mann_whitney_p_values(base, cand),
+    )
@@ -0,0 +1,315 @@
+"""Static performance dashboard across the runs and studies of a results tree.
+
+The dashboard is a markdown page with SVG charts, written into the mkdocs `docs/` tree so that `dev publish-docs`
+publishes it. The generated `generated.md` is not tracked: the tracked `index.md` includes it with a snippet.
+It shows:
+
+- throughput against `NumConcurrentRunners`, per adapter and benchmark method, one series per study
+- peak throughput across studies (ordered by their first run), i.e. the trend across ArmoniK.Core versions
+- run-to-run variance of the mean time per operation of every case run more than once
+
+The rows of `ingest` are reduced to per-run aggregates, cached as JSON under a hash of the archives of the run,
+so that regenerating the dashboard after syncing one more run only aggregates that run.
+"""
+
+import hashlib
+import html
+import json
+import math
+import re
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from microbench_analysis.ingest import PARAM_COLUMNS, TUPLE_PARAM_COLUMNS
+
+# Page written by `build_dashboard`, included by the tracked `index.md` of the dashboard directory
+GENERATED_PAGE = "generated.md"
+# Bump when the aggregates change, to invalidate the cache
+AGGREGATE_VERSION = 1
+# Parameters giving the number of items processed by every runner, as in `study sweep`
+WORK_COLUMNS = ("num_objects_per_runner", "num_messages")
+CONCURRENCY_COLUMN = "num_concurrent_runners"
+# Most series drawn on one chart, and most cases listed in the variance table
+MAX_SERIES = 8
+MAX_VARIANCE_ROWS = 25
+COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+)
+
+
+def family_label(row: dict) -> str:
+    """Parameters of a case other than the concurrency, e.g. `ObjectSizeBytes=1024`"""
+    params = {
+        name: row[column]
+        for name, column in PARAM_COLUMNS.items()
+        if column != CONCURRENCY_COLUMN and row.get(column) is not None
+    }
+    for name, columns in TUPLE_PARAM_COLUMNS.items():
+        if any(row.get(column) is not None for column in columns):
+            params[name] = f"({', '.join(str(row.get(column)) for column in columns)})"
+    params.update(json.loads(row["params"] or "{}"))
+    return ", ".join(f"{name}={value}" for name, value in params.items())
+
+
+def aggregate_run(rows: list[dict]) -> dict:
+    """Mean time per operation and throughput of every case of one run"""
+    first = rows[0]
+    cases = []
+    for row in rows:
+        if not row["mean_ns"]:
+            continue
+        concurrency = row.get(CONCURRENCY_COLUMN) or 1
+        work = concurrency * next((row[c] for c in WORK_COLUMNS if row.get(c)), 1)
+        cases.append(
+            {
+                "component": row["component"] or row["benchmark"],
+                "benchmark_type": row["benchmark_type"],
+                "method": row["method"],
+                "family": family_label(row),
+                "concurrency": concurrency,
+                "mean_ns": row["mean_ns"],
+                "throughput": work * 1e9 / row["mean_ns"],
+            }
+        )
+    return {
+        "study": first["study"],
+        "run_index": first["run_index"],
+        "run_date": first["run_date"],
+        "core_version": first["core_version"],
+        "cases": cases,
+    }
+
+
+def run_aggregates(cases: pa.Table, cache_dir: Path) -> tuple[list[dict], int]:
+    """Aggregates of every run of an ingested table, and how many were not cached"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    runs = {}
+    for row in cases.to_pylist():
+        runs.setdefault((row["study"], row["run_index"]), []).append(row)
+
+    aggregates = []
+    computed = 0
+    for key in sorted(runs):
+        rows = runs[key]
+        digest = hashlib.sha256(f"v{AGGREGATE_VERSION}|{key[0]}|{key[1]}".encode())
+        for source_hash in sorted({row["source_hash"] for row in rows}):
+            digest.update(source_hash.encode())
+        cache_file = cache_dir / f"{digest.hexdigest()}.json"
+        if cache_file.exists():
+            aggregate = json.loads(cache_file.read_text(encoding="utf-8"))
+        else:
+            aggregate = aggregate_run(rows)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_text(json.dumps(aggregate), encoding="utf-8")
+            tmp_file.replace(cache_file)
+            computed += 1
+        aggregates.append(aggregate)
+    return aggregates, computed
+
+
+def nice_ticks(low: float, high: float, count: int = 5) -> list[float]:
+    """Round tick values covering [low, high]"""
+    if high <= low:
+        high = low + 1
+    step = 10 ** math.floor(math.log10((high - low) / count))
+    for multiple in (1, 2, 5, 10):
+        if (high - low) / (step * multiple) <= count:
+            step *= multiple
+            break
+    return [i * step for i in range(math.floor(low / step), math.ceil(high / step) + 1)]
+
+
+def format_value(value: float) -> str:
+    for threshold, suffix in ((1e9, "G"), (1e6, "M"), (1e3, "k")):
+        if abs(value) >= threshold:
+            return f"{value / threshold:g}{suffix}"
+    return f"{value:g}"
+
+
+def line_chart(series: list, x_labels: list[str], y_label: str) -> str:
+    """SVG line chart of series of (label, {x index: y}) over categorical x positions"""
+    width, height = 720, 340
+    left, right, top, bottom = 70, 20, 15, 50
+    legend_height = 18 * len(series)
+    plot_width, plot_height = width - left - right, height - top - bottom
+    values = [y for _, points in series for y in points.values()]
+    ticks = nice_ticks(0, max(values, default=1))
+    y_max = ticks[-1] or 1
+
+    def x_pos(i: int) -> float:
+        return left + (plot_width * (i + 0.5) / len(x_labels))
+
+    def y_pos(y: float) -> float:
+        return top + plot_height * (1 - y / y_max)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height + legend_height}" '
+        f'font-family="sans-serif" font-size="12">',
+        f'<rect width="100%" height="100%" fill="white"/>',
+        f'<text x="14" y="{top + plot_height / 2}" transform="rotate(-90 14 {top + plot_height / 2})" '
+        f'text-anchor="middle">{html.escape(y_label)}</text>',
+    ]
+    for tick in ticks:
+        y = y_pos(tick)
+        parts.append(f'<line x1="{left}" x2="{width - right}" y1="{y:.1f}" y2="{y:.1f}" stroke="#ddd"/>')
+        parts.append(f'<text x="{left - 6}" y="{y + 4:.1f}" text-anchor="end">{format_value(tick)}</text>')
+    for i, label in enumerate(x_labels):
+        parts.append(
+            f'<text x="{x_pos(i):.1f}" y="{top + plot_height + 18}" text-anchor="middle">'
+            f"{html.escape(label)}</text>"
+        )
+    parts.append(
+        f'<line x1="{left}" x2="{left}" y1="{top}" y2="{top + plot_height}" stroke="#333"/>'
+        f'<line x1="{left}" x2="{width - right}" y1="{top + plot_height}" y2="{top + plot_height}" stroke="#333"/>'
+    )
+    for n, (label, points) in enumerate(series):
+        color = COLORS[n % len(COLORS)]
+        coordinates = [(x_pos(i), y_pos(y)) for i, y in sorted(points.items())]
+        path = " ".join(f"{x:.1f},{y:.1f}" for x, y in coordinates)
+        parts.append(f'<polyline points="{path}" fill="none" stroke="{color}" stroke-width="2"/>')
+        parts += [f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{color}"/>' for x, y in coordinates]
+        legend_y = height + 18 * n
+        parts.append(f'<rect x="{left}" y="{legend_y - 9}" width="12" height="3" fill="{color}"/>')
+        parts.append(f'<text x="{left + 18}" y="{legend_y - 4}">{html.escape(label)}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def slug(*parts: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", "-".join(parts).lower()).strip("-")
+
+
+def build_dashboard(aggregates: list[dict], output_dir: Path) -> Path:
+    """Write the dashboard page and its charts from run aggregates. Returns the page path"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for chart in output_dir.glob("*.svg"):
+        chart.unlink()
+
+    # Studies in the order of their first run, with the ArmoniK.Core version they benchmark
+    studies = {}
+    for aggregate in sorted(aggregates, key=lambda a: a["run_date"]):
+        studies.setdefault(aggregate["study"], aggregate["core_version"] or aggregate["study"])
+
+    # (component, type, method) -> study -> family -> concurrency -> per-run values
+    grouped = {}
+    for aggregate in aggregates:
+        for case in aggregate["cases"]:
+            chart_key = (case["component"], case["benchmark_type"], case["method"])
+            family = grouped.setdefault(chart_key, {}).setdefault(aggregate["study"], {})
+            point = family.setdefault(case["family"], {}).setdefault(case["concurrency"], [])
+            point.append((case["throughput"], case["mean_ns"]))
+
+    lines = [
+        f"Generated on {datetime.now():%Y-%m-%d %H:%M} from {len(aggregates)} run(s) of "
+        f"{len(studies)} stud{'y' if len(studies) == 1 else 'ies'} by "
+        "`microbench-analysis dashboard`. Values of a study are medians over its runs.",
+        "",
+        "## Throughput vs concurrency",
+        "",
+    ]
+    for (component, benchmark_type, method), by_study in sorted(grouped.items()):
+        concurrencies = sorted({c for families in by_study.values() for f in families.values() for c in f})
+        series = []
+        for study in reversed(studies):
+            for family, points in by_study.get(study, {}).items():
+                label = f"{study} ({family})" if family else study
+                series.append(
+                    (
+                        label,
+                        {
+                            concurrencies.index(c): float(np.median([t for t, _ in values]))
+                            for c, values in points.items()
+                        },
+                    )
+                )
+        name = slug("throughput", component, benchmark_type, method)
+        (output_dir / f"{name}.svg").write_text(
+            line_chart(series[:MAX_SERIES], [str(c) for c in concurrencies], "items/s"),
+            encoding="utf-8",
+        )
+        lines += [
+            f"### {component}: {benchmark_type}.{method}",
+            "",
+            f"![Throughput of {benchmark_type}.{method} by NumConcurrentRunners]({name}.svg)",
+            "",
+        ]
+
+    lines += ["## Version trends", ""]
+    trend_charts = 0
+    study_names = list(studies)
+    for (component, benchmark_type, method), by_study in sorted(grouped.items()):
+        if len(by_study) < 2:
+            continue
+        families = sorted({family for families in by_study.values() for family in families})
+        series = []
+        for family in families:
+            peaks = {}
+            for study, study_families in by_study.items():
+                if family in study_families:
+                    # Peak throughput over the concurrencies, median over the runs
+                    peaks[study_names.index(study)] = max(
+                        float(np.median([t for t, _ in values]))
+                        for values in study_families[family].values()
+                    )
+            series.append((family or method, peaks))
+        name = slug("trend", component, benchmark_type, method)
+        (output_dir / f"{name}.svg").write_text(
+            line_chart(series[:MAX_SERIES], list(studies.values()), "peak items/s"),
+            encoding="utf-8",
+        )
+        lines += [
+            f"### {component}: {benchmark_type}.{method}",
+            "",
+            f"![Peak throughput of {benchmark_type}.{method} by study]({name}.svg)",
+            "",
+        ]
+        trend_charts += 1
+    if not trend_charts:
+        lines += ["No benchmark was run by more than one study yet.", ""]
+
+    # Coefficient of variation of the mean time per operation across the runs of a study
+    variance = []
+    for (component, benchmark_type, method), by_study in grouped.items():
+        for study, families in by_study.items():
+            for family, points in families.items():
+                for concurrency, values in points.items():
+                    means = np.array([m for _, m in values])
+                    if len(means) > 1:
+                        variance.append(
+                            (
+                                float(means.std(ddof=1) / means.mean()),
+                                study,
+                                f"{benchmark_type}.{method}",
+                                ", ".join(filter(None, [f"NumConcurrentRunners={concurrency}", family])),
+                                len(means),
+                                float(means.mean()),
+                            )
+                        )
+    lines += ["## Run-to-run variance", ""]
+    if variance:
+        cvs = np.array([v[0] for v in variance])
+        lines += [
+            f"Median coefficient of variation of the mean time per operation over {len(variance)} case(s): "
+            f"{np.median(cvs):.1%}. Most variable cases:",
+            "",
+            "| Study | Case | Parameters | Runs | Mean (ms) | CV |",
+            "|-------|------|------------|------|-----------|----|",
+        ]
+        for cv, study, case, params, runs, mean in sorted(variance, reverse=True)[:MAX_VARIANCE_ROWS]:
+            lines.append(f"| {study} | {case} | {params} | {runs} | {mean / 1e6:.3f} | {cv:.1%} |")
+    else:
+        lines.append("No case was run more than once in the same study yet.")
+
+    page = output_dir / GENERATED_PAGE
+    page.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return page
@@ -0,0 +1,299 @@
+"""History of every benchmark case across studies, and the releases where its throughput shifted.
+
+The history is a directory with one Parquet part per study, holding the median over its runs of the mean time per
+operation and throughput of every case. It is append-only: a study is added once, its part is only rewritten when
+more of its runs are synced, and studies that are no longer in the results tree stay in the history. Studies are
+ordered by ArmoniK.Core version (the date of their first run for the others, e.g. `main`), so that every case is a
+series over the releases.
+
+Change points are found by binary segmentation of the log throughput of every series: a segment is split where the
+two sides differ the most (Welch-like t statistic over the pooled residuals), if the shift is significant, large
+enough, and both sides hold at least `min_size` releases, so that a single slow release is not a shift. All the
+segments of all the cases being examined at one level are processed at once on prefix sums of the series matrix.
+
+The change points are kept in a state file. When studies are appended after the ones already examined, only the
+segment after the last change point of every case is searched again; earlier change points are final.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+STATE_FILE = "changepoints.json"
+# Bump when the history or the detection changes, to start the detection over
+HISTORY_VERSION = 1
+VERSION_PATTERN = re.compile(r"^v?(\d+(?:\.\d+)*)$")
+
+HISTORY_SCHEMA = pa.schema(
+    [
+        ("study", pa.string()),
+        ("core_version", pa.string()),
+        ("first_run_date", pa.string()),
+        ("case", pa.string()),
+        ("runs", pa.int32()),
+        ("mean_ns", pa.float64()),
+        ("throughput", pa.float64()),
+    ]
+)
+
+
+@dataclass
+class ChangePoint:
+    """Sustained shift of the throughput of a case, starting at a study"""
+
+    case: str
+    study: str
+    core_version: str | None
+    # Relative change of the throughput between the segments before and after the study
+    change: float
+    t_stat: float
+
+
+def history_case(case: dict) -> str:
+    """Identifier of a case of a run aggregate, stable across studies"""
+    params = ", ".join(filter(None, [f"NumConcurrentRunners={case['concurrency']}", case["family"]]))
+    return f"{case['component']}: {case['benchmark_type']}.{case['method']}({params})"
+
+
+def study_history(aggregates: list[dict]) -> pa.Table:
+    """History rows of a study, from the aggregates of its runs"""
+    first = min(aggregates, key=lambda a: a["run_date"])
+    values = {}
+    for aggregate in aggregates:
+        for case in aggregate["cases"]:
+            values.setdefault(history_case(case), []).append((case["mean_ns"], case["throughput"]))
+    return pa.Table.from_pylist(
+        [
+            {
+                "study": first["study"],
+                "core_version": first["core_version"],
+                "first_run_date": first["run_date"],
+                "case": case,
+                "runs": len(case_values),
+                "mean_ns": float(np.median([m for m, _ in case_values])),
+                "throughput": float(np.median([t for _, t in case_values])),
+            }
+            for case, case_values in sorted(values.items())
+        ],
+        schema=HISTORY_SCHEMA,
+    )
+
+
+def update_history(aggregates: list[dict], history_dir: Path) -> list[str]:
+    """Add the studies of run aggregates to the history. Returns the studies added or updated"""
+    history_dir.mkdir(parents=True, exist_ok=True)
+    by_study = {}
+    for aggregate in aggregates:
+        by_study.setdefault(aggregate["study"], []).append(aggregate)
+
+    updated = []
+    for study, study_aggregates in sorted(by_study.items()):
+        digest = hashlib.sha256(
+            json.dumps(sorted(study_aggregates, key=lambda a: a["run_index"]), sort_keys=True).encode()
+        ).hexdigest()
+        part = history_dir / f"{study}.parquet"
+        if part.exists() and pq.read_schema(part).metadata.get(b"digest") == digest.encode():
+            continue
+        table = study_history(study_aggregates)
+        tmp_file = part.with_suffix(".tmp")
+        pq.write_table(table.replace_schema_metadata({"digest": digest}), tmp_file)
+        tmp_file.replace(part)
+        updated.append(study)
+    return updated
+
+
+def study_order(core_version: str | None, first_run_date: str) -> tuple:
+    """Sort key of a study: released versions first, in version order, then the others by date"""
+    match = VERSION_PATTERN.match(core_version or "")
+    if match:
+        return (0, tuple(int(part) for part in match[1].split(".")), first_run_date)
+    return (1, (), first_run_date)
+
+
+def load_history(history_dir: Path) -> tuple[list[dict], list[str], np.ndarray]:
+    """Ordered studies (name, core version, digest), cases, and the (cases x studies) log throughput matrix"""
+    studies = []
+    tables = {}
+    for part in history_dir.glob("*.parquet"):
+        table = pq.read_table(part, schema=HISTORY_SCHEMA)
+        if not table.num_rows:
+            continue
+        tables[part.stem] = table
+        studies.append(
+            {
+                "study": part.stem,
+                "core_version": table["core_version"][0].as_py(),
+                "first_run_date": table["first_run_date"][0].as_py(),
+                "digest": pq.read_schema(part).metadata[b"digest"].decode(),
+            }
+        )
+    studies.sort(key=lambda s: study_order(s["core_version"], s["first_run_date"]))
+
+    cases = sorted({case for table in tables.values() for case in table["case"].to_pylist()})
+    rows = {case: i for i, case in enumerate(cases)}
+    values = np.full((len(cases), len(studies)), np.nan)
+    for j, study in enumerate(studies):
+        table = tables[study["study"]]
+        indices = np.array([rows[case] for case in table["case"].to_pylist()], dtype=np.intp)
+        values[indices, j] = np.log(table["throughput"].to_numpy())
+    return studies, cases, values
+
+
+def prefix_sums(values: np.ndarray) -> tuple:
+    """Prefix counts, sums and sums of squares of the rows of `values` (NaN being missing), and the valid positions"""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    zeros = np.zeros((len(values), 1))
+    return (
+        np.hstack([zeros, np.cumsum(valid, axis=1)]),
+        np.hstack([zeros, np.cumsum(filled, axis=1)]),
+        np.hstack([zeros, np.cumsum(filled**2, axis=1)]),
+        np.hstack([valid, np.zeros((len(values), 1), dtype=bool)]),
+    )
+
+
+def split_segments(
+    prefixes: tuple,
+    cases: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    min_size: int,
+    min_shift: float,
+    threshold: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Best split of every segment `[starts, ends)` of the rows `cases` of the series, all segments at once.
+
+    Returns the split position of every segment (the first column of the new level, -1 when the segment is not
+    split) and its t statistic. Missing values do not count towards the segment sizes.
+    """
+    count, total, squares, valid = (prefix[cases] for prefix in prefixes)
+
+    def at(prefix, positions):
+        return np.take_along_axis(prefix, positions[:, None], axis=1)
+
+    n1 = count - at(count, starts)
+    n2 = at(count, ends) - count
+    s1 = total - at(total, starts)
+    s2 = at(total, ends) - total
+    q1 = squares - at(squares, starts)
+    q2 = at(squares, ends) - squares
+    positions = np.arange(count.shape[1])[None, :]
+    # A split starts at a measured release, with enough releases on both sides
+    candidate = (
+        (positions > starts[:, None])
+        & (positions < ends[:, None])
+        & valid
+        & (n1 >= min_size)
+        & (n2 >= min_size)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean1 = s1 / n1
+        mean2 = s2 / n2
+        residuals = np.maximum(q1 - s1 * mean1 + q2 - s2 * mean2, 0.0)
+        scale = np.sqrt(residuals / (n1 + n2 - 2) * (1 / n1 + 1 / n2))
+        shift = np.abs(mean2 - mean1)
+        t_stat = np.where(candidate, shift / scale, -np.inf)
+        # Constant sides: any shift is exact
+        t_stat = np.where(candidate & (scale == 0), np.where(shift > 0, np.inf, 0.0), t_stat)
+
+    best = np.argmax(t_stat, axis=1)
+    rows = np.arange(len(best))
+    best_t = t_stat[rows, best]
+    significant = (best_t >= threshold) & (np.expm1(shift[rows, best]) >= min_shift)
+    return np.where(significant, best, -1), best_t
+
+
+def detect_change_points(
+    values: np.ndarray,
+    starts: np.ndarray,
+    min_size: int,
+    min_shift: float,
+    threshold: float,
+) -> list[list[tuple[int, float]]]:
+    """Change points (position, t statistic) of every row of `values`, searched after `starts` by binary segmentation"""
+    prefixes = prefix_sums(values)
+    change_points = [[] for _ in range(len(values))]
+    cases = np.arange(len(values))
+    ends = np.full(len(values), values.shape[1])
+    while len(cases):
+        splits, t_stats = split_segments(prefixes, cases, starts, ends, min_size, min_shift, threshold)
+        split = splits >= 0
+        for case, position, t_stat in zip(cases[split], splits[split], t_stats[split]):
+            change_points[case].append((int(position), float(t_stat)))
+        # Both halves of every split segment are searched at the next level
+        cases = np.concatenate([cases[split], cases[split]])
+        starts, ends = (
+            np.concatenate([starts[split], splits[split]]),
+            np.concatenate([splits[split], ends[split]]),
+        )
+    return [sorted(points) for points in change_points]
+
+
+def update_change_points(
+    history_dir: Path, min_size: int, min_shift: float, threshold: float
+) -> tuple[list[ChangePoint], int]:
+    """Change points of every case of the history, and how many studies were already examined.
+
+    Reuses the change points of the state file when the studies it examined are still the first ones of the history,
+    unchanged, with the same detection parameters.
+    """
+    studies, cases, values = load_history(history_dir)
+    parameters = {
+        "version": HISTORY_VERSION,
+        "min_size": min_size,
+        "min_shift": min_shift,
+        "threshold": threshold,
+    }
+    state_file = history_dir / STATE_FILE
+    state = {}
+    if state_file.exists():
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    keys = [[s["study"], s["digest"]] for s in studies]
+    examined = state.get("studies", [])
+    incremental = state.get("parameters") == parameters and keys[: len(examined)] == examined
+
+    previous = state.get("change_points", {}) if incremental else {}
+    starts = np.array(
+        [max((p for p, _ in previous.get(case, [])), default=0) for case in cases], dtype=np.intp
+    )
+    found = detect_change_points(values, starts, min_size, min_shift, threshold)
+    positions = {
+        case: sorted(previous.get(case, []) + [list(point) for point in points])
+        for case, points in zip(cases, found)
+    }
+
+    tmp_file = state_file.with_suffix(".tmp")
+    tmp_file.write_text(
+        json.dumps(
+            {
+                "parameters": parameters,
+                "studies": keys,
+                "change_points": {case: points for case, points in positions.items() if points},
+            }
+        ),
+        encoding="utf-8",
+    )
+    tmp_file.replace(state_file)
+
+    change_points = []
+    for i, case in enumerate(cases):
+        bounds = [0] + [p for p, _ in positions[case]] + [len(studies)]
+        for j, (position, t_stat) in enumerate(positions[case]):
+            before = np.nanmean(values[i, bounds[j] : position])
+            after = np.nanmean(values[i, position : bounds[j + 2]])
+            change_points.append(
+                ChangePoint(
+                    case=case,
+                    study=studies[position]["study"],
+                    core_version=studies[position]["core_version"],
+                    change=float(np.expm1(after - before)),
+                    t_stat=t_stat,
+                )
+            )
+    return change_points, len(examined) if incremental else 0
@@ -0,0 +1,161 @@
+"""Host metrics of the runners, aligned with the benchmark iterations they were sampled during.
+
+With `--metrics-interval`, `study run` and `study submit` sample the CPU, memory, swap, disk and network usage of
+the runner while each benchmark runs, into `metrics.csv.gz` next to `iterations.json`. Every sample averages the
+counters since the previous one, and is stamped with the runner clock when it was taken.
+
+The measurements of `iterations.json` are stamped with the clock of the machine that parsed the BenchmoniK output
+when their line was printed, i.e. at the end of the iteration. `clock_offset` is the offset of the runner clock
+relative to that machine (zero when the runner agent parsed the output), so an iteration ran on the runner from
+`time + clock_offset - ns * 1e-9` to `time + clock_offset`.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from microbench_analysis.measurements import case_key, run_dirs
+
+METRICS_FILE = "metrics.csv.gz"
+# Only WorkloadActual lines are printed while the iteration runs, WorkloadResult ones are printed afterwards
+ALIGNED_STAGE = "WorkloadActual"
+
+ITERATION_SCHEMA = pa.schema(
+    [
+        ("run_index", pa.int32()),
+        ("benchmark", pa.string()),
+        ("case", pa.string()),
+        ("launch", pa.int32()),
+        ("index", pa.int32()),
+        ("ns_per_op", pa.float64()),
+        ("start", pa.float64()),
+        ("end", pa.float64()),
+        ("samples", pa.int32()),
+    ]
+)
+
+
+def load_metrics(path: Path) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Midpoints of the sample intervals and the metric columns of a `metrics.csv.gz` file"""
+    table = pacsv.read_csv(path)
+    times = table["time"].to_numpy().astype(np.float64)
+    # The first sample covers about as long as the next one
+    first_gap = times[1] - times[0] if len(times) > 1 else 0.0
+    durations = np.diff(times, prepend=times[0] - first_gap) if len(times) else times
+    columns = {
+        name: table[name].to_numpy().astype(np.float64)
+        for name in table.column_names
+        if name != "time"
+    }
+    return times - durations / 2, columns
+
+
+def align_windows(
+    midpoints: np.ndarray,
+    columns: dict[str, np.ndarray],
+    starts: np.ndarray,
+    ends: np.ndarray,
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Mean of each metric over the samples whose interval midpoint falls in each `[start, end]` window.
+
+    Windows shorter than the sampling interval often contain no midpoint: they get the sample closest to their
+    middle instead, and a sample count of 0. Returns the sample counts and the metric means.
+    """
+    lo = np.searchsorted(midpoints, starts, side="left")
+    hi = np.searchsorted(midpoints, ends, side="right")
+    counts = hi - lo
+
+    # Nearest sample to the middle of each window, for the empty ones
+    middles = (starts + ends) / 2
+    right = np.clip(np.searchsorted(midpoints, middles), 0, len(midpoints) - 1)
+    left = np.clip(right - 1, 0, len(midpoints) - 1)
+    nearest = np.where(
+        np.abs(midpoints[left] - middles) <= np.abs(midpoints[right] - middles),
+        left,
+        right,
+    )
+
+    means = {}
+    for name, values in columns.items():
+        sums = np.concatenate([[0.0], np.cumsum(values)])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            window_means = (sums[hi] - sums[lo]) / counts
+        means[name] = np.where(counts > 0, window_means, values[nearest])
+    return counts, means
+
+
+def iteration_windows(iterations: dict) -> dict[str, np.ndarray]:
+    """Execution window and time per operation of the timestamped measured iterations of `iterations.json`"""
+    offset = iterations.get("clock_offset") or 0.0
+    rows = {name: [] for name in ("case", "launch", "index", "ns_per_op", "ns", "time")}
+    for case in iterations["cases"]:
+        for m in case["measurements"]:
+            if m["stage"] == ALIGNED_STAGE and "time" in m:
+                rows["case"].append(case)
+                rows["launch"].append(m["launch"])
+                rows["index"].append(m["index"])
+                rows["ns_per_op"].append(m["ns"] / max(m["ops"], 1))
+                rows["ns"].append(m["ns"])
+                rows["time"].append(m["time"])
+    ends = np.array(rows.pop("time"), dtype=np.float64) + offset
+    rows["start"] = ends - np.array(rows.pop("ns"), dtype=np.float64) * 1e-9
+    rows["end"] = ends
+    return rows
+
+
+def align_study(study_dir: Path, run_index: int | None = None) -> tuple[pa.Table, dict]:
+    """One row per measured iteration of a study, with the mean host metrics of the runner during the iteration.
+
+    Benchmarks without `metrics.csv.gz` or without timestamped iterations are skipped. Also returns the mean
+    CPU share of one core used by the sampler, by benchmark directory.
+    """
+    runs = run_dirs(study_dir)
+    if run_index is not None:
+        if run_index not in runs:
+            raise ValueError(f"Run {run_index} of {study_dir.name} is not synced")
+        runs = {run_index: runs[run_index]}
+
+    tables = []
+    overheads = {}
+    for index, run_dir in runs.items():
+        for benchmark_dir in sorted(p for p in run_dir.iterdir() if p.is_dir()):
+            metrics_file = benchmark_dir / METRICS_FILE
+            iterations_file = benchmark_dir / "iterations.json"
+            if not metrics_file.exists() or not iterations_file.exists():
+                continue
+            midpoints, columns = load_metrics(metrics_file)
+            windows = iteration_windows(json.loads(iterations_file.read_text(encoding="utf-8")))
+            if not len(midpoints) or not len(windows["end"]):
+                continue
+
+            counts, means = align_windows(midpoints, columns, windows["start"], windows["end"])
+            n = len(counts)
+            table = pa.table(
+                {
+                    "run_index": pa.array([index] * n, pa.int32()),
+                    "benchmark": pa.array([benchmark_dir.name] * n, pa.string()),
+                    "case": pa.array(
+                        [case_key(benchmark_dir.name, case) for case in windows["case"]],
+                        pa.string(),
+                    ),
+                    "launch": pa.array(windows["launch"], pa.int32()),
+                    "index": pa.array(windows["index"], pa.int32()),
+                    "ns_per_op": pa.array(windows["ns_per_op"], pa.float64()),
+                    "start": pa.array(windows["start"], pa.float64()),
+                    "end": pa.array(windows["end"], pa.float64()),
+                    "samples": pa.array(counts, pa.int32()),
+                    **{name: pa.array(values, pa.float64()) for name, values in means.items()},
+                }
+            )
+            tables.append(table)
+            if "sampler_cpu" in columns:
+                overheads[f"run_{index}/{benchmark_dir.name}"] = float(
+                    columns["sampler_cpu"].mean()
+                )
+
+    if not tables:
+        return ITERATION_SCHEMA.empty_table(), overheads
+    return pa.concat_tables(tables, promote_options="default"), overheads
@@ -0,0 +1,364 @@
+"""Ingestion of a synced results tree into a single columnar dataset.
+
+The results tree produced by `study sync` looks like:
+
+    results/<study>/study.json
+    results/<study>/run_<index>_<date>/<benchmark>/config.json
+    results/<study>/run_<index>_<date>/<benchmark>/results.zip  (or results.tar.gz, or BenchmarkDotNet.Artifacts/)
+
+Every BenchmarkDotNet `*-report.csv` found in the artifacts becomes one row per benchmark case. Parsing an archive
+is done in a process pool and cached by the archive's hash, so re-ingesting a study only parses the new runs.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import re
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RUN_DIR_PATTERN = re.compile(r"^run_(?P<index>\d+)_(?P<date>.+)$")
+ARTIFACTS_DIR = "BenchmarkDotNet.Artifacts"
+
+# Bump when the parsing changes, to invalidate the cache
+CACHE_VERSION = 1
+
+# BenchmarkDotNet parameters with a dedicated typed column, the others are kept in the `params` JSON column
+PARAM_COLUMNS = {
+    "NumConcurrentRunners": "num_concurrent_runners",
+    "NumObjectsPerRunner": "num_objects_per_runner",
+    "ObjectSizeBytes": "object_size_bytes",
+    "MaxMessagesPerOperation": "max_messages_per_operation",
+    "NumMessages": "num_messages",
+}
+# Tuple parameters, split into one column per element
+TUPLE_PARAM_COLUMNS = {
+    "TransferParameters": ("chunk_download_size", "chunk_upload_size"),
+}
+# BenchmarkDotNet statistics columns (printed with units in the header)
+STATISTIC_COLUMNS = {
+    "Mean [ns]": "mean_ns",
+    "Error [ns]": "error_ns",
+    "StdDev [ns]": "stddev_ns",
+    "Median [ns]": "median_ns",
+    "Gen0": "gen0",
+    "Allocated [KB]": "allocated_kb",
+}
+# Job characteristics printed by BenchmarkDotNet before the parameters
+JOB_COLUMNS = {
+    "Job",
+    "AnalyzeLaunchVariance",
+    "EvaluateOverhead",
+    "MaxAbsoluteError",
+    "MaxRelativeError",
+    "MinInvokeCount",
+    "MinIterationTime",
+    "OutlierMode",
+    "Affinity",
+    "EnvironmentVariables",
+    "Jit",
+    "LargeAddressAware",
+    "Platform",
+    "PowerPlanMode",
+    "Runtime",
+    "AllowVeryLargeObjects",
+    "Concurrent",
+    "CpuGroups",
+    "Force",
+    "HeapAffinitizeMask",
+    "HeapCount",
+    "NoAffinitize",
+    "RetainVm",
+    "Server",
+    "Arguments",
+    "BuildConfiguration",
+    "Clock",
+    "EngineFactory",
+    "NuGetReferences",
+    "Toolchain",
+    "IsMutator",
+    "InvocationCount",
+    "IterationCount",
+    "IterationTime",
+    "LaunchCount",
+    "MaxIterationCount",
+    "MaxWarmupIterationCount",
+    "MemoryRandomization",
+    "MinIterationCount",
+    "MinWarmupIterationCount",
+    "RunStrategy",
+    "UnrollFactor",
+    "WarmupCount",
+}
+
+# Columns parsed from the artifacts themselves, cached per archive
+CASE_SCHEMA = pa.schema(
+    [
+        ("benchmark_type", pa.string()),
+        ("method", pa.string()),
+        *[(column, pa.int64()) for column in PARAM_COLUMNS.values()],
+        *[
+            (column, pa.int64())
+            for columns in TUPLE_PARAM_COLUMNS.values()
+            for column in columns
+        ],
+        ("params", pa.string()),
+        *[(column, pa.float64()) for column in STATISTIC_COLUMNS.values()],
+    ]
+)
+# Columns describing where the artifacts come from
+CONTEXT_SCHEMA = pa.schema(
+    [
+        ("study", pa.string()),
+        ("run_index", pa.int32()),
+        ("run_date", pa.string()),
+        ("benchmark", pa.string()),
+        ("component", pa.string()),
+        ("core_version", pa.string()),
+        ("source_hash", pa.string()),
+    ]
+)
+SCHEMA = pa.unify_schemas([CONTEXT_SCHEMA, CASE_SCHEMA])
+
+
+@dataclass
+class ArtifactSource:
+    """BenchmarkDotNet artifacts of one benchmark of one study run"""
+
+    path: Path
+    study: str
+    run_index: int
+    run_date: str
+    benchmark: str
+    component: str | None
+    core_version: str | None
+
+    def content_hash(self) -> str:
+        """Hash of the artifacts, used as cache key"""
+        digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+        if self.path.is_dir():
+            for report in sorted(self.path.rglob("*-report.csv")):
+                digest.update(report.read_bytes())
+        else:
+            with open(self.path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+
+def read_reports(path: Path):
+    """Yield (file name, contents) of every BenchmarkDotNet CSV report in a zip, a tar.gz or a directory"""
+    if path.is_dir():
+        for report in sorted(path.rglob("*-report.csv")):
+            yield report.name, report.read_text(encoding="utf-8-sig")
+    elif path.name.endswith(".tar.gz"):
+        with tarfile.open(path, "r:gz") as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith("-report.csv"):
+                    contents = archive.extractfile(member).read()
+                    yield Path(member.name).name, contents.decode("utf-8-sig")
+    else:
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.endswith("-report.csv"):
+                    yield Path(name).name, archive.read(name).decode("utf-8-sig")
+
+
+def parse_number(value: str, decimal_comma: bool) -> float | None:
+    """Parse a culture-formatted BenchmarkDotNet number, `NA`/`-` being missing values"""
+    value = value.strip().replace(" ", "").replace("\u00a0", "")
+    if value in ("", "NA", "-", "?"):
+        return None
+    if decimal_comma:
+        value = value.replace(".", "").replace(",", ".")
+    else:
+        value = value.replace(",", "")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_int(value: str) -> int | None:
+    try:
+        return int(value.strip())
+    except ValueError:
+        return None
+
+
+def parse_report(name: str, contents: str) -> list[dict]:
+    """Parse a BenchmarkDotNet CSV report into one row per benchmark case"""
+    header_line = contents.split("\n", 1)[0]
+    # CsvSeparator.CurrentCulture: `;` goes with a decimal comma
+    delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+    decimal_comma = delimiter == ";"
+    reader = csv.DictReader(io.StringIO(contents), delimiter=delimiter)
+    columns = reader.fieldnames or []
+    first_statistic = next(
+        (i for i, column in enumerate(columns) if column in STATISTIC_COLUMNS),
+        len(columns),
+    )
+    param_names = [
+        column
+        for column in columns[:first_statistic]
+        if column != "Method" and column not in JOB_COLUMNS
+    ]
+    benchmark_type = name.removesuffix("-report.csv").rsplit(".", 1)[-1]
+
+    rows = []
+    for record in reader:
+        row = {"benchmark_type": benchmark_type, "method": record.get("Method")}
+        other_params = {}
+        for param in param_names:
+            value = record.get(param, "")
+            if param in PARAM_COLUMNS:
+                row[PARAM_COLUMNS[param]] = parse_int(value)
+            elif param in TUPLE_PARAM_COLUMNS:
+                elements = value.strip("()").split(",")
+                for column, element in zip(TUPLE_PARAM_COLUMNS[param], elements):
+                    row[column] = parse_int(element)
+            else:
+                other_params[param] = value
+        row["params"] = json.dumps(other_params, sort_keys=True)
+        for column, field in STATISTIC_COLUMNS.items():
+            row[field] = parse_number(record.get(column, ""), decimal_comma)
+        rows.append(row)
+    return rows
+
+
+def parse_source(path: Path, cache_file: Path) -> int:
+    """Parse the reports of an artifact source into a cached Parquet file. Runs in a worker process."""
+    rows = [row for name, contents in read_reports(path) for row in parse_report(name, contents)]
+    table = pa.Table.from_pylist(rows, schema=CASE_SCHEMA)
+    tmp_file = cache_file.with_suffix(".tmp")
+    pq.write_table(table, tmp_file)
+    tmp_file.replace(cache_file)
+    return table.num_rows
+
+
+def find_sources(results_dir: Path, studies: tuple = ()) -> list[ArtifactSource]:
+    """Find the artifacts of every benchmark of every run in a results tree"""
+    sources = []
+    for study_dir in sorted(p for p in results_dir.iterdir() if p.is_dir()):
+        if studies and study_dir.name not in studies:
+            continue
+        study_file = study_dir / "study.json"
+        study_data = {}
+        if study_file.exists():
+            study_data = json.loads(study_file.read_text(encoding="utf-8"))
+
+        for run_dir in sorted(study_dir.iterdir()):
+            match = RUN_DIR_PATTERN.match(run_dir.name)
+            if not run_dir.is_dir() or not match:
+                continue
+            for benchmark_dir in sorted(p for p in run_dir.iterdir() if p.is_dir()):
+                path = next(
+                    (
+                        candidate
+                        for candidate in [
+                            benchmark_dir / ARTIFACTS_DIR,
+                            benchmark_dir / "results.zip",
+                            benchmark_dir / "results.tar.gz",
+                        ]
+                        if candidate.exists()
+                    ),
+                    None,
+                )
+                if path is None:
+                    continue
+                component = None
+                config_file = benchmark_dir / "config.json"
+                if config_file.exists():
+                    try:
+                        component = json.loads(config_file.read_text(encoding="utf-8")).get(
+                            "Component"
+                        )
+                    except json.JSONDecodeError:
+                        pass
+                sources.append(
+                    ArtifactSource(
+                        path=path,
+                        study=study_dir.name,
+                        run_index=int(match["index"]),
+                        run_date=match["date"],
+                        benchmark=benchmark_dir.name,
+                        component=component,
+                        core_version=study_data.get("core_version"),
+                    )
+                )
+    return sources
+
+
+def ingest(
+    results_dir: Path,
+    cache_dir: Path,
+    studies: tuple = (),
+    jobs: int | None = None,
+    on_progress=None,
+) -> pa.Table:
+    """Ingest a results tree into a single table with one row per benchmark case.
+
+    Sources already parsed (same content hash) are read from `cache_dir`, the others are parsed in a process
+    pool of `jobs` workers. `on_progress(source, rows, cached, error)` is called for every source, a source that
+    cannot be parsed is left out of the table and does not stop the others.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    sources = find_sources(results_dir, studies)
+    hashes = [source.content_hash() for source in sources]
+
+    missing = {
+        h: source
+        for source, h in zip(sources, hashes)
+        if not (cache_dir / f"{h}.parquet").exists()
+    }
+    failed = set()
+    if missing:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                h: executor.submit(parse_source, source.path, cache_dir / f"{h}.parquet")
+                for h, source in missing.items()
+            }
+            for h, future in futures.items():
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    failed.add(h)
+                    if on_progress:
+                        on_progress(missing[h], 0, False, e)
+                    continue
+                if on_progress:
+                    on_progress(missing[h], rows, False, None)
+
+    tables = []
+    for source, h in zip(sources, hashes):
+        if h in failed:
+            continue
+        cases = pq.read_table(cache_dir / f"{h}.parquet", schema=CASE_SCHEMA)
+        if on_progress and h not in missing:
+            on_progress(source, cases.num_rows, True, None)
+        context = {
+            "study": source.study,
+            "run_index": source.run_index,
+            "run_date": source.run_date,
+            "benchmark": source.benchmark,
+            "component": source.component,
+            "core_version": source.core_version,
+            "source_hash": h,
+        }
+        for column, value in context.items():
+            cases = cases.append_column(
+                CONTEXT_SCHEMA.field(column),
+                pa.array([value] * cases.num_rows, type=CONTEXT_SCHEMA.field(column).type),
+            )
+        tables.append(cases.select(SCHEMA.names))
+
+    if not tables:
+        return SCHEMA.empty_table()
+    return pa.concat_tables(tables)
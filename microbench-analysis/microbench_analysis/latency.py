@@ -0,0 +1,101 @@
+"""Per-operation latency percentiles of the throughput benchmarks.
+
+The throughput benchmarks record the latency of every storage or queue call of every runner task in a log-linear
+histogram (`LatencyHistogram` of BenchmoniK), printed at the end of every iteration and recorded with the
+iteration in `iterations.json` (`latencies` of a measurement). Values below `2^(bits + 1)` ns have their own bucket,
+larger ones share buckets at most `2^-bits` of their value wide: bucket `shift * 2^bits + (value >> shift)`, where
+`shift` is the bit length of the value minus `bits + 1`.
+
+The bucket of a value does not depend on the rest of the histogram, so the histograms of the runner tasks,
+iterations, launches and runs of a case are merged losslessly by adding their bucket counts. Percentiles are read
+from the merged counts and reported as the highest value of their bucket, like HdrHistogram.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from microbench_analysis.measurements import case_key, load_benchmark_cases, run_dirs
+
+# Iterations whose histograms are used, the others being warmup and jitting
+MEASURED_STAGE = "WorkloadActual"
+
+
+def decode_counts(counts: str) -> tuple[np.ndarray, np.ndarray]:
+    """Bucket indices and counts of an encoded histogram (`delta:count` pairs, by increasing bucket index)"""
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pairs = np.array([pair.split(":") for pair in counts.split(",")], dtype=np.int64)
+    return np.cumsum(pairs[:, 0]), pairs[:, 1]
+
+
+def bucket_upper_bounds(indices: np.ndarray, bits: int) -> np.ndarray:
+    """Highest value (ns) of every bucket"""
+    sub_buckets = 1 << bits
+    indices = np.asarray(indices, dtype=np.int64)
+    shift = np.maximum(indices // sub_buckets - 1, 0)
+    mantissa = indices - shift * sub_buckets
+    return ((mantissa + 1) << shift) - 1
+
+
+def merge_histograms(histograms: list[dict]) -> tuple[int, np.ndarray]:
+    """Sum of the bucket counts of histograms of the same resolution, as (bits, counts indexed by bucket)"""
+    resolutions = {h["bits"] for h in histograms}
+    if len(resolutions) != 1:
+        raise ValueError(f"Cannot merge histograms of different resolutions: {sorted(resolutions)}")
+    decoded = [decode_counts(h["counts"]) for h in histograms]
+    indices = np.concatenate([i for i, _ in decoded])
+    counts = np.concatenate([c for _, c in decoded])
+    return resolutions.pop(), np.bincount(indices, weights=counts).astype(np.int64)
+
+
+def percentiles(bits: int, counts: np.ndarray, quantiles: np.ndarray) -> np.ndarray:
+    """Values (ns) at the given percentiles (0-100) of merged bucket counts"""
+    cumulative = np.cumsum(counts)
+    ranks = np.maximum(np.ceil(np.asarray(quantiles) / 100 * cumulative[-1]), 1)
+    return bucket_upper_bounds(np.searchsorted(cumulative, ranks), bits)
+
+
+def load_latencies(study_dir: Path, run_index: int | None = None) -> dict[tuple[str, str], list[dict]]:
+    """Histograms of the measured iterations of every case and operation of a study, keyed by (`case_key`, operation).
+
+    With `run_index`, only that run is used; otherwise the histograms of every run of the study are pooled.
+    """
+    runs = run_dirs(study_dir)
+    if run_index is not None:
+        if run_index not in runs:
+            raise ValueError(f"Run {run_index} of {study_dir.name} is not synced")
+        runs = {run_index: runs[run_index]}
+
+    histograms = {}
+    for run_dir in runs.values():
+        for benchmark_dir in sorted(p for p in run_dir.iterdir() if p.is_dir()):
+            for case in load_benchmark_cases(benchmark_dir):
+                key = case_key(benchmark_dir.name, case)
+                for measurement in case["measurements"]:
+                    if measurement["stage"] != MEASURED_STAGE:
+                        continue
+                    for histogram in measurement.get("latencies", []):
+                        histograms.setdefault((key, histogram["operation"]), []).append(histogram)
+    return histograms
+
+
+def latency_summary(histograms: dict[tuple[str, str], list[dict]], quantiles: list[float]) -> list[dict]:
+    """Count, percentiles and maximum (ns) of the merged histograms of every case and operation"""
+    summary = []
+    for (case, operation), case_histograms in sorted(histograms.items()):
+        bits, counts = merge_histograms(case_histograms)
+        if not counts.sum():
+            continue
+        values = percentiles(bits, counts, np.array(quantiles))
+        summary.append(
+            {
+                "case": case,
+                "operation": operation,
+                "count": int(counts.sum()),
+                "histograms": len(case_histograms),
+                "percentiles_ns": {f"p{q:g}": int(v) for q, v in zip(quantiles, values)},
+                "max_ns": int(bucket_upper_bounds(np.flatnonzero(counts)[-1], bits)),
+            }
+        )
+    return summary
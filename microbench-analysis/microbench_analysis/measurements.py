@@ -0,0 +1,72 @@
+"""Per-iteration measurements of the benchmark cases of a study run.
+
+`study run` records the BenchmarkDotNet iterations it parsed while the benchmark was running in `iterations.json`.
+Older runs only have the console output in `logs.txt`: `study sync` writes their `iterations.json` with the same
+parser, the one of the runner agent.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from microbench_analysis.ingest import RUN_DIR_PATTERN
+
+
+def case_key(benchmark: str, case: dict) -> str:
+    """Identifier of a benchmark case, stable across runs and studies"""
+    params = ", ".join(f"{k}={v}" for k, v in sorted(case["params"].items()))
+    return f"{benchmark}/{case['type']}.{case['method']}({params})"
+
+
+def case_samples(case: dict) -> np.ndarray:
+    """Time per operation (ns) of every measured iteration of a case.
+
+    `WorkloadResult` iterations are used when BenchmarkDotNet printed them, `WorkloadActual` otherwise.
+    """
+    stages = {m["stage"] for m in case["measurements"]}
+    stage = "WorkloadResult" if "WorkloadResult" in stages else "WorkloadActual"
+    return np.array(
+        [m["ns"] / max(m["ops"], 1) for m in case["measurements"] if m["stage"] == stage],
+        dtype=np.float64,
+    )
+
+
+def load_benchmark_cases(benchmark_dir: Path) -> list[dict]:
+    """Cases of a synced benchmark directory, from its `iterations.json`"""
+    iterations_file = benchmark_dir / "iterations.json"
+    if iterations_file.exists():
+        return json.loads(iterations_file.read_text(encoding="utf-8"))["cases"]
+    return []
+
+
+def run_dirs(study_dir: Path) -> dict[int, Path]:
+    """Synced run directories of a study, by run index"""
+    runs = {}
+    for run_dir in study_dir.iterdir():
+        match = RUN_DIR_PATTERN.match(run_dir.name)
+        if run_dir.is_dir() and match:
+            runs[int(match["index"])] = run_dir
+    return dict(sorted(runs.items()))
+
+
+def load_samples(study_dir: Path, run_index: int | None = None) -> dict[str, np.ndarray]:
+    """Samples of every case of a study, keyed by `case_key`.
+
+    With `run_index`, only that run is used; otherwise the samples of every run of the study are pooled.
+    """
+    runs = run_dirs(study_dir)
+    if run_index is not None:
+        if run_index not in runs:
+            raise ValueError(f"Run {run_index} of {study_dir.name} is not synced")
+        runs = {run_index: runs[run_index]}
+
+    samples = {}
+    for run_dir in runs.values():
+        for benchmark_dir in sorted(p for p in run_dir.iterdir() if p.is_dir()):
+            for case in load_benchmark_cases(benchmark_dir):
+                values = case_samples(case)
+                if len(values):
+                    key = case_key(benchmark_dir.name, case)
+                    samples[key] = np.concatenate([samples.get(key, []), values])
+    return samples
@@ -0,0 +1,254 @@
+"""Selected files of the results archives of a study, read in place from the artifact store.
+
+`study sync` downloads whole `results.zip` archives, HTML reports and logs included. A zip can instead be read
+with ranged requests: its central directory first, then only the members that are needed. `fetch_study` extracts
+the matching members of every archive listed in the `study.json` snapshot of a results tree into
+`<benchmark>/BenchmarkDotNet.Artifacts/`, where `ingest` finds them. `microbenchmark.py study cat` and
+`study extract` are run by the `cat` and `fetch` commands.
+
+Newer runs store their artifacts by content instead: the `results` of a benchmark is a JSON manifest listing the
+path, SHA-256 and size of every file, each file being a blob of the artifact store. Only the manifest and the
+blobs of the matching files are read.
+
+Reading from S3 needs boto3 (`uv sync --project microbench-analysis --extra s3`).
+"""
+
+import fnmatch
+import io
+import json
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+# Smallest ranged read of an archive
+BLOCK_SIZE = 64 * 1024
+DEFAULT_PATTERNS = ("*-report.csv",)
+# Artifacts manifests written by the runner agent (`store-artifacts`)
+MANIFEST_SUFFIX = "_manifest.json"
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable read-only file over ranged reads of a remote object.
+
+    `fetch(start, end)` returns the bytes from `start` to `end` included. Every read fetches at least `block_size`
+    bytes, and reads near the end fetch the last block, so that opening a zip costs a single request.
+    """
+
+    def __init__(self, fetch, size: int, block_size: int = BLOCK_SIZE):
+        self.fetch = fetch
+        self.size = size
+        self.block_size = block_size
+        self.position = 0
+        self.block_start = 0
+        self.block = b""
+        self.bytes_fetched = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(offset, 0)
+        return self.position
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.size - self.position)
+        if n <= 0:
+            return 0
+        end = self.position + n
+        if not self.block_start <= self.position or end > self.block_start + len(self.block):
+            start = max(min(self.position, self.size - self.block_size), 0)
+            self.block = self.fetch(start, min(max(end, start + self.block_size), self.size) - 1)
+            self.block_start = start
+            self.bytes_fetched += len(self.block)
+        offset = self.position - self.block_start
+        buffer[:n] = self.block[offset : offset + n]
+        self.position = end
+        return n
+
+
+class CountingReader(io.RawIOBase):
+    """Readable stream counting the bytes read from `source`"""
+
+    def __init__(self, source):
+        self.source = source
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        buffer[: len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def open_archive(uri: str, s3=None):
+    """Readable file of an archive: the file of a file:// URI, or ranged reads of an s3:// object"""
+    if uri.startswith("file://"):
+        return open(unquote(urlparse(uri).path), "rb")
+    bucket, key = uri.removeprefix("s3://").split("/", 1)
+    head = s3.head_object(Bucket=bucket, Key=key)
+
+    def fetch(start: int, end: int) -> bytes:
+        response = s3.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=head["ETag"]
+        )
+        return response["Body"].read()
+
+    return RangeReader(fetch, head["ContentLength"])
+
+
+def read_object(uri: str, s3=None) -> bytes:
+    """Contents of a file:// or s3:// object"""
+    if uri.startswith("file://"):
+        return Path(unquote(urlparse(uri).path)).read_bytes()
+    bucket, key = uri.removeprefix("s3://").split("/", 1)
+    return s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+
+def read_manifest_members(uri: str, patterns: tuple, s3, stats: dict):
+    """Yield (path, contents) of the files of an artifacts manifest matching one of the glob patterns"""
+    contents = read_object(uri, s3)
+    manifest = json.loads(contents)
+    bytes_read = len(contents)
+    for entry in manifest["files"]:
+        if any(fnmatch.fnmatch(entry["path"], p) for p in patterns):
+            sha256 = entry["sha256"]
+            blob = read_object(f"{manifest['blobs']}/{sha256[:2]}/{sha256}", s3)
+            bytes_read += len(blob)
+            yield entry["path"], blob
+    stats["read"] = stats.get("read", 0) + bytes_read
+    stats["size"] = stats.get("size", 0) + len(contents) + sum(entry["size"] for entry in manifest["files"])
+
+
+def read_members(uri: str, patterns: tuple, s3=None, stats: dict | None = None):
+    """Yield (name, contents) of the members of a results archive matching one of the glob patterns.
+
+    Zips are read in place: only their central directory and the selected members are transferred. Streamed
+    `.tar.gz` archives have no index and are read whole, artifacts manifests only read the selected blobs.
+    `stats` accumulates the bytes read and the archive sizes.
+    """
+    stats = stats if stats is not None else {}
+    if uri.endswith(MANIFEST_SUFFIX):
+        yield from read_manifest_members(uri, patterns, s3, stats)
+        return
+    with open_archive(uri, s3) as f:
+        if uri.endswith(".tar.gz"):
+            reader = CountingReader(f)
+            with tarfile.open(fileobj=reader, mode="r|gz") as archive:
+                for member in archive:
+                    if member.isfile() and any(fnmatch.fnmatch(member.name, p) for p in patterns):
+                        yield member.name, archive.extractfile(member).read()
+            size = bytes_read = reader.bytes_read
+        else:
+            # Local zips are read in place too: count the compressed size of the selected members
+            members_read = 0
+            with zipfile.ZipFile(f) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and any(fnmatch.fnmatch(info.filename, p) for p in patterns):
+                        yield info.filename, archive.read(info)
+                        members_read += info.compress_size
+            if isinstance(f, RangeReader):
+                bytes_read, size = f.bytes_fetched, f.size
+            else:
+                bytes_read, size = members_read, os.fstat(f.fileno()).st_size
+    stats["read"] = stats.get("read", 0) + bytes_read
+    stats["size"] = stats.get("size", 0) + size
+
+
+def select_archives(study_data: dict, run_index: int | None = None, benchmark_patterns: tuple = ()) -> list:
+    """(run index, run, benchmark name, results URI) of the stored results archives of a study"""
+    if run_index is not None and run_index >= len(study_data["runs"]):
+        raise ValueError(f"Run index {run_index} not found (max: {len(study_data['runs']) - 1})")
+    archives = []
+    for index, run in enumerate(study_data["runs"]):
+        if run_index is not None and index != run_index:
+            continue
+        for benchmark_name, benchmark in run["benchmarks"].items():
+            uri = benchmark.get("results", "")
+            if not uri.startswith(("s3://", "file://")):
+                continue
+            if benchmark_patterns and not any(
+                fnmatch.fnmatch(Path(benchmark_name).stem, p) for p in benchmark_patterns
+            ):
+                continue
+            archives.append((index, run, benchmark_name, uri))
+    return archives
+
+
+def run_dir_name(index: int, run: dict) -> str:
+    """Directory of a run in a results tree, as written by `study sync`"""
+    return f"run_{index}_{run['date'].split('T')[0]}"
+
+
+def fetch_study(
+    study_dir: Path,
+    s3=None,
+    patterns: tuple = DEFAULT_PATTERNS,
+    run_index: int | None = None,
+    on_archive=None,
+    benchmark_patterns: tuple = (),
+) -> dict:
+    """Extract the members matching the glob patterns of the results archives of a study into its results tree.
+
+    Benchmarks whose `results.zip` or artifacts manifest was synced are skipped. `on_archive(benchmark_dir, members,
+    bytes_read, error)` is called for every archive read, an archive that cannot be read does not stop the others.
+    Returns the number of archives, failures and members, the bytes read and the total size of the archives.
+    """
+    study_data = json.loads((study_dir / "study.json").read_text(encoding="utf-8"))
+    stats = {"archives": 0, "failures": 0, "members": 0, "read": 0, "size": 0}
+    for index, run, benchmark_name, uri in select_archives(study_data, run_index, benchmark_patterns):
+        benchmark_dir = study_dir / run_dir_name(index, run) / Path(benchmark_name).stem
+        if (benchmark_dir / "results.zip").exists() or (benchmark_dir / "manifest.json").exists():
+            continue
+
+        members = 0
+        read_before = stats["read"]
+        error = None
+        try:
+            for name, contents in read_members(uri, patterns, s3, stats):
+                target = benchmark_dir / name
+                if benchmark_dir.resolve() not in target.resolve().parents:
+                    raise ValueError(f"{name} of {uri} is outside of the archive root")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(contents)
+                members += 1
+        except Exception as e:
+            error = e
+            stats["failures"] += 1
+
+        config_file = benchmark_dir / "config.json"
+        if not config_file.exists() and "source" in run["benchmarks"][benchmark_name]:
+            benchmark_dir.mkdir(parents=True, exist_ok=True)
+            config_file.write_text(run["benchmarks"][benchmark_name]["source"], encoding="utf-8")
+        stats["archives"] += 1
+        stats["members"] += members
+        if on_archive:
+            on_archive(benchmark_dir, members, stats["read"] - read_before, error)
+    return stats
+
+
+def cat_study(
+    study_data: dict,
+    patterns: tuple,
+    s3=None,
+    run_index: int | None = None,
+    benchmark_patterns: tuple = (),
+):
+    """Yield (path, contents) of the archive members of a study matching the glob patterns, without extracting them"""
+    for index, _, benchmark_name, uri in select_archives(study_data, run_index, benchmark_patterns):
+        for name, contents in read_members(uri, patterns, s3):
+            yield f"run_{index}/{Path(benchmark_name).stem}/{name}", contents
@@ -0,0 +1,162 @@
+"""Universal Scalability Law fits of throughput against `NumConcurrentRunners`.
+
+The USL models the throughput of N concurrent runners as
+
+    X(N) = λ N / (1 + σ (N - 1) + κ N (N - 1))
+
+with λ the throughput of a single runner, σ the contention (serialized share of the work) and κ the coherency
+delay (crosstalk between runners). With κ > 0 the throughput peaks at N* = sqrt((1 - σ) / κ); with κ = 0 it is
+Amdahl's law, rising towards λ / σ.
+
+N / X(N) = a + b (N - 1) + c N (N - 1), with a = 1 / λ, b = σ / λ and c = κ / λ, is linear in (a, b, c): every
+series is fitted by weighted least squares on that form, with weights 1 / (N / X)^2 so that every point counts
+for its relative error. The normal equations of all the series of a study are stacked and solved at once. The
+standard errors of σ, κ, N* and X(N*) are propagated from the covariance of (a, b, c) to first order.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Series with fewer distinct concurrencies are not fitted: three parameters and at least one degree of freedom
+MIN_CONCURRENCIES = 4
+# κ is only kept when it is this many standard errors above zero, the series is fitted with Amdahl's law otherwise
+KAPPA_SIGNIFICANCE = 2.0
+
+
+@dataclass
+class ScalabilityFit:
+    """Fit of one throughput series"""
+
+    series: tuple
+    model: str
+    points: int
+    # Throughput of a single runner, items/s
+    lambda_: float
+    sigma: float
+    sigma_se: float
+    kappa: float
+    kappa_se: float
+    # Concurrency of the peak (None with Amdahl's law, whose throughput keeps rising) and its throughput
+    peak_concurrency: float | None
+    peak_concurrency_se: float | None
+    peak_throughput: float
+    peak_throughput_se: float
+    # Root mean square of the relative residuals of the throughput
+    relative_rmse: float
+
+
+def throughput_series(aggregates: list[dict]) -> dict[tuple, list[tuple[int, float]]]:
+    """(concurrency, throughput) points of every run, by (study, component, benchmark type, method, family)"""
+    series = {}
+    for aggregate in aggregates:
+        for case in aggregate["cases"]:
+            key = (
+                aggregate["study"],
+                case["component"],
+                case["benchmark_type"],
+                case["method"],
+                case["family"],
+            )
+            series.setdefault(key, []).append((case["concurrency"], case["throughput"]))
+    return series
+
+
+def solve_weighted(design: np.ndarray, y: np.ndarray, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Weighted least squares of every series at once.
+
+    `design` is (series x points x parameters), `y` and `weights` (series x points), padding points having a zero
+    weight. Returns the parameters and their covariance matrices.
+    """
+    # The columns of the USL span orders of magnitude (1, N, N²): they are scaled to a unit weighted norm
+    scale = np.sqrt(np.einsum("sp,spi->si", weights, design**2))
+    scaled = design / scale[:, None, :]
+    weighted = scaled * weights[:, :, None]
+    inverse = np.linalg.inv(np.einsum("spi,spj->sij", weighted, scaled))
+    params = np.einsum("sij,sj->si", inverse, np.einsum("spi,sp->si", weighted, y))
+    residuals = y - np.einsum("spi,si->sp", scaled, params)
+    dof = np.count_nonzero(weights, axis=1) - design.shape[2]
+    variance = np.sum(weights * residuals**2, axis=1) / dof
+    covariance = inverse * variance[:, None, None] / (scale[:, :, None] * scale[:, None, :])
+    return params / scale, covariance
+
+
+def fit_scalability(series: dict[tuple, list[tuple[int, float]]]) -> list[ScalabilityFit]:
+    """USL fit of every series with at least MIN_CONCURRENCIES distinct concurrencies, Amdahl's law when κ is not
+    significant"""
+    keys = [key for key, points in series.items() if len({n for n, _ in points}) >= MIN_CONCURRENCIES]
+    if not keys:
+        return []
+    width = max(len(series[key]) for key in keys)
+    n = np.ones((len(keys), width))
+    x = np.ones((len(keys), width))
+    weights = np.zeros((len(keys), width))
+    for i, key in enumerate(keys):
+        concurrencies, throughputs = np.array(series[key], dtype=np.float64).T
+        n[i, : len(concurrencies)] = concurrencies
+        x[i, : len(throughputs)] = throughputs
+        weights[i, : len(throughputs)] = 1.0
+    y = n / x
+    # Every point weighs for its relative error
+    weights = weights / y**2
+
+    usl_design = np.stack([np.ones_like(n), n - 1, n * (n - 1)], axis=2)
+    usl, usl_covariance = solve_weighted(usl_design, y, weights)
+    amdahl, amdahl_covariance = solve_weighted(usl_design[:, :, :2], y, weights)
+
+    # Parameters of the chosen model, as (a, b, c) with c = 0 for Amdahl's law
+    with np.errstate(divide="ignore", invalid="ignore"):
+        use_usl = usl[:, 2] / np.sqrt(usl_covariance[:, 2, 2]) >= KAPPA_SIGNIFICANCE
+    params = np.where(use_usl[:, None], usl, np.pad(amdahl, ((0, 0), (0, 1))))
+    covariance = np.where(
+        use_usl[:, None, None], usl_covariance, np.pad(amdahl_covariance, ((0, 0), (0, 1), (0, 1)))
+    )
+    a, b, c = params.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = b / a
+        kappa = c / a
+        # Gradients of σ = b / a and κ = c / a with respect to (a, b, c)
+        sigma_grad = np.stack([-b / a**2, 1 / a, np.zeros_like(a)], axis=1)
+        kappa_grad = np.stack([-c / a**2, np.zeros_like(a), 1 / a], axis=1)
+        # N* = sqrt((a - b) / c), at least one runner when the contention alone makes the throughput fall (σ > 1)
+        peak_n = np.where(use_usl, np.sqrt(np.maximum((a - b) / c, 1.0)), np.nan)
+        peak_grad = np.stack([1 / (2 * peak_n * c), -1 / (2 * peak_n * c), -peak_n / (2 * c)], axis=1)
+        # Amdahl's law: the throughput tends to 1 / b, without bound when there is no contention
+        denominator = a + b * (peak_n - 1) + c * peak_n * (peak_n - 1)
+        peak_x = np.where(use_usl, peak_n / denominator, np.where(b > 0, 1 / b, np.inf))
+        # dX(N*)/dN* = 0: only the explicit dependency on (a, b, c) counts
+        peak_x_grad = np.where(
+            use_usl[:, None],
+            -np.stack([peak_n, peak_n * (peak_n - 1), peak_n**2 * (peak_n - 1)], axis=1) / denominator[:, None] ** 2,
+            np.stack([np.zeros_like(b), -1 / b**2, np.zeros_like(b)], axis=1),
+        )
+
+        def standard_error(gradient):
+            return np.sqrt(np.einsum("si,sij,sj->s", gradient, covariance, gradient))
+
+        fitted = n / np.einsum("spi,si->sp", usl_design, params)
+        relative = np.where(weights > 0, (fitted - x) / x, 0.0)
+        rmse = np.sqrt(np.sum(relative**2, axis=1) / np.count_nonzero(weights, axis=1))
+
+        sigma_se, kappa_se = standard_error(sigma_grad), standard_error(kappa_grad)
+        peak_n_se, peak_x_se = standard_error(peak_grad), standard_error(peak_x_grad)
+
+    return [
+        ScalabilityFit(
+            series=key,
+            model="usl" if use_usl[i] else "amdahl",
+            points=len(series[key]),
+            lambda_=float(1 / a[i]),
+            sigma=float(sigma[i]),
+            sigma_se=float(sigma_se[i]),
+            kappa=float(kappa[i]),
+            kappa_se=float(kappa_se[i]),
+            peak_concurrency=float(peak_n[i]) if use_usl[i] else None,
+            peak_concurrency_se=float(peak_n_se[i]) if use_usl[i] else None,
+            peak_throughput=float(peak_x[i]),
+            peak_throughput_se=float(peak_x_se[i]),
+            relative_rmse=float(rmse[i]),
+        )
+        for i, key in enumerate(keys)
+    ]
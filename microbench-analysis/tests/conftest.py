@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The microbench_analysis package is used from the project directory, it is not installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from microbench_analysis.calibration import (
+    calibration_scores,
+    degraded_metrics,
+    fingerprint_differences,
+    study_calibrations,
+)
+
+
+def environment(sha256, fsync_ms, instance_type="c5.xlarge", kernel="6.1"):
+    return {
+        "fingerprint": {"instance_type": instance_type, "cpu_model": "Xeon", "cpus": 4, "kernel": kernel},
+        "cpu": {"sha256_mb_s": sha256, "loop_mops": 50.0},
+        "disks": [
+            {"path": "/home/ec2-user", "write_mb_s": 400.0, "read_mb_s": 800.0, "fsync_ms": fsync_ms},
+            {"path": "/mnt/efs", "error": "No such file or directory"},
+        ],
+        "endpoints": [{"component": "Redis", "address": "redis:6379", "connect_ms": 0.3}],
+    }
+
+
+def study(*runs):
+    return {"name": "s", "runs": [{"environment": run} for run in runs]}
+
+
+def test_scores_against_the_same_hardware():
+    calibrations = study_calibrations(
+        study(
+            {"a": environment(1000, 2.0), "b": environment(1000, 2.0)},
+            {"a": environment(500, 8.0), "b": environment(1000, 2.0)},
+            # Slower hardware is not compared to the others
+            {"a": environment(250, 2.0, instance_type="t3.small")},
+        )
+    )
+    names, scores = calibration_scores(calibrations)
+    assert "/mnt/efs write_mb_s" not in names
+    sha256 = scores[:, names.index("sha256_mb_s")]
+    fsync = scores[:, names.index("/home/ec2-user fsync_ms")]
+    np.testing.assert_allclose(sha256, [1, 1, 0.5, 1, 1])
+    # Lower is better: 4 times the median latency scores 1/4
+    np.testing.assert_allclose(fsync, [1, 1, 0.25, 1, 1])
+
+    degraded = degraded_metrics(calibrations, threshold=0.2)
+    assert len(degraded) == 1
+    calibration, metrics = degraded[0]
+    assert (calibration.run_index, calibration.runner) == (1, "a")
+    assert metrics == pytest.approx({"sha256_mb_s": 0.5, "/home/ec2-user fsync_ms": 0.25})
+
+
+def test_fingerprint_differences():
+    baseline = study_calibrations(study({"a": environment(1000, 2.0)}))
+    candidate = study_calibrations(study({"a": environment(1000, 2.0, kernel="6.8")}))
+    assert fingerprint_differences(baseline, baseline) == {}
+    assert fingerprint_differences(baseline, candidate) == {"kernel": ({"6.1"}, {"6.8"})}
@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+
+from microbench_analysis.compare import compare_samples, erfc, mann_whitney_p_values, pad
+
+
+def test_erfc_matches_math():
+    x = np.linspace(-6, 10, 1601)
+    expected = np.array([math.erfc(v) for v in x])
+    np.testing.assert_allclose(erfc(x), expected, rtol=2e-7)
+
+
+def test_erfc_shape_and_nan():
+    values = erfc(np.array([[0.0, np.nan], [np.inf, -np.inf]]))
+    assert values.shape == (2, 2)
+    assert values[0, 0] == pytest.approx(1.0, rel=1e-6)
+    assert np.isnan(values[0, 1])
+    assert values[1, 0] == 0.0
+    assert values[1, 1] == pytest.approx(2.0)
+
+
+def test_mann_whitney_p_values():
+    baseline = pad([np.array([1.0, 2.0, 3.0]), np.array([1.0, 2.0, 3.0])])
+    candidate = pad([np.array([4.0, 5.0, 6.0]), np.array([1.0, 2.0, 3.0])])
+    p_values = mann_whitney_p_values(baseline, candidate)
+    # U = 0, mean 4.5, sigma sqrt(9 * 7 / 12), with continuity correction
+    z = (4.5 - 0.5) / math.sqrt(9 * 7 / 12)
+    assert p_values[0] == pytest.approx(math.erfc(z / math.sqrt(2)), rel=1e-6)
+    assert p_values[1] == pytest.approx(1.0, rel=1e-6)
+
+
+def test_compare_samples():
+    rng = np.random.default_rng(1)
+    baseline = {
+        "slower": rng.normal(100, 1, 30),
+        "same": rng.normal(100, 1, 30),
+        "faster": rng.normal(100, 1, 30),
+        "baseline only": rng.normal(100, 1, 30),
+    }
+    candidate = {
+        "slower": rng.normal(120, 1, 20),
+        "same": rng.normal(100, 1, 25),
+        "faster": rng.normal(80, 1, 30),
+    }
+    comparison = compare_samples(baseline, candidate, resamples=500)
+    assert comparison.cases == ["faster", "same", "slower"]
+    assert comparison.change == pytest.approx([-0.2, 0.0, 0.2], abs=0.01)
+    assert (comparison.ci_low <= comparison.change).all()
+    assert (comparison.change <= comparison.ci_high).all()
+    assert comparison.regressions(0.05, 0.05).tolist() == [False, False, True]
+    assert comparison.improvements(0.05, 0.05).tolist() == [True, False, False]
+
+
+def test_compare_samples_without_common_cases():
+    with pytest.raises(ValueError):
+        compare_samples({"a": np.ones(3)}, {"b": np.ones(3)})
@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+import pytest
+
+from microbench_analysis.history import (
+    STATE_FILE,
+    detect_change_points,
+    load_history,
+    update_change_points,
+    update_history,
+)
+
+
+def aggregate(study, version, date, throughputs, run_index=0):
+    return {
+        "study": study,
+        "run_index": run_index,
+        "run_date": date,
+        "core_version": version,
+        "cases": [
+            {
+                "component": "Redis",
+                "benchmark_type": "RedisThroughputBenchmark",
+                "method": "AddObject",
+                "family": f"ObjectSizeBytes={size}",
+                "concurrency": 5,
+                "mean_ns": 1e9 / throughput,
+                "throughput": throughput,
+            }
+            for size, throughput in throughputs.items()
+        ],
+    }
+
+
+def releases(levels):
+    """Aggregates of one study per release, `levels` being the throughput of two cases at every release"""
+    return [
+        aggregate(f"release-{i:02d}", f"0.{i}.0", f"2025-01-{i + 1:02d}", {1024: small, 65536: large})
+        for i, (small, large) in enumerate(levels)
+    ]
+
+
+def test_detect_change_points():
+    rng = np.random.default_rng(1)
+    noise = rng.normal(0, 0.01, (3, 40))
+    levels = np.array(
+        [
+            np.r_[np.full(20, 10.0), np.full(20, 9.7)],
+            np.full(40, 10.0),
+            np.r_[np.full(10, 10.0), np.full(15, 10.3), np.full(15, 10.0)],
+        ]
+    )
+    values = levels + noise
+    # A single slow release is not a sustained shift
+    values[1, 30] -= 0.5
+    values[2, 5] = np.nan
+    found = detect_change_points(values, np.zeros(3, dtype=np.intp), 2, 0.05, 4.0)
+    assert [p for p, _ in found[0]] == [20]
+    assert found[1] == []
+    assert [p for p, _ in found[2]] == [10, 25]
+
+
+def test_history_is_ordered_by_version_and_appended(tmp_path):
+    history_dir = tmp_path / "history"
+    studies = releases([(1000, 100)] * 6 + [(700, 100)] * 3)
+    # Added out of order: 0.10.0 sorts after 0.9.0
+    assert len(update_history(studies[::-1], history_dir)) == 9
+    ordered, cases, values = load_history(history_dir)
+    assert [s["core_version"] for s in ordered] == [f"0.{i}.0" for i in range(9)]
+    assert values.shape == (2, 9)
+
+    change_points, reused = update_change_points(history_dir, 2, 0.05, 4.0)
+    assert reused == 0
+    assert len(change_points) == 1
+    assert change_points[0].core_version == "0.6.0"
+    assert change_points[0].change == pytest.approx(-0.3)
+
+    # Unchanged studies are not written again
+    assert update_history(studies, history_dir) == []
+
+    # A new release where the other case steps down: the earlier change point is kept
+    studies += releases([(700, 100)] * 9 + [(700, 50)] * 3)[9:]
+    assert update_history(studies, history_dir) == ["release-09", "release-10", "release-11"]
+    change_points, reused = update_change_points(history_dir, 2, 0.05, 4.0)
+    assert reused == 9
+    assert sorted((p.core_version, round(p.change, 3)) for p in change_points) == [
+        ("0.6.0", -0.3),
+        ("0.9.0", -0.5),
+    ]
+    state = json.loads((history_dir / STATE_FILE).read_text())
+    assert len(state["studies"]) == 12
+
+    # Another run of an examined study invalidates the kept change points
+    update_history(studies + [aggregate("release-03", "0.3.0", "2025-01-04", {1024: 1000}, 1)], history_dir)
+    _, reused = update_change_points(history_dir, 2, 0.05, 4.0)
+    assert reused == 0
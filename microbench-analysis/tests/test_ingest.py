@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from microbench_analysis.ingest import ingest, parse_number, parse_report
+
+REPORT_NAME = "BenchmoniK.Benchmarks.ObjectStorage.RedisThroughputBenchmark-report.csv"
+
+
+@pytest.mark.parametrize(
+    "value, decimal_comma, expected",
+    [
+        ("1,234.5", False, 1234.5),
+        ("1.234,5", True, 1234.5),
+        ("12 345,25", True, 12345.25),
+        ("NA", False, None),
+        ("-", True, None),
+        ("not a number", False, None),
+    ],
+)
+def test_parse_number(value, decimal_comma, expected):
+    assert parse_number(value, decimal_comma) == expected
+
+
+def test_parse_report():
+    contents = (
+        "Method,Job,IterationCount,TransferParameters,NumConcurrentRunners,Mode,Mean [ns],Error [ns],StdDev [ns],"
+        "Median [ns],Allocated [KB]\n"
+        'AddObject,Job-ABC,12,"(1, 2)",5,fast,"1,234,567.5",10.5,3.25,"1,234,000.0","2,048.5"\n'
+        "GetObject,Job-ABC,12,\"(3, 4)\",10,slow,NA,NA,NA,NA,NA\n"
+    )
+    first, second = parse_report(REPORT_NAME, contents)
+    assert first["benchmark_type"] == "RedisThroughputBenchmark"
+    assert first["method"] == "AddObject"
+    assert (first["chunk_download_size"], first["chunk_upload_size"]) == (1, 2)
+    assert first["num_concurrent_runners"] == 5
+    # Unknown parameters are kept as JSON, job characteristics are dropped
+    assert json.loads(first["params"]) == {"Mode": "fast"}
+    assert first["mean_ns"] == 1234567.5
+    assert first["allocated_kb"] == 2048.5
+    assert second["num_concurrent_runners"] == 10
+    assert second["mean_ns"] is None
+
+
+def test_parse_report_european_format():
+    # CsvSeparator.CurrentCulture with a French culture: `;` separator, `,` decimal mark, `.` thousands
+    contents = (
+        "Method;Job;NumConcurrentRunners;Mean [ns];Error [ns];StdDev [ns];Median [ns]\n"
+        "AddObject;Job-ABC;5;1.234.567,5;10,5;3,25;1.234.000\n"
+    )
+    [row] = parse_report(REPORT_NAME, contents)
+    assert row["num_concurrent_runners"] == 5
+    assert row["mean_ns"] == 1234567.5
+    assert row["error_ns"] == 10.5
+    assert row["stddev_ns"] == 3.25
+    assert row["median_ns"] == 1234000.0
+
+
+def test_ingest_skips_unreadable_archives(tmp_path):
+    run_dir = tmp_path / "results" / "study" / "run_0_2026-01-01"
+    (run_dir / "broken").mkdir(parents=True)
+    (run_dir / "broken" / "results.zip").write_bytes(b"not a zip")
+    artifacts = run_dir / "redis" / "BenchmarkDotNet.Artifacts" / "results"
+    artifacts.mkdir(parents=True)
+    (artifacts / REPORT_NAME).write_text("Method,Mean [ns]\nAddObject,100\n", encoding="utf-8")
+
+    progress = []
+    table = ingest(
+        tmp_path / "results",
+        tmp_path / "cache",
+        on_progress=lambda source, rows, cached, error: progress.append((source.benchmark, rows, error)),
+    )
+    assert table.column("benchmark").to_pylist() == ["redis"]
+    assert table.column("mean_ns").to_pylist() == [100.0]
+    errors = {benchmark: error for benchmark, _, error in progress}
+    assert errors["redis"] is None
+    assert errors["broken"] is not None
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+
+from microbench_analysis.latency import (
+    bucket_upper_bounds,
+    latency_summary,
+    load_latencies,
+    merge_histograms,
+    percentiles,
+)
+
+# Printed by BenchmoniK's LatencyHistogram for 0, 1, 255, 256, 257, 1000, 1e6, 1e6 and 123456789012 ns
+ENCODED = "0:1,1:1,254:1,1:2,250:1,1274:2,2161:1"
+
+
+def bucket_index(value: int, bits: int = 7) -> int:
+    shift = max(0, value.bit_length() - (bits + 1))
+    return shift * (1 << bits) + (value >> shift)
+
+
+def test_bucket_bounds_match_the_encoding():
+    values = np.unique(np.random.default_rng(0).integers(0, 10**12, 10_000))
+    indices = np.array([bucket_index(int(v)) for v in values])
+    upper = bucket_upper_bounds(indices, 7)
+    assert (upper >= values).all()
+    # Within 2^-7 of the value, and the next value is in the next bucket
+    assert (upper - values <= values / 128).all()
+    assert [bucket_index(int(u) + 1) for u in upper[:100]] == list(indices[:100] + 1)
+
+
+def test_merge_is_lossless():
+    bits, counts = merge_histograms(
+        [{"bits": 7, "counts": ENCODED}, {"bits": 7, "counts": "1:3"}, {"bits": 7, "counts": ""}]
+    )
+    assert bits == 7
+    assert counts.sum() == 12
+    assert counts[1] == 4
+    assert counts[bucket_index(1_000_000)] == 2
+    assert counts[bucket_index(123456789012)] == 1
+
+
+def test_percentiles():
+    bits, counts = merge_histograms([{"bits": 7, "counts": ENCODED}])
+    p50, p80, p100 = percentiles(bits, counts, np.array([50, 80, 100]))
+    # 9 values: the 5th is 257, in the bucket of 256 and 257, the 8th is 1e6
+    assert p50 == 257
+    assert 10**6 <= p80 <= 10**6 * 129 / 128
+    assert 123456789012 <= p100 <= 123456789012 * 129 / 128
+
+
+def test_load_latencies_pools_runner_tasks_and_iterations(tmp_path):
+    benchmark_dir = tmp_path / "run_0_2025-01-01" / "redis"
+    benchmark_dir.mkdir(parents=True)
+
+    def measurement(stage, *counts):
+        histograms = [
+            {"operation": "AddOrUpdateAsync", "runner": runner, "bits": 7, "counts": c}
+            for runner, c in enumerate(counts)
+        ]
+        return {"launch": 1, "stage": stage, "index": 1, "ops": 1, "ns": 1e6, "latencies": histograms}
+
+    case = {
+        "type": "RedisThroughputBenchmark",
+        "method": "AddObject",
+        "params": {"NumConcurrentRunners": "2"},
+        "measurements": [
+            measurement("WorkloadWarmup", "5000:1"),
+            measurement("WorkloadActual", "100:1", "100:1"),
+            measurement("WorkloadActual", "100:2", "120:1"),
+            {"launch": 1, "stage": "WorkloadResult", "index": 1, "ops": 1, "ns": 1e6},
+        ],
+    }
+    (benchmark_dir / "iterations.json").write_text(json.dumps({"cases": [case]}))
+
+    [row] = latency_summary(load_latencies(tmp_path), [50, 100])
+    assert row["case"] == "redis/RedisThroughputBenchmark.AddObject(NumConcurrentRunners=2)"
+    assert (row["operation"], row["count"], row["histograms"]) == ("AddOrUpdateAsync", 5, 4)
+    assert row["percentiles_ns"] == {"p50": 100, "p100": 120}
+    assert row["max_ns"] == 120
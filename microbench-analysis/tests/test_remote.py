@@ -0,0 +1,133 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from microbench_analysis.remote import BLOCK_SIZE, RangeReader, read_members
+
+
+def make_zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, contents in members.items():
+            archive.writestr(name, contents)
+    return buffer.getvalue()
+
+
+class FakeS3:
+    """The head_object and ranged get_object calls of an S3 client, over one object"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests = []
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.data), "ETag": '"etag"'}
+
+    def get_object(self, Bucket, Key, Range, IfMatch):
+        start, end = map(int, Range.removeprefix("bytes=").split("-"))
+        self.requests.append((start, end))
+        return {"Body": io.BytesIO(self.data[start : end + 1])}
+
+
+def test_range_reader_reads_and_seeks():
+    data = bytes(range(256)) * 40
+    fetches = []
+
+    def fetch(start, end):
+        fetches.append((start, end))
+        return data[start : end + 1]
+
+    reader = RangeReader(fetch, len(data), block_size=1024)
+    reader.seek(-10, io.SEEK_END)
+    assert reader.read(10) == data[-10:]
+    # Reads near the end fetch the whole last block
+    assert fetches == [(len(data) - 1024, len(data) - 1)]
+    reader.seek(len(data) - 500)
+    assert reader.read(100) == data[-500:-400]
+    assert len(fetches) == 1
+    reader.seek(100)
+    assert reader.read(2000) == data[100:2100]
+    assert reader.read(0) == b""
+    reader.seek(0, io.SEEK_END)
+    assert reader.read(10) == b""
+    assert reader.bytes_fetched == 1024 + 2000
+
+
+def test_read_members_from_s3_reads_only_the_selected_members():
+    report = b"Method,Mean [ns]\nAddObject,100\n"
+    data = make_zip(
+        {
+            "results/Redis-report.csv": report,
+            "results/Redis-report.html": os.urandom(1024 * 1024),
+            "logs/run.log": b"log",
+        }
+    )
+    s3 = FakeS3(data)
+    stats = {}
+    members = list(read_members("s3://bucket/study/results.zip", ("*-report.csv",), s3, stats))
+    assert members == [("results/Redis-report.csv", report)]
+    assert stats["size"] == len(data)
+    # The block of the central directory and the block of the report
+    assert stats["read"] == 2 * BLOCK_SIZE
+    assert len(s3.requests) == 2
+
+
+def test_read_members_from_a_local_zip(tmp_path):
+    data = make_zip({"a-report.csv": b"x" * 1000, "b.html": b"y" * 1000})
+    path = tmp_path / "results.zip"
+    path.write_bytes(data)
+    stats = {}
+    members = dict(read_members(path.as_uri(), ("*.csv",), stats=stats))
+    assert members == {"a-report.csv": b"x" * 1000}
+    with zipfile.ZipFile(path) as archive:
+        assert stats["read"] == archive.getinfo("a-report.csv").compress_size
+    assert stats["size"] == len(data)
+
+
+def test_read_members_from_a_tar_gz(tmp_path):
+    path = tmp_path / "results.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        for name, contents in {"a-report.csv": b"report", "b.html": b"html"}.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            archive.addfile(info, io.BytesIO(contents))
+    stats = {}
+    assert list(read_members(path.as_uri(), ("*-report.csv",), stats=stats)) == [("a-report.csv", b"report")]
+    # Streamed archives are read whole
+    assert stats["read"] == stats["size"] == path.stat().st_size
+
+
+def test_read_members_fails_on_a_changed_object():
+    s3 = FakeS3(make_zip({"a-report.csv": b"x"}))
+    s3.data = b"truncated"
+    with pytest.raises(zipfile.BadZipFile):
+        list(read_members("s3://bucket/results.zip", ("*",), s3))
+
+
+def test_read_members_of_an_artifacts_manifest(tmp_path):
+    blobs = tmp_path / "store" / "blobs"
+    files = {
+        "BenchmarkDotNet.Artifacts/results/a-report.csv": b"report",
+        "BenchmarkDotNet.Artifacts/a.html": b"h" * 100,
+    }
+    entries = []
+    for path, contents in files.items():
+        sha256 = hashlib.sha256(contents).hexdigest()
+        (blobs / sha256[:2]).mkdir(parents=True, exist_ok=True)
+        (blobs / sha256[:2] / sha256).write_bytes(contents)
+        entries.append({"path": path, "sha256": sha256, "size": len(contents)})
+    manifest = tmp_path / "store" / "study" / "a_manifest.json"
+    manifest.parent.mkdir()
+    manifest.write_text(json.dumps({"version": 1, "blobs": blobs.as_uri(), "files": entries}))
+
+    stats = {}
+    members = list(read_members(manifest.as_uri(), ("*-report.csv",), stats=stats))
+    assert members == [("BenchmarkDotNet.Artifacts/results/a-report.csv", b"report")]
+    # Only the manifest and the selected blob are read
+    assert stats["read"] == manifest.stat().st_size + len(b"report")
+    assert stats["size"] == manifest.stat().st_size + 106
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from microbench_analysis.scalability import fit_scalability, throughput_series
+
+CONCURRENCIES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def usl(n, lambda_, sigma, kappa):
+    return lambda_ * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def noisy_series(lambda_, sigma, kappa, seed, runs=3):
+    rng = np.random.default_rng(seed)
+    return [
+        (n, usl(n, lambda_, sigma, kappa) * (1 + rng.normal(0, 0.01)))
+        for n in CONCURRENCIES
+        for _ in range(runs)
+    ]
+
+
+def test_fit_scalability():
+    series = {
+        ("study", "Redis", "RedisThroughputBenchmark", "AddObject", ""): noisy_series(100.0, 0.05, 0.002, 1),
+        ("study", "Redis", "RedisThroughputBenchmark", "GetObject", ""): noisy_series(200.0, 0.1, 0.0, 2),
+        # Too few concurrencies to fit three parameters
+        ("study", "Redis", "RedisThroughputBenchmark", "DeleteObject", ""): [(1, 10.0), (2, 19.0), (4, 30.0)],
+    }
+    fits = {fit.series[3]: fit for fit in fit_scalability(series)}
+    assert set(fits) == {"AddObject", "GetObject"}
+
+    contended = fits["AddObject"]
+    assert contended.model == "usl"
+    assert contended.points == 21
+    assert contended.lambda_ == pytest.approx(100.0, rel=0.02)
+    assert contended.sigma == pytest.approx(0.05, abs=3 * contended.sigma_se)
+    assert contended.kappa == pytest.approx(0.002, abs=3 * contended.kappa_se)
+    expected_peak = np.sqrt((1 - 0.05) / 0.002)
+    assert contended.peak_concurrency == pytest.approx(expected_peak, abs=3 * contended.peak_concurrency_se)
+    assert contended.peak_throughput == pytest.approx(usl(expected_peak, 100.0, 0.05, 0.002), rel=0.02)
+    assert contended.relative_rmse < 0.02
+
+    amdahl = fits["GetObject"]
+    assert amdahl.model == "amdahl"
+    assert amdahl.kappa == 0.0
+    assert amdahl.peak_concurrency is None
+    assert amdahl.sigma == pytest.approx(0.1, rel=0.1)
+    assert amdahl.peak_throughput == pytest.approx(200.0 / 0.1, rel=0.1)
+
+
+def test_throughput_series():
+    aggregates = [
+        {
+            "study": "study",
+            "cases": [
+                {
+                    "component": "Redis",
+                    "benchmark_type": "RedisThroughputBenchmark",
+                    "method": "AddObject",
+                    "family": "ObjectSizeBytes=1024",
+                    "concurrency": concurrency,
+                    "throughput": 10.0 * concurrency,
+                }
+                for concurrency in (1, 2)
+            ],
+        }
+    ]
+    assert throughput_series(aggregates) == {
+        ("study", "Redis", "RedisThroughputBenchmark", "AddObject", "ObjectSizeBytes=1024"): [(1, 10.0), (2, 20.0)]
+    }
+    assert fit_scalability(throughput_series(aggregates)) == []
@@ -0,0 +1,1015 @@
+#!/usr/bin/env python3
+"""ArmoniK.Microbench runner agent.
+
+Installed on the benchmark runners by runner init and run with the system python3 (standard library only).
+It executes batches of benchmark jobs submitted by `microbenchmark.py study submit` without the orchestrator
+staying connected: the BenchmoniK output is parsed on the runner, broken benchmarks are aborted, and logs,
+parsed iterations and artifacts are uploaded to S3 with the AWS CLI (or copied to a local artifact store).
+The state of every batch is kept on disk and reported as JSON by the `status` command, which `study attach` polls.
+
+    microbench_agent.py submit BATCH_FILE   # queue a batch and start its worker in the background
+    microbench_agent.py start BATCH         # restart the worker of an unfinished batch
+    microbench_agent.py status [BATCH]      # state of a batch (default: the latest one)
+    microbench_agent.py cancel BATCH        # stop the batch after killing the running benchmark
+    microbench_agent.py sample OUTPUT       # sample host metrics into a gzipped CSV until terminated
+    microbench_agent.py calibrate           # print the environment fingerprint and a short calibration
+    microbench_agent.py store-artifacts ROOT MANIFEST_URI --store STORE  # store artifacts as deduplicated blobs
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+import csv
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import unquote, urlparse
+from urllib.request import Request, urlopen
+import uuid
+
+AGENT_DIR = Path.home() / "microbench-agent"
+BENCHMARK_RUNNER_DIR = Path.home() / "ArmoniK.Microbench" / "benchmark_runner"
+ARMONIK_CORE_DIR = Path.home() / "ArmoniK.Microbench" / "ArmoniK.Core"
+ARTIFACTS_DIR = "BenchmarkDotNet.Artifacts"
+
+# Job statuses after which the job will not change anymore
+TERMINAL_STATUSES = {"success", "failed", "aborted", "cancelled"}
+# Seconds between two updates of the progress of the running job
+PROGRESS_INTERVAL = 2
+# Seconds given to an aborted benchmark to exit before it is killed
+KILL_TIMEOUT = 30
+
+# Host metrics written by `sample`, one row per sample. Rates are averaged since the previous sample, CPU
+# shares are fractions of all CPUs, and sampler_cpu is the fraction of one CPU used by the sampler itself
+METRIC_COLUMNS = [
+    "time",
+    "cpu_user",
+    "cpu_system",
+    "cpu_iowait",
+    "cpu_steal",
+    "mem_available_mb",
+    "swap_used_mb",
+    "swap_in_pages_s",
+    "swap_out_pages_s",
+    "disk_read_mb_s",
+    "disk_write_mb_s",
+    "disk_busy",
+    "net_rx_mb_s",
+    "net_tx_mb_s",
+    "sampler_cpu",
+]
+# CPU share of one core the sampler may use, it samples less often when it goes over
+SAMPLER_CPU_BUDGET = 0.005
+MAX_SAMPLE_INTERVAL = 10
+
+# Calibration suite run before the benchmarks of a study run, sized to take a few seconds
+CALIBRATION_CPU_MB = 64
+CALIBRATION_CPU_LOOP = 2_000_000
+CALIBRATION_DISK_MB = 256
+CALIBRATION_FSYNCS = 50
+CALIBRATION_CONNECTS = 20
+CALIBRATION_BLOCK = 1024 * 1024
+# Seconds to wait for an endpoint or the EC2 instance metadata service
+CALIBRATION_TIMEOUT = 2
+IMDS_URL = "http://169.254.169.254/latest"
+
+# Artifacts are stored by content: every file of BenchmarkDotNet.Artifacts is a blob of the artifact store, keyed
+# by its SHA-256 (`blobs/<first 2 hex digits>/<sha256>`), and the layout of a benchmark is a JSON manifest listing
+# the path, hash and size of each file. Files repeated across benchmarks and runs are stored once.
+BLOBS_PREFIX = "blobs"
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = "_manifest.json"
+# Blobs checked and uploaded concurrently
+BLOB_UPLOAD_JOBS = 8
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# BenchmarkDotNet console output, e.g.
+# // Benchmark: RedisThroughputBenchmark.AddObject: Job-ABCDEF(IterationCount=12, ...) [NumConcurrentRunners=5, ...]
+# WorkloadActual   3: 1 op, 252364800.00 ns, 252.3648 ms/op
+BENCHMARK_CASE_PATTERN = re.compile(
+    r"^// Benchmark: (?P<type>[\w.]+)\.(?P<method>\w+): (?P<job>.+?)(?: \[(?P<params>.*)\])?$"
+)
+BENCHMARK_LAUNCH_PATTERN = re.compile(r"^// Launch: (?P<launch>\d+) / (?P<launches>\d+)")
+BENCHMARK_ITERATION_PATTERN = re.compile(
+    r"^(?P<stage>(?:Overhead|Workload)(?:Jitting|Pilot|Warmup|Actual|Result))\s+"
+    r"(?P<index>\d+): (?P<ops>\d+) op, (?P<ns>[\d.,]+) ns"
+)
+BENCHMARK_EXCEPTION_PATTERN = re.compile(
+    r"(Unhandled exception|^\s*(?:[\w.]+\.)?\w+Exception\b)"
+)
+BENCHMARK_PROCESS_EXIT_PATTERN = re.compile(
+    r"^// Benchmark Process \d+ has exited with code (?P<code>-?\d+)"
+)
+# Latency histogram of an operation of a runner task, printed by the throughput benchmarks when an iteration ends
+# (before its iteration line), e.g. `// LatencyHistogram: operation=AddOrUpdateAsync runner=3 bits=7 counts=2301:1,15:2`
+LATENCY_HISTOGRAM_PATTERN = re.compile(
+    r"^// LatencyHistogram: operation=(?P<operation>\w+) runner=(?P<runner>\d+) bits=(?P<bits>\d+) "
+    r"counts=(?P<counts>[\d:,]*)$"
+)
+
+# An iteration faster than this (per operation) did no actual work
+EMPTY_ITERATION_NS = 1_000
+
+
+def parse_benchmark_params(params: str) -> dict:
+    """Parse a BenchmarkDotNet parameter list, e.g. `TransferParameters=(1, 2), NumConcurrentRunners=5`"""
+    parsed = {}
+    depth = 0
+    current = ""
+    for char in params + ",":
+        if char == "," and depth == 0:
+            if "=" in current:
+                name, value = current.split("=", 1)
+                parsed[name.strip()] = value.strip()
+            current = ""
+            continue
+        depth += char in "([{"
+        depth -= char in ")]}"
+        current += char
+    return parsed
+
+
+@dataclass
+class AnomalyRules:
+    """Rules aborting a benchmark that is obviously broken, 0 disables a rule"""
+
+    max_exceptions: int = 50
+    max_empty_iterations: int = 3
+    stall_timeout: float = 0
+
+
+class BenchmarkLogParser:
+    """Incrementally parses BenchmoniK output into per-case iteration measurements.
+
+    It is used as the `out_stream` of a fabric command: the remote output is fed chunk by chunk as it arrives,
+    optionally echoed to the terminal, and checked against the anomaly rules.
+    """
+
+    def __init__(self, rules: AnomalyRules, echo: bool = False):
+        self.rules = rules
+        self.echo = echo
+        self.cases = []
+        self.launch = 1
+        self.abort_reason = None
+        self.last_output = time.monotonic()
+        self.lock = threading.Lock()
+        self._buffer = ""
+        self._empty_iterations = 0
+        self._latencies = []
+
+    @property
+    def current_case(self):
+        return self.cases[-1] if self.cases else None
+
+    def write(self, data: str):
+        if self.echo:
+            sys.stdout.write(data)
+        self.last_output = time.monotonic()
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self.parse_line(line.rstrip("\r"))
+
+    def flush(self):
+        if self.echo:
+            sys.stdout.flush()
+
+    def parse_line(self, line: str):
+        with self.lock:
+            if match := BENCHMARK_CASE_PATTERN.match(line):
+                job = match["job"]
+                iterations = re.search(r"IterationCount=(\d+)", job)
+                self.cases.append(
+                    {
+                        "type": match["type"],
+                        "method": match["method"],
+                        "job": job,
+                        "params": parse_benchmark_params(match["params"] or ""),
+                        "iteration_count": int(iterations[1]) if iterations else None,
+                        "measurements": [],
+                        "exceptions": 0,
+                        "exit_codes": [],
+                    }
+                )
+                self.launch = 1
+                self._empty_iterations = 0
+                self._latencies = []
+            elif match := BENCHMARK_LAUNCH_PATTERN.match(line):
+                self.launch = int(match["launch"])
+            elif self.current_case is None:
+                return
+            elif match := LATENCY_HISTOGRAM_PATTERN.match(line):
+                self._latencies.append(
+                    {
+                        "operation": match["operation"],
+                        "runner": int(match["runner"]),
+                        "bits": int(match["bits"]),
+                        "counts": match["counts"],
+                    }
+                )
+            elif match := BENCHMARK_ITERATION_PATTERN.match(line):
+                ops = int(match["ops"])
+                ns = float(match["ns"].replace(",", ""))
+                measurement = {
+                    "launch": self.launch,
+                    "stage": match["stage"],
+                    "index": int(match["index"]),
+                    "ops": ops,
+                    "ns": ns,
+                    "time": time.time(),
+                }
+                if self._latencies:
+                    measurement["latencies"] = self._latencies
+                    self._latencies = []
+                self.current_case["measurements"].append(measurement)
+                if match["stage"] == "WorkloadActual":
+                    if ns / max(ops, 1) < EMPTY_ITERATION_NS:
+                        self._empty_iterations += 1
+                    else:
+                        self._empty_iterations = 0
+                    if 0 < self.rules.max_empty_iterations <= self._empty_iterations:
+                        self.abort(
+                            f"{self._empty_iterations} consecutive iterations did no work "
+                            f"in {self.case_name(self.current_case)}"
+                        )
+            elif match := BENCHMARK_PROCESS_EXIT_PATTERN.match(line):
+                self.current_case["exit_codes"].append(int(match["code"]))
+            elif BENCHMARK_EXCEPTION_PATTERN.search(line):
+                self.current_case["exceptions"] += 1
+                if 0 < self.rules.max_exceptions <= self.current_case["exceptions"]:
+                    self.abort(
+                        f"{self.current_case['exceptions']} exceptions "
+                        f"in {self.case_name(self.current_case)}"
+                    )
+
+    def check_stall(self):
+        """Flag the benchmark as stalled if it has been silent for longer than the stall timeout"""
+        silence = time.monotonic() - self.last_output
+        if 0 < self.rules.stall_timeout <= silence:
+            self.abort(f"No output for {silence:.0f}s")
+
+    def abort(self, reason: str):
+        """Flag the benchmark for abortion, keeping the first reason"""
+        if self.abort_reason is None:
+            self.abort_reason = reason
+
+    @staticmethod
+    def case_name(case: dict) -> str:
+        params = ", ".join(f"{k}={v}" for k, v in case["params"].items())
+        return f"{case['method']}({params})"
+
+    @staticmethod
+    def case_stats(case: dict):
+        """Number of actual iterations and their mean duration per operation (in ns)"""
+        per_op = [
+            m["ns"] / max(m["ops"], 1)
+            for m in case["measurements"]
+            if m["stage"] == "WorkloadActual"
+        ]
+        return len(per_op), (sum(per_op) / len(per_op) if per_op else None)
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {"cases": self.cases, "abort_reason": self.abort_reason}
+
+
+def parse_benchmark_log(text: str) -> dict:
+    """Parsed iterations of a whole BenchmoniK output, for runs that only kept their console output.
+
+    The measurements have no "time": it would be the time of the parsing, not of the iteration.
+    """
+    parser = BenchmarkLogParser(AnomalyRules(0, 0, 0))
+    parser.write(text + "\n")
+    for case in parser.cases:
+        for measurement in case["measurements"]:
+            del measurement["time"]
+    return parser.to_dict()
+
+
+def read_host_counters() -> dict:
+    """Cumulative CPU, memory, swap, disk and network counters of the host, from /proc"""
+    counters = {}
+    with open("/proc/stat") as f:
+        # cpu user nice system idle iowait irq softirq steal
+        values = [int(v) for v in f.readline().split()[1:9]]
+    counters["cpu_total"] = sum(values)
+    counters["cpu_user"] = values[0] + values[1]
+    counters["cpu_system"] = values[2] + values[5] + values[6]
+    counters["cpu_iowait"] = values[4]
+    counters["cpu_steal"] = values[7]
+
+    meminfo = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            name, value = line.split(":", 1)
+            meminfo[name] = int(value.split()[0])
+    counters["mem_available_kb"] = meminfo.get("MemAvailable", 0)
+    counters["swap_used_kb"] = meminfo.get("SwapTotal", 0) - meminfo.get("SwapFree", 0)
+
+    with open("/proc/vmstat") as f:
+        vmstat = dict(line.split() for line in f)
+    counters["swap_in_pages"] = int(vmstat.get("pswpin", 0))
+    counters["swap_out_pages"] = int(vmstat.get("pswpout", 0))
+
+    # Whole disks only (partitions would be counted twice), sectors are 512 bytes
+    counters["disk_read_bytes"] = counters["disk_write_bytes"] = 0
+    counters["disk_busy_ms"] = {}
+    with open("/proc/diskstats") as f:
+        for line in f:
+            fields = line.split()
+            name = fields[2]
+            if name.startswith(("loop", "ram")) or not os.path.exists(f"/sys/block/{name}"):
+                continue
+            counters["disk_read_bytes"] += int(fields[5]) * 512
+            counters["disk_write_bytes"] += int(fields[9]) * 512
+            counters["disk_busy_ms"][name] = int(fields[12])
+
+    counters["net_rx_bytes"] = counters["net_tx_bytes"] = 0
+    with open("/proc/net/dev") as f:
+        for line in f.readlines()[2:]:
+            name, values = line.split(":", 1)
+            if name.strip() == "lo":
+                continue
+            values = values.split()
+            counters["net_rx_bytes"] += int(values[0])
+            counters["net_tx_bytes"] += int(values[8])
+    return counters
+
+
+def compute_metrics(previous: dict, current: dict, elapsed: float) -> dict:
+    """Metrics of a sample, from the counters read at its start and end"""
+    cpu_total = max(current["cpu_total"] - previous["cpu_total"], 1)
+
+    def rate(name: str, scale: float = 1) -> float:
+        return (current[name] - previous[name]) / elapsed / scale
+
+    busy_ms = [
+        current["disk_busy_ms"][name] - previous["disk_busy_ms"].get(name, 0)
+        for name in current["disk_busy_ms"]
+    ]
+    return {
+        "cpu_user": (current["cpu_user"] - previous["cpu_user"]) / cpu_total,
+        "cpu_system": (current["cpu_system"] - previous["cpu_system"]) / cpu_total,
+        "cpu_iowait": (current["cpu_iowait"] - previous["cpu_iowait"]) / cpu_total,
+        "cpu_steal": (current["cpu_steal"] - previous["cpu_steal"]) / cpu_total,
+        "mem_available_mb": current["mem_available_kb"] / 1024,
+        "swap_used_mb": current["swap_used_kb"] / 1024,
+        "swap_in_pages_s": rate("swap_in_pages"),
+        "swap_out_pages_s": rate("swap_out_pages"),
+        "disk_read_mb_s": rate("disk_read_bytes", 1e6),
+        "disk_write_mb_s": rate("disk_write_bytes", 1e6),
+        "disk_busy": min(max(busy_ms, default=0) / 1000 / elapsed, 1.0),
+        "net_rx_mb_s": rate("net_rx_bytes", 1e6),
+        "net_tx_mb_s": rate("net_tx_bytes", 1e6),
+    }
+
+
+def sample(args):
+    """Sample host metrics into a gzipped CSV until terminated, then print a summary of the sampler overhead"""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    interval = args.interval
+    samples = 0
+    start_cpu, start_wall = time.process_time(), time.monotonic()
+    previous = read_host_counters()
+    previous_cpu, previous_wall = start_cpu, start_wall
+    with gzip.open(args.output, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(METRIC_COLUMNS)
+        while not stop.wait(interval):
+            current = read_host_counters()
+            now_cpu, now_wall = time.process_time(), time.monotonic()
+            sampler_cpu = (now_cpu - previous_cpu) / (now_wall - previous_wall)
+            metrics = compute_metrics(previous, current, now_wall - previous_wall)
+            metrics.update(time=time.time(), sampler_cpu=sampler_cpu)
+            writer.writerow(
+                [f"{metrics['time']:.3f}"]
+                + [f"{metrics[column]:.4g}" for column in METRIC_COLUMNS[1:]]
+            )
+            samples += 1
+            if samples % 10 == 0:
+                f.flush()
+            # Keep the overhead under budget by sampling less often
+            if sampler_cpu > SAMPLER_CPU_BUDGET and interval < MAX_SAMPLE_INTERVAL:
+                interval = min(interval * 2, MAX_SAMPLE_INTERVAL)
+            previous, previous_cpu, previous_wall = current, now_cpu, now_wall
+
+    wall = time.monotonic() - start_wall
+    print(
+        json.dumps(
+            {
+                "samples": samples,
+                "interval": interval,
+                "cpu_overhead": (time.process_time() - start_cpu) / wall if wall else 0,
+            }
+        )
+    )
+
+
+class MetricsSampler:
+    """Runs `sample` in a separate process for the duration of a benchmark"""
+
+    def __init__(self, output: Path, interval: float):
+        self.output = output
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "sample",
+                str(output),
+                "--interval",
+                str(interval),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+    def stop(self) -> dict:
+        """Stop sampling and return the summary of the sampler"""
+        self.process.terminate()
+        output, _ = self.process.communicate()
+        return json.loads(output) if output.strip() else {}
+
+
+def read_first_line(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def command_output(*command: str) -> str | None:
+    """Stripped output of a command, None if it cannot run or fails"""
+    try:
+        return subprocess.run(
+            command, capture_output=True, text=True, timeout=60, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def instance_type() -> str | None:
+    """EC2 instance type from the instance metadata service (IMDSv2), None off EC2"""
+    try:
+        token_request = Request(
+            f"{IMDS_URL}/api/token",
+            method="PUT",
+            headers={"X-aws-ec2-metadata-token-ttl-seconds": "60"},
+        )
+        with urlopen(token_request, timeout=CALIBRATION_TIMEOUT) as response:
+            token = response.read().decode()
+        type_request = Request(
+            f"{IMDS_URL}/meta-data/instance-type",
+            headers={"X-aws-ec2-metadata-token": token},
+        )
+        with urlopen(type_request, timeout=CALIBRATION_TIMEOUT) as response:
+            return response.read().decode()
+    except OSError:
+        return None
+
+
+def environment_fingerprint() -> dict:
+    """What the results of a benchmark depend on besides the code: hardware, kernel, CPU governor and toolchain"""
+    cpu_model = None
+    with open("/proc/cpuinfo") as f:
+        for line in f:
+            if line.startswith("model name"):
+                cpu_model = line.split(":", 1)[1].strip()
+                break
+    mem_total_kb = 0
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                mem_total_kb = int(line.split()[1])
+    return {
+        "instance_type": instance_type(),
+        "cpu_model": cpu_model,
+        "cpus": os.cpu_count(),
+        "mem_total_mb": mem_total_kb // 1024,
+        "kernel": os.uname().release,
+        "cpu_governor": read_first_line("/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"),
+        "dotnet_sdk": command_output("dotnet", "--version"),
+        "core_commit": command_output("git", "-C", str(ARMONIK_CORE_DIR), "rev-parse", "HEAD"),
+    }
+
+
+def calibrate_cpu() -> dict:
+    """Single core hashing throughput and interpreter speed, best of three runs"""
+    block = os.urandom(CALIBRATION_BLOCK)
+    hashing, loop = [], []
+    for _ in range(3):
+        start = time.perf_counter()
+        digest = hashlib.sha256()
+        for _ in range(CALIBRATION_CPU_MB):
+            digest.update(block)
+        hashing.append(CALIBRATION_CPU_MB * CALIBRATION_BLOCK / 1e6 / (time.perf_counter() - start))
+        start = time.perf_counter()
+        total = 0
+        for i in range(CALIBRATION_CPU_LOOP):
+            total += i
+        loop.append(CALIBRATION_CPU_LOOP / 1e6 / (time.perf_counter() - start))
+    return {"sha256_mb_s": max(hashing), "loop_mops": max(loop)}
+
+
+def calibrate_disk(directory: Path) -> dict:
+    """Sequential write and read throughput of a directory's file system, and the latency of small synced writes"""
+    test_file = directory / f".microbench-calibration-{os.getpid()}"
+    block = os.urandom(CALIBRATION_BLOCK)
+    try:
+        fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            start = time.perf_counter()
+            for _ in range(CALIBRATION_DISK_MB):
+                os.write(fd, block)
+            os.fsync(fd)
+            write_mb_s = CALIBRATION_DISK_MB * CALIBRATION_BLOCK / 1e6 / (time.perf_counter() - start)
+            fsyncs = []
+            for i in range(CALIBRATION_FSYNCS):
+                start = time.perf_counter()
+                os.pwrite(fd, block[:4096], i * 4096)
+                os.fsync(fd)
+                fsyncs.append((time.perf_counter() - start) * 1000)
+        finally:
+            os.close(fd)
+
+        fd = os.open(test_file, os.O_RDONLY)
+        try:
+            # Drop the clean pages of the file from the page cache, so that it is read from the disk
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            start = time.perf_counter()
+            while os.read(fd, CALIBRATION_BLOCK):
+                pass
+            read_mb_s = CALIBRATION_DISK_MB * CALIBRATION_BLOCK / 1e6 / (time.perf_counter() - start)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        return {"path": str(directory), "error": str(e)}
+    finally:
+        test_file.unlink(missing_ok=True)
+    return {
+        "path": str(directory),
+        "write_mb_s": write_mb_s,
+        "read_mb_s": read_mb_s,
+        "fsync_ms": statistics.median(fsyncs),
+    }
+
+
+def calibrate_endpoint(component: str, address: str) -> dict:
+    """TCP connection round trips to a backend endpoint (`host:port`), resolved once"""
+    result = {"component": component, "address": address}
+    host, _, port = address.rpartition(":")
+    try:
+        family, kind, protocol, _, sockaddr = socket.getaddrinfo(
+            host, int(port), type=socket.SOCK_STREAM
+        )[0]
+        round_trips = []
+        for _ in range(CALIBRATION_CONNECTS):
+            with socket.socket(family, kind, protocol) as sock:
+                sock.settimeout(CALIBRATION_TIMEOUT)
+                start = time.perf_counter()
+                sock.connect(sockaddr)
+                round_trips.append((time.perf_counter() - start) * 1000)
+    except (OSError, ValueError) as e:
+        return {**result, "error": str(e)}
+    round_trips.sort()
+    return {
+        **result,
+        "connect_ms": statistics.median(round_trips),
+        "connect_p90_ms": round_trips[int(0.9 * (len(round_trips) - 1))],
+    }
+
+
+def calibrate(args):
+    """Print the environment fingerprint of the runner and a short CPU, disk and network calibration as JSON"""
+    disks = [Path.home(), *(Path(d) for d in args.disk)]
+    endpoints = [e.split("=", 1) for e in args.endpoint]
+    print(
+        json.dumps(
+            {
+                "fingerprint": environment_fingerprint(),
+                "cpu": calibrate_cpu(),
+                "disks": [calibrate_disk(d) for d in disks],
+                "endpoints": [calibrate_endpoint(c, a) for c, a in endpoints],
+            }
+        )
+    )
+
+
+def write_json(path: Path, data):
+    """Atomically replace a JSON file, so that `status` never reads a partial file"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_job_dirs(batch_dir: Path) -> list:
+    return sorted(p for p in (batch_dir / "jobs").iterdir() if p.is_dir())
+
+
+def is_alive(pid_file: Path) -> bool:
+    try:
+        os.kill(int(pid_file.read_text()), 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def get_progress(parser: BenchmarkLogParser):
+    """Progress of the case being measured, as reported by `status`"""
+    with parser.lock:
+        case = parser.current_case
+        if case is None:
+            return None
+        iterations, mean_ns = parser.case_stats(case)
+        return {
+            "case": parser.case_name(case),
+            "cases": len(parser.cases),
+            "launch": parser.launch,
+            "iterations": iterations,
+            "iteration_count": case["iteration_count"],
+            "mean_ns": mean_ns,
+            "exceptions": case["exceptions"],
+        }
+
+
+def upload(path: Path, uri: str, endpoint_url: str | None = None):
+    """Store a file in the artifact store of the batch: an S3 bucket, or a directory for file:// URIs"""
+    if uri.startswith("file://"):
+        target = Path(unquote(urlparse(uri).path))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        return
+    endpoint = ["--endpoint-url", endpoint_url] if endpoint_url else []
+    subprocess.run(
+        ["aws", "s3", "cp", "--only-show-errors", *endpoint, str(path), uri],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_uri(blobs_uri: str, sha256: str) -> str:
+    return f"{blobs_uri}/{sha256[:2]}/{sha256}"
+
+
+def artifacts_manifest(root: Path, blobs_uri: str) -> dict:
+    """Manifest of the files of the BenchmarkDotNet.Artifacts directory of `root`, with paths relative to `root`"""
+    files = [
+        {"path": path.relative_to(root).as_posix(), "sha256": file_sha256(path), "size": path.stat().st_size}
+        for path in sorted((root / ARTIFACTS_DIR).rglob("*"))
+        if path.is_file()
+    ]
+    return {"version": MANIFEST_VERSION, "blobs": blobs_uri, "files": files}
+
+
+def blob_exists(uri: str, endpoint_url: str | None = None) -> bool:
+    if uri.startswith("file://"):
+        return Path(unquote(urlparse(uri).path)).exists()
+    bucket, key = uri.removeprefix("s3://").split("/", 1)
+    endpoint = ["--endpoint-url", endpoint_url] if endpoint_url else []
+    result = subprocess.run(
+        ["aws", "s3api", "head-object", *endpoint, "--bucket", bucket, "--key", key],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode == 0:
+        return True
+    if "(404)" in result.stderr:
+        return False
+    raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+
+
+def upload_blob(path: Path, uri: str, endpoint_url: str | None = None):
+    """Store a blob. Local blobs are renamed into place, so that a blob that exists is always complete"""
+    if uri.startswith("file://"):
+        target = Path(unquote(urlparse(uri).path))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+        return
+    upload(path, uri, endpoint_url)
+
+
+def store_artifacts(root: Path, manifest_uri: str, store: str, endpoint_url: str | None = None) -> dict:
+    """Store the BenchmarkDotNet.Artifacts directory of `root` as blobs of the artifact store `store`, uploading
+    only the blobs it does not hold yet, then its manifest under `manifest_uri`.
+
+    Returns the number of files, of distinct blobs and of blobs uploaded, and the bytes of each.
+    """
+    manifest = artifacts_manifest(root, f"{store.rstrip('/')}/{BLOBS_PREFIX}")
+    blobs = {entry["sha256"]: entry for entry in manifest["files"]}
+
+    def store_blob(entry: dict) -> bool:
+        uri = blob_uri(manifest["blobs"], entry["sha256"])
+        if blob_exists(uri, endpoint_url):
+            return False
+        upload_blob(root / entry["path"], uri, endpoint_url)
+        return True
+
+    with ThreadPoolExecutor(BLOB_UPLOAD_JOBS) as executor:
+        stored = list(executor.map(store_blob, blobs.values()))
+    uploaded = [entry for entry, new in zip(blobs.values(), stored) if new]
+    # The manifest goes last: every blob it lists is in the store
+    manifest_file = root / "manifest.json"
+    write_json(manifest_file, manifest)
+    upload(manifest_file, manifest_uri, endpoint_url)
+    manifest_file.unlink()
+    return {
+        "files": len(manifest["files"]),
+        "bytes": sum(entry["size"] for entry in manifest["files"]),
+        "blobs": len(blobs),
+        "uploaded": len(uploaded),
+        "uploaded_bytes": sum(entry["size"] for entry in uploaded),
+    }
+
+
+def store_artifacts_command(args):
+    """Store a BenchmarkDotNet.Artifacts directory as deduplicated blobs with a manifest, and print what was uploaded"""
+    print(json.dumps(store_artifacts(Path(args.root), args.manifest_uri, args.store, args.endpoint_url)))
+
+
+def run_benchmark(batch: dict, batch_dir: Path, job_dir: Path, status: dict):
+    """Run the benchmark of a job, aborting it if it breaks an anomaly rule or the batch is cancelled"""
+    parser = BenchmarkLogParser(AnomalyRules(**batch["rules"]))
+    config_file = job_dir / status["name"]
+    metrics_interval = batch.get("metrics_interval", 0)
+    sampler = (
+        MetricsSampler(job_dir / "metrics.csv.gz", metrics_interval)
+        if metrics_interval
+        else None
+    )
+    start = time.monotonic()
+    with open(job_dir / "logs.txt", "w", encoding="utf-8") as log:
+        # A session of its own, so that the benchmark processes spawned by BenchmarkDotNet can be killed too
+        process = subprocess.Popen(
+            [
+                "dotnet",
+                "run",
+                "-c",
+                "RELEASE",
+                "--project",
+                "./BenchmoniK/BenchmoniK.csproj",
+                "--",
+                "-c",
+                str(config_file),
+                "--armonik-core",
+                f"{ARMONIK_CORE_DIR}/",
+            ],
+            cwd=BENCHMARK_RUNNER_DIR,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            start_new_session=True,
+        )
+
+        def pump():
+            for line in process.stdout:
+                log.write(line)
+                parser.write(line)
+            log.flush()
+
+        reader = threading.Thread(target=pump, daemon=True)
+        reader.start()
+        last_progress = 0
+        while process.poll() is None:
+            parser.check_stall()
+            if (batch_dir / "cancelled").exists():
+                parser.abort("Cancelled")
+            if parser.abort_reason:
+                try:
+                    os.killpg(process.pid, signal.SIGTERM)
+                    process.wait(KILL_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                break
+            if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                status["progress"] = get_progress(parser)
+                write_json(job_dir / "status.json", status)
+                last_progress = time.monotonic()
+            time.sleep(0.5)
+        return_code = process.wait()
+        reader.join()
+
+    status["duration"] = time.monotonic() - start
+    if sampler is not None:
+        status["metrics_overhead"] = sampler.stop().get("cpu_overhead")
+    status["progress"] = get_progress(parser)
+    if parser.abort_reason == "Cancelled":
+        status["status"] = "cancelled"
+    elif parser.abort_reason:
+        status["status"] = "aborted"
+        status["error"] = parser.abort_reason
+    elif return_code == 0:
+        status["status"] = "success"
+    else:
+        status["status"] = "failed"
+        status["error"] = f"BenchmoniK exited with code {return_code}"
+    # The iterations and the host metrics are timed with the same clock
+    write_json(
+        job_dir / "iterations.json",
+        {**parser.to_dict(), "clock_offset": 0.0, "clock_uncertainty": 0.0},
+    )
+
+
+def run_job(batch: dict, batch_dir: Path, job_dir: Path):
+    """Run a job and store its logs, parsed iterations and artifacts"""
+    status = read_json(job_dir / "status.json")
+    store = batch.get("artifact_store") or f"s3://{batch['s3_bucket']}"
+    prefix = f"{store}/{batch['key_prefix']}/{Path(status['name']).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    status.update(
+        status="running",
+        started=datetime.now().isoformat(),
+        results=f"{prefix}{MANIFEST_SUFFIX}",
+        logs=f"{prefix}_logs.txt",
+        iterations=f"{prefix}_iterations.json",
+    )
+    if batch.get("metrics_interval"):
+        status["metrics"] = f"{prefix}_metrics.csv.gz"
+    write_json(job_dir / "status.json", status)
+
+    artifacts = BENCHMARK_RUNNER_DIR / ARTIFACTS_DIR
+    shutil.rmtree(artifacts, ignore_errors=True)
+    try:
+        run_benchmark(batch, batch_dir, job_dir, status)
+        upload(job_dir / "logs.txt", status["logs"], batch.get("endpoint_url"))
+        upload(job_dir / "iterations.json", status["iterations"], batch.get("endpoint_url"))
+        if (job_dir / "metrics.csv.gz").exists():
+            upload(job_dir / "metrics.csv.gz", status["metrics"], batch.get("endpoint_url"))
+        if artifacts.is_dir():
+            status["artifacts"] = store_artifacts(
+                BENCHMARK_RUNNER_DIR, status["results"], store, batch.get("endpoint_url")
+            )
+        else:
+            status["results"] = ""
+    except subprocess.CalledProcessError as e:
+        status["status"] = "failed"
+        status["error"] = f"Upload failed: {e.stderr.strip() or e}"
+    except Exception as e:
+        status["status"] = "failed"
+        status["error"] = str(e)
+    finally:
+        shutil.rmtree(artifacts, ignore_errors=True)
+    status["finished"] = datetime.now().isoformat()
+    write_json(job_dir / "status.json", status)
+
+
+def start_worker(batch_id: str):
+    """Start the worker of a batch in the background, detached from the SSH session"""
+    batch_dir = AGENT_DIR / batch_id
+    if is_alive(batch_dir / "worker.pid"):
+        return
+    with open(batch_dir / "worker.log", "a") as log:
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "work", batch_id],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    (batch_dir / "worker.pid").write_text(str(process.pid))
+
+
+def submit(args):
+    """Queue the jobs of a batch file and start its worker"""
+    batch = read_json(Path(args.batch_file))
+    batch_id = batch.setdefault("batch", uuid.uuid4().hex)
+    batch_dir = AGENT_DIR / batch_id
+    (batch_dir / "jobs").mkdir(parents=True)
+    jobs = batch.pop("jobs")
+    write_json(batch_dir / "batch.json", batch)
+    for index, job in enumerate(jobs):
+        job_dir = batch_dir / "jobs" / f"{index:03d}_{Path(job['name']).stem}"
+        job_dir.mkdir()
+        (job_dir / job["name"]).write_text(job["source"], encoding="utf-8")
+        write_json(job_dir / "status.json", {"name": job["name"], "status": "queued"})
+    start_worker(batch_id)
+    print(json.dumps({"batch": batch_id, "jobs": len(jobs)}))
+
+
+def start(args):
+    """Restart the worker of a batch, e.g. after a reboot of the runner"""
+    start_worker(args.batch)
+    print(json.dumps({"batch": args.batch}))
+
+
+def work(args):
+    """Execute the unfinished jobs of a batch, one batch at a time on the runner"""
+    batch_dir = AGENT_DIR / args.batch
+    batch = read_json(batch_dir / "batch.json")
+    with open(AGENT_DIR / "agent.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        for job_dir in get_job_dirs(batch_dir):
+            status = read_json(job_dir / "status.json")
+            if status["status"] in TERMINAL_STATUSES:
+                continue
+            if (batch_dir / "cancelled").exists():
+                status["status"] = "cancelled"
+                write_json(job_dir / "status.json", status)
+                continue
+            run_job(batch, batch_dir, job_dir)
+
+
+def get_status(args):
+    """Print the state of a batch and of each of its jobs"""
+    if args.batch:
+        batch_dir = AGENT_DIR / args.batch
+    else:
+        batches = [p for p in AGENT_DIR.iterdir() if (p / "batch.json").exists()]
+        if not batches:
+            sys.exit("No batch submitted to this runner")
+        batch_dir = max(batches, key=lambda p: p.stat().st_mtime)
+    if not (batch_dir / "batch.json").exists():
+        sys.exit(f"Unknown batch {batch_dir.name}")
+    print(
+        json.dumps(
+            {
+                "batch": batch_dir.name,
+                "alive": is_alive(batch_dir / "worker.pid"),
+                "cancelled": (batch_dir / "cancelled").exists(),
+                "jobs": [read_json(d / "status.json") for d in get_job_dirs(batch_dir)],
+            }
+        )
+    )
+
+
+def cancel(args):
+    """Cancel a batch: the running benchmark is killed and the queued jobs are skipped"""
+    (AGENT_DIR / args.batch / "cancelled").touch()
+    print(json.dumps({"batch": args.batch}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ArmoniK.Microbench runner agent")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("submit", help=submit.__doc__)
+    command.add_argument("batch_file")
+    command.set_defaults(handler=submit)
+    for name, handler in [("start", start), ("work", work), ("cancel", cancel)]:
+        command = commands.add_parser(name, help=handler.__doc__)
+        command.add_argument("batch")
+        command.set_defaults(handler=handler)
+    command = commands.add_parser("sample", help=sample.__doc__)
+    command.add_argument("output")
+    command.add_argument("--interval", type=float, default=1.0)
+    command.set_defaults(handler=sample)
+    command = commands.add_parser("calibrate", help=calibrate.__doc__)
+    command.add_argument(
+        "--endpoint", action="append", default=[], help="COMPONENT=HOST:PORT of a backend to connect to"
+    )
+    command.add_argument(
+        "--disk", action="append", default=[], help="Directory to calibrate besides the home directory"
+    )
+    command.set_defaults(handler=calibrate)
+    command = commands.add_parser("store-artifacts", help=store_artifacts_command.__doc__)
+    command.add_argument("root", help="Directory holding BenchmarkDotNet.Artifacts")
+    command.add_argument("manifest_uri")
+    command.add_argument("--store", required=True, help="Artifact store: s3://bucket or file:///path")
+    command.add_argument("--endpoint-url")
+    command.set_defaults(handler=store_artifacts_command)
+    command = commands.add_parser("status", help=get_status.__doc__)
+    command.add_argument("batch", nargs="?")
+    command.set_defaults(handler=get_status)
+
+    args = parser.parse_args()
+    AGENT_DIR.mkdir(exist_ok=True)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 #     "boto3",
 #     "click",
 #     "fabric",
+#     "rich",
 #     "rich-click",
 # ]
 #
@@ -13,16 +14,133 @@
 # ]
 # ///
 
-# TODO: Lock the version in study file if "latest"
+from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+import hashlib
+import io
+import itertools
 import json
 import os
 from pathlib import Path
+import queue
+import re
+import shlex
+import shutil
+import socket
+import sqlite3
+import statistics
 import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from urllib.parse import unquote, urlparse
+from typing import TYPE_CHECKING
 import rich_click as click
-import boto3
-from fabric import Connection
+from rich.console import Console
+from rich.table import Table
+
+from microbench_agent import (
+    AnomalyRules,
+    BenchmarkLogParser,
+    BLOBS_PREFIX,
+    MANIFEST_SUFFIX,
+    TERMINAL_STATUSES as AGENT_TERMINAL_STATUSES,
+    artifacts_manifest,
+    blob_uri,
+    file_sha256,
+    parse_benchmark_log,
+)
+
+# The AWS SDK, fabric (paramiko) and the rich live displays take most of the startup time: they are imported by
+# the commands that use them, so that `--help`, shell completion and the catalog commands start fast
+if TYPE_CHECKING:
+    from fabric import Connection
+
+# Chunk size used when streaming downloads to disk
+SYNC_CHUNK_SIZE = 1024 * 1024
+# Blobs of the content-addressed artifacts downloaded by `study sync`, shared by the studies of a results tree
+BLOB_CACHE_DIR = ".blobs"
+
+# Remote layout of a runner: the Microbench clone is kept between runs, ArmoniK.Core is built once per
+# commit in its own worktree, and the ArmoniK.Core submodule path is a symlink to the worktree in use.
+# Paths are expanded by the runner shell: /home/ubuntu on the EC2 runners, the runner directory of a local runner
+RUNNER_HOME = "~"
+CORE_REPO_URL = "https://github.com/aneoconsulting/ArmoniK.Core.git"
+CORE_MIRROR_DIR = f"{RUNNER_HOME}/armonik-core.git"
+CORE_BUILDS_DIR = f"{RUNNER_HOME}/armonik-core-builds"
+CORE_BUILD_MARKER = ".microbench-build"
+# Number of ArmoniK.Core builds kept on a runner
+CORE_BUILD_CACHE_SIZE = 5
+# The runner agent is installed out of the clone, so that checking out another commit does not affect
+# the batches it is running
+AGENT_PATH = f"{RUNNER_HOME}/microbench-agent/microbench_agent.py"
+# Default directory of a local runner (runner config with "backend": "local")
+LOCAL_RUNNER_HOME = "./local-runner"
+# Runner directory of the artifacts zipped and uploaded in the background with --pipeline
+PIPELINE_DIR = f"{RUNNER_HOME}/microbench-pipeline"
+# Seconds between two checks of the background uploads of a runner at the end of a run
+PIPELINE_POLL_INTERVAL = 2.0
+
+# SQLite catalog of the studies, in the studies directory
+CATALOG_FILE = "catalog.db"
+CATALOG_STUDY_COLUMNS = ("core_version", "benchmark_runner_version", "creation_date")
+CATALOG_BENCHMARK_COLUMNS = (
+    "status",
+    "runner",
+    "duration",
+    "results",
+    "logs",
+    "iterations",
+    "error",
+)
+# Config sources and runner pools are stored once in `blobs`, keys that have no column are kept in `extra`
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS studies (
+    name TEXT PRIMARY KEY,
+    core_version TEXT,
+    benchmark_runner_version TEXT,
+    creation_date TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS runs (
+    study TEXT NOT NULL REFERENCES studies (name) ON DELETE CASCADE,
+    run_index INTEGER NOT NULL,
+    date TEXT,
+    runners_hash TEXT REFERENCES blobs (hash),
+    extra TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (study, run_index)
+);
+CREATE TABLE IF NOT EXISTS benchmarks (
+    study TEXT NOT NULL,
+    run_index INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    component TEXT,
+    status TEXT,
+    runner TEXT,
+    duration REAL,
+    results TEXT,
+    logs TEXT,
+    iterations TEXT,
+    error TEXT,
+    source_hash TEXT REFERENCES blobs (hash),
+    extra TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (study, run_index, name),
+    FOREIGN KEY (study, run_index) REFERENCES runs (study, run_index) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS benchmarks_by_status ON benchmarks (status, component);
+CREATE INDEX IF NOT EXISTS benchmarks_by_fingerprint ON benchmarks (json_extract(extra, '$.fingerprint'));
+"""
 
 host_cmdlinearg = click.option(
     "--host", type=str, help="Host of the benchmark machine."
@@ -53,6 +171,13 @@ def dev():
     pass
 
 
+def s3_session(profile: str | None = None):
+    """boto3 session of an AWS profile (default credential chain when None)"""
+    import boto3
+
+    return boto3.Session(profile_name=profile)
+
+
 def get_studies_dir():
     """Get or create the studies directory"""
     studies_dir = Path("./studies")
@@ -60,31 +185,234 @@ def get_studies_dir():
     return studies_dir
 
 
+def get_catalog_path():
+    """Path of the SQLite catalog indexing every study"""
+    return get_studies_dir() / CATALOG_FILE
+
+
+@contextmanager
+def open_catalog():
+    """Open the study catalog, creating its schema if needed. The block runs in a single transaction."""
+    db = sqlite3.connect(get_catalog_path(), timeout=30)
+    db.row_factory = sqlite3.Row
+    try:
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA foreign_keys = ON")
+        db.executescript(CATALOG_SCHEMA)
+        with db:
+            yield db
+    finally:
+        db.close()
+
+
+def store_blob(db: sqlite3.Connection, content: str) -> str:
+    """Store a text blob once, keyed by its SHA-256"""
+    blob_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    db.execute(
+        "INSERT OR IGNORE INTO blobs (hash, content) VALUES (?, ?)",
+        (blob_hash, content),
+    )
+    return blob_hash
+
+
+def get_blob(db: sqlite3.Connection, blob_hash: str | None):
+    if blob_hash is None:
+        return None
+    return db.execute(
+        "SELECT content FROM blobs WHERE hash = ?", (blob_hash,)
+    ).fetchone()["content"]
+
+
+def get_config_component(source: str):
+    """Component of a benchmark config source, if it can be parsed"""
+    try:
+        return json.loads(source).get("Component")
+    except (ValueError, AttributeError):
+        return None
+
+
+def write_benchmark(
+    db: sqlite3.Connection,
+    study_name: str,
+    run_index: int,
+    position: int,
+    benchmark_name: str,
+    benchmark: dict,
+):
+    """Insert or replace a benchmark entry of a run"""
+    source = benchmark.get("source")
+    extra = {
+        k: v
+        for k, v in benchmark.items()
+        if k != "source" and k not in CATALOG_BENCHMARK_COLUMNS
+    }
+    db.execute(
+        f"""INSERT OR REPLACE INTO benchmarks
+        (study, run_index, name, position, component, source_hash, extra, {", ".join(CATALOG_BENCHMARK_COLUMNS)})
+        VALUES (?, ?, ?, ?, ?, ?, ?, {", ".join("?" * len(CATALOG_BENCHMARK_COLUMNS))})""",
+        (
+            study_name,
+            run_index,
+            benchmark_name,
+            position,
+            get_config_component(source) if source is not None else None,
+            store_blob(db, source) if source is not None else None,
+            json.dumps(extra),
+            *(benchmark.get(column) for column in CATALOG_BENCHMARK_COLUMNS),
+        ),
+    )
+
+
+def write_run(db: sqlite3.Connection, study_name: str, run_index: int, run: dict):
+    """Insert or replace a run entry and its benchmarks"""
+    runners = run.get("runners")
+    extra = {
+        k: v for k, v in run.items() if k not in ("date", "runners", "benchmarks")
+    }
+    db.execute(
+        "DELETE FROM runs WHERE study = ? AND run_index = ?", (study_name, run_index)
+    )
+    db.execute(
+        "INSERT INTO runs (study, run_index, date, runners_hash, extra) VALUES (?, ?, ?, ?, ?)",
+        (
+            study_name,
+            run_index,
+            run.get("date"),
+            store_blob(db, json.dumps(runners, sort_keys=True))
+            if runners is not None
+            else None,
+            json.dumps(extra),
+        ),
+    )
+    for position, (benchmark_name, benchmark) in enumerate(
+        run.get("benchmarks", {}).items()
+    ):
+        write_benchmark(db, study_name, run_index, position, benchmark_name, benchmark)
+
+
+def write_study(db: sqlite3.Connection, study_name: str, study_data: dict):
+    """Insert or replace a whole study"""
+    extra = {
+        k: v
+        for k, v in study_data.items()
+        if k not in ("name", "runs") and k not in CATALOG_STUDY_COLUMNS
+    }
+    db.execute("DELETE FROM studies WHERE name = ?", (study_name,))
+    db.execute(
+        f"""INSERT INTO studies (name, extra, {", ".join(CATALOG_STUDY_COLUMNS)})
+        VALUES (?, ?, {", ".join("?" * len(CATALOG_STUDY_COLUMNS))})""",
+        (
+            study_name,
+            json.dumps(extra),
+            *(study_data.get(column) for column in CATALOG_STUDY_COLUMNS),
+        ),
+    )
+    for run_index, run in enumerate(study_data.get("runs", [])):
+        write_run(db, study_name, run_index, run)
+
+
+def read_benchmark(db: sqlite3.Connection, row: sqlite3.Row) -> dict:
+    benchmark = {}
+    source = get_blob(db, row["source_hash"])
+    if source is not None:
+        benchmark["source"] = source
+    for column in CATALOG_BENCHMARK_COLUMNS:
+        if row[column] is not None:
+            benchmark[column] = row[column]
+    benchmark.update(json.loads(row["extra"]))
+    return benchmark
+
+
+def read_run(db: sqlite3.Connection, row: sqlite3.Row) -> dict:
+    run = {}
+    runners = get_blob(db, row["runners_hash"])
+    if runners is not None:
+        run["runners"] = json.loads(runners)
+    run["date"] = row["date"]
+    run.update(json.loads(row["extra"]))
+    run["benchmarks"] = {
+        benchmark["name"]: read_benchmark(db, benchmark)
+        for benchmark in db.execute(
+            "SELECT * FROM benchmarks WHERE study = ? AND run_index = ? ORDER BY position",
+            (row["study"], row["run_index"]),
+        )
+    }
+    return run
+
+
+def read_study(db: sqlite3.Connection, study_name: str):
+    """Rebuild the JSON representation of a study, or None if it is not in the catalog"""
+    row = db.execute("SELECT * FROM studies WHERE name = ?", (study_name,)).fetchone()
+    if row is None:
+        return None
+    study_data = {"name": study_name}
+    for column in CATALOG_STUDY_COLUMNS:
+        study_data[column] = row[column]
+    study_data.update(json.loads(row["extra"]))
+    study_data["runs"] = [
+        read_run(db, run)
+        for run in db.execute(
+            "SELECT * FROM runs WHERE study = ? ORDER BY run_index", (study_name,)
+        ).fetchall()
+    ]
+    return study_data
+
+
+def study_exists(study_name: str) -> bool:
+    with open_catalog() as db:
+        found = db.execute(
+            "SELECT 1 FROM studies WHERE name = ?", (study_name,)
+        ).fetchone()
+    return found is not None or (get_studies_dir() / f"{study_name}.json").exists()
+
+
 def load_study(study_name: str):
-    """Load a study JSON file"""
-    studies_dir = get_studies_dir()
-    study_file = studies_dir / f"{study_name}.json"
+    """Load a study from the catalog, importing its legacy JSON file on first use"""
+    with open_catalog() as db:
+        study_data = read_study(db, study_name)
+        if study_data is None:
+            study_file = get_studies_dir() / f"{study_name}.json"
+            if not study_file.exists():
+                raise click.ClickException(
+                    f"Study '{study_name}' not found in {get_catalog_path()} or at {study_file}"
+                )
+            with open(study_file, "r", encoding="utf-8") as f:
+                study_data = json.load(f)
+            write_study(db, study_name, study_data)
+    return study_data
 
-    if not study_file.exists():
-        raise click.ClickException(f"Study '{study_name}' not found at {study_file}")
 
-    with open(study_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+def import_legacy_studies(db: sqlite3.Connection):
+    """Import the study JSON files of the studies directory that are not in the catalog yet"""
+    for study_file in sorted(get_studies_dir().glob("*.json")):
+        if not db.execute(
+            "SELECT 1 FROM studies WHERE name = ?", (study_file.stem,)
+        ).fetchone():
+            with open(study_file, "r", encoding="utf-8") as f:
+                write_study(db, study_file.stem, json.load(f))
 
 
 def save_study(study_name: str, study_data: dict):
-    """Save a study JSON file"""
-    studies_dir = get_studies_dir()
-    study_file = studies_dir / f"{study_name}.json"
+    """Save a study into the catalog"""
+    with open_catalog() as db:
+        write_study(db, study_name, study_data)
+
 
+def export_study(study_name: str, study_file: Path):
+    """Write a study of the catalog as a JSON file"""
+    study_data = load_study(study_name)
     with open(study_file, "w", encoding="utf-8") as f:
         json.dump(study_data, f, indent=4, ensure_ascii=False)
 
 
-def get_runner_config(filepath: str):
+def get_runner_config(host: str | None, key: str | None) -> dict:
+    """Runner of the runner commands: the given host, or the default runner config"""
+    if host and key:
+        return {"contents": {"host": host, "key": key}}
+    print("Runner hostname and key were not supplied, looking in the config dir:")
+    filepath = "./infrastructure/benchmark_configs/runners/benchmark_runner.json"
     with open(filepath, encoding="UTF-8") as benchrunner_config_filehandle:
-        benchrunner_config = json.load(benchrunner_config_filehandle)
-        return benchrunner_config["host"], benchrunner_config["key"]
+        return {"config": filepath, "contents": json.load(benchrunner_config_filehandle)}
 
 
 @runner.command(name="init")
@@ -104,28 +432,19 @@ def get_runner_config(filepath: str):
 )
 def init_remote(host, key, repo_url, repo_branch):
     """Initialize the benchmark instance with the microbenchmark runner."""
-    if not host or not key:
-        print("Runner hostname and key were not supplied, looking in the config dir:")
-        host, key = get_runner_config(
-            "./infrastructure/benchmark_configs/runners/benchmark_runner.json"
-        )
+    runner_config = get_runner_config(host, key)
 
-    with Connection(
-        host=host,
-        user="ubuntu",
-        connect_kwargs={
-            "key_filename": key,
-        },
-    ) as c:
+    with connect_runner(runner_config) as c:
         # Remove existing benchmonik directory if it exists
-        c.run("cd /home/ubuntu && rm -rf ArmoniK.Microbench")
+        c.run(f"cd {RUNNER_HOME} && rm -rf ArmoniK.Microbench")
 
         c.run(
-            f"cd /home/ubuntu && "
+            f"cd {RUNNER_HOME} && "
             f"git clone --recurse-submodules {repo_url} && "
             f"cd ArmoniK.Microbench && "
             f"git checkout {repo_branch} && "
             #   f"git clone https://github.com/aneoconsulting/ArmoniK.Core &&" # Submodules aren't working for some godforsaken reason
+            f"install -D microbench_agent.py {AGENT_PATH} && "
             f"cd benchmark_runner && "
             f"dotnet restore ./BenchmoniK.sln"
         )
@@ -142,21 +461,11 @@ def init_remote(host, key, repo_url, repo_branch):
 )
 def build_core(host, key, repo_branch):
     """Build a specific ArmoniK.Core tag in the remote instance"""
-    if not host or not key:
-        print("Runner hostname and key were not supplied, looking in the config dir:")
-        host, key = get_runner_config(
-            "./infrastructure/benchmark_configs/runners/benchmark_runner.json"
-        )
+    runner_config = get_runner_config(host, key)
 
-    with Connection(
-        host=host,
-        user="ubuntu",
-        connect_kwargs={
-            "key_filename": key,
-        },
-    ) as c:
+    with connect_runner(runner_config) as c:
         c.run(
-            f"cd /home/ubuntu/ArmoniK.Microbench/ArmoniK.Core && "
+            f"cd {RUNNER_HOME}/ArmoniK.Microbench/ArmoniK.Core && "
             f"git checkout {repo_branch} && "
             f"dotnet restore ArmoniK.Core.sln && "
             f"dotnet build -c Release"
@@ -180,23 +489,13 @@ def build_core(host, key, repo_branch):
 )
 def bench(host, key, config_file, config_dir):
     """Run a microbenchmark or set of microbenchmarks in the benchmark instance"""
-    if not host or not key:
-        print("Runner hostname and key were not supplied, looking in the config dir:")
-        host, key = get_runner_config(
-            "./infrastructure/benchmark_configs/runners/benchmark_runner.json"
-        )
+    runner_config = get_runner_config(host, key)
 
     # Ensure at least one of config_file or config_dir is provided
     if not config_file and not config_dir:
         raise click.UsageError("Either --config-file or --config-dir must be provided.")
 
-    with Connection(
-        host=host,
-        user="ubuntu",
-        connect_kwargs={
-            "key_filename": key,
-        },
-    ) as c:
+    with connect_runner(runner_config) as c:
         # Process single config file
         if config_file:
             # Upload the config file to the remote machine
@@ -205,9 +504,9 @@ def bench(host, key, config_file, config_dir):
 
             # Run the benchmark with the config file
             c.run(
-                f"cd /home/ubuntu/ArmoniK.Microbench/benchmark_runner && "
+                f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && "
                 f"dotnet run -c RELEASE --project ./BenchmoniK/BenchmoniK.csproj -- "
-                f"-c {remote_config_path} --armonik-core /home/ubuntu/ArmoniK.Microbench/ArmoniK.Core/"
+                f"-c {remote_config_path} --armonik-core {RUNNER_HOME}/ArmoniK.Microbench/ArmoniK.Core/"
             )
 
         # Process directory of config files
@@ -225,9 +524,9 @@ def bench(host, key, config_file, config_dir):
 
                 # Run the benchmark with the config file
                 c.run(
-                    f"cd /home/ubuntu/ArmoniK.Microbench/benchmark_runner && "
+                    f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && "
                     f"dotnet run -c RELEASE --project ./BenchmoniK/BenchmoniK.csproj -- "
-                    f"-c {remote_config_path} --armonik-core /home/ubuntu/ArmoniK.Microbench/ArmoniK.Core/"
+                    f"-c {remote_config_path} --armonik-core {RUNNER_HOME}/ArmoniK.Microbench/ArmoniK.Core/"
                 )
 
 
@@ -255,25 +554,44 @@ def bench(host, key, config_file, config_dir):
     default=".",
     help="Local directory to download results to.",
 )
-def retrieve_results(host, key, s3_bucket, s3_key, profile, output_dir):
+@click.option(
+    "--transfer",
+    type=click.Choice(["s3", "ssh"]),
+    default="s3",
+    show_default=True,
+    help="Go through a zip uploaded to S3, or stream the artifacts directly over SSH.",
+)
+@click.option(
+    "--tee-s3",
+    is_flag=True,
+    help="With --transfer ssh, also upload the streamed archive to S3 (as a .tar.gz).",
+)
+def retrieve_results(
+    host, key, s3_bucket, s3_key, profile, output_dir, transfer, tee_s3
+):
     """Retrieve the microbenchmark results from the benchmark runner"""
-    if not host or not key:
-        print("Runner hostname and key were not supplied, looking in the config dir:")
-        host, key = get_runner_config(
-            "./infrastructure/benchmark_configs/runners/benchmark_runner.json"
-        )
+    runner_config = get_runner_config(host, key)
+
+    with connect_runner(runner_config) as c:
+        if transfer == "ssh":
+            archive = tempfile.TemporaryFile() if tee_s3 else None
+            transferred = stream_artifacts(c, Path(output_dir), archive)
+            click.echo(
+                f"Streamed {transferred / 1e6:.1f} MB of results to "
+                f"{Path(output_dir) / 'BenchmarkDotNet.Artifacts'}"
+            )
+            if archive is not None:
+                tar_key = s3_key.removesuffix(".zip") + ".tar.gz"
+                archive.seek(0)
+                session = s3_session(profile)
+                upload_and_close(session.client("s3"), archive, s3_bucket, tar_key)
+                click.echo(f"Results archive uploaded to S3 bucket {s3_bucket}/{tar_key}")
+            return
 
-    with Connection(
-        host=host,
-        user="ubuntu",
-        connect_kwargs={
-            "key_filename": key,
-        },
-    ) as c:
         # Zip the artifacts directory
         remote_zip_path = "/tmp/benchmark-artifacts.zip"
         c.run(
-            f"cd /home/ubuntu/ArmoniK.Microbench/benchmark_runner && zip -r {remote_zip_path} BenchmarkDotNet.Artifacts"
+            f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && zip -r {remote_zip_path} BenchmarkDotNet.Artifacts"
         )
 
         c.run(f"aws s3 cp {remote_zip_path} s3://{s3_bucket}/{s3_key}")
@@ -282,7 +600,7 @@ def retrieve_results(host, key, s3_bucket, s3_key, profile, output_dir):
         os.makedirs(output_dir, exist_ok=True)
 
         # Download from S3 to local machine
-        session = boto3.Session(profile_name=profile)
+        session = s3_session(profile)
         s3 = session.client("s3")
         local_zip_path = os.path.join(output_dir, os.path.basename(s3_key))
         s3.download_file(s3_bucket, s3_key, local_zip_path)
@@ -324,6 +642,86 @@ def serve_docs(port: int):
         raise click.Abort()
 
 
+# Modules that must not be imported by the commands of `dev check-startup`
+STARTUP_LAZY_MODULES = ("boto3", "botocore", "fabric", "paramiko", "invoke", "rich.live", "rich.progress")
+
+
+@dev.command("check-startup")
+@click.option(
+    "--help-budget",
+    default=300,
+    show_default=True,
+    help="Startup budget of `--help`, in milliseconds",
+)
+@click.option(
+    "--create-budget",
+    default=300,
+    show_default=True,
+    help="Startup budget of `study create`, in milliseconds",
+)
+@click.option(
+    "--repeat",
+    default=5,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Runs of each command, the fastest one is compared to the budget",
+)
+def check_startup(help_budget: int, create_budget: int, repeat: int):
+    """
+    Check that the CLI starts within its time budget and does not import the heavy backends eagerly.
+    Each command runs with `python -X importtime` in a scratch directory, fails the check when over budget.
+    """
+    script = Path(__file__).resolve()
+    failures = []
+    for label, args, budget in [
+        ("--help", ["--help"], help_budget),
+        ("study create", ["study", "create", "startup-check"], create_budget),
+    ]:
+        durations = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as scratch:
+                start = time.perf_counter()
+                result = subprocess.run(
+                    [sys.executable, "-X", "importtime", str(script), *args],
+                    cwd=scratch,
+                    capture_output=True,
+                    text=True,
+                )
+                durations.append((time.perf_counter() - start) * 1000)
+            if result.returncode != 0:
+                raise click.ClickException(f"{label} failed: {result.stdout}{result.stderr}")
+
+        # importtime lines: "import time: self [us] | cumulative | module", nested imports are indented
+        imports = {}
+        top_level = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, module = line.split("|")
+                if cumulative.strip().isdigit():
+                    imports[module.strip()] = int(cumulative)
+                    if not module[1:].startswith(" "):
+                        top_level[module.strip()] = int(cumulative)
+        eager = sorted(
+            m
+            for m in imports
+            if any(m == lazy or m.startswith(f"{lazy}.") for lazy in STARTUP_LAZY_MODULES)
+        )
+        slowest = sorted(top_level.items(), key=lambda item: -item[1])[:3]
+        fastest = min(durations)
+        click.echo(
+            f"{label}: {fastest:.0f} ms (budget {budget} ms), slowest imports: "
+            + ", ".join(f"{m} {us / 1000:.0f} ms" for m, us in slowest)
+        )
+        if fastest > budget:
+            failures.append(f"{label} took {fastest:.0f} ms, over its {budget} ms budget")
+        if eager:
+            failures.append(f"{label} imports {', '.join(eager)}")
+
+    if failures:
+        raise click.ClickException("; ".join(failures))
+    click.secho("Startup within budget", fg="green")
+
+
 @dev.command("publish-docs")
 @click.option(
     "--message",
@@ -377,13 +775,8 @@ def create_study(
     study_name: str, core_version: str, runner_version: str, key_path: str
 ):
     """Create a new microbenchmarking study"""
-    studies_dir = get_studies_dir()
-    study_file = studies_dir / f"{study_name}.json"
-
-    if study_file.exists():
-        raise click.ClickException(
-            f"Study '{study_name}' already exists at {study_file}"
-        )
+    if study_exists(study_name):
+        raise click.ClickException(f"Study '{study_name}' already exists")
 
     # Create study structure
     study_data = {
@@ -397,312 +790,2994 @@ def create_study(
     }
 
     save_study(study_name, study_data)
-    click.echo(f"Created study '{study_name}' at {study_file}")
+    click.echo(f"Created study '{study_name}' in {get_catalog_path()}")
 
 
-@study.command("run")
-@click.argument("study_name")
-@click.option(
-    "--runner",
-    "runner_config",
-    default="./infrastructure/benchmark_configs/runners/benchmark_runner.json",
-    help="Path to runner config file",
-)
-@click.option(
-    "-c",
-    "--config",
-    "config_files",
-    multiple=True,
-    type=click.Path(exists=True, file_okay=True, dir_okay=False),
-    help="Individual benchmark config files to run",
-)
-@click.option(
-    "--directory",
-    "config_dir",
-    type=click.Path(exists=True, file_okay=False, dir_okay=True),
-    help="Directory containing benchmark config files",
-)
-@click.option(
-    "--s3-bucket",
-    default="armonik-microbench-results",
-    help="S3 bucket to store results",
-)
-@click.option(
-    "--profile", envvar="AWS_PROFILE", default="default", help="AWS profile to use"
-)
-@click.option(
-    "--repo-url",
-    type=str,
-    help="URL of the Git repository to clone.",
-    default="https://github.com/aneoconsulting/ArmoniK.Microbench.git",
-)
-@click.option(
-    "--repo-branch",
-    type=str,
-    default="main",
-    help="Branch of the repository to checkout. Defaults to main.",
-)
-@click.option(
-    "--skip-init",
-    is_flag=True,
-    help="Skip initialization step (assume environment is already set up)",
+@study.command("import")
+@click.argument(
+    "study_files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
 )
 @click.option(
-    "--skip-build",
-    is_flag=True,
-    help="Skip core build step (assume core is already built)",
+    "--replace", is_flag=True, help="Replace studies already present in the catalog"
 )
-def run_study(
-    study_name: str,
-    runner_config: str,
-    config_files: tuple,
-    config_dir: str,
-    s3_bucket: str,
-    profile: str,
-    skip_init: bool,
-    skip_build: bool,
-    repo_url: str,
-    repo_branch: str,
-):
-    """Run benchmarks for a study"""
-    # Load existing study
-    study_data = load_study(study_name)
-
-    # Validate inputs
-    if not config_files and not config_dir:
-        raise click.UsageError("Either --config (-c) or --directory must be provided.")
-
-    # Get runner connection details
-    host, key = get_runner_config(runner_config)
-
-    # Load runner config contents
-    with open(runner_config, "r", encoding="utf-8") as f:
-        runner_config_contents = json.load(f)
+def import_studies(study_files: tuple, replace: bool):
+    """Import study JSON files into the catalog"""
+    with open_catalog() as db:
+        for study_file in study_files:
+            with open(study_file, "r", encoding="utf-8") as f:
+                study_data = json.load(f)
+            study_name = study_data.get("name", Path(study_file).stem)
+            exists = db.execute(
+                "SELECT 1 FROM studies WHERE name = ?", (study_name,)
+            ).fetchone()
+            if exists and not replace:
+                click.echo(f"Skipping '{study_name}': already in the catalog")
+                continue
+            write_study(db, study_name, study_data)
+            click.echo(
+                f"Imported '{study_name}' ({len(study_data.get('runs', []))} run(s))"
+            )
 
-    # Collect all config files to run
-    benchmark_configs = []
-    if config_files:
-        benchmark_configs.extend(config_files)
 
-    if config_dir:
-        config_dir_path = Path(config_dir)
-        benchmark_configs.extend(
-            [
-                str(f)
-                for f in config_dir_path.iterdir()
-                if f.is_file() and f.suffix.lower() in [".json", ".yaml", ".yml"]
+@study.command("export")
+@click.argument("study_names", nargs=-1)
+@click.option(
+    "--output-dir",
+    default="./studies",
+    help="Directory to write the <study>.json files to",
+)
+def export_studies(study_names: tuple, output_dir: str):
+    """Export studies of the catalog as JSON files (default: every study)"""
+    if not study_names:
+        with open_catalog() as db:
+            study_names = [
+                row["name"] for row in db.execute("SELECT name FROM studies ORDER BY name")
             ]
-        )
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    for study_name in study_names:
+        study_file = output_path / f"{study_name}.json"
+        export_study(study_name, study_file)
+        click.echo(f"Exported '{study_name}' to {study_file}")
 
-    if not benchmark_configs:
-        raise click.ClickException("No benchmark configuration files found")
 
-    # Create new run entry
-    run_timestamp = datetime.now().isoformat()
-    run_entry = {
-        "runner_config": runner_config,
-        "runner_config_contents": runner_config_contents,
-        "date": run_timestamp,
-        "benchmarks": {},
-    }
+def format_duration(duration) -> str:
+    return "" if duration is None else f"{duration:.0f}s"
 
-    click.echo(
-        f"Running {len(benchmark_configs)} benchmark(s) for study '{study_name}'"
-    )
 
-    with Connection(
-        host=host,
-        user="ubuntu",
-        connect_kwargs={"key_filename": key},
-    ) as c:
-        # Step 1: Initialize the benchmark environment (like runner init)
-        if not skip_init:
-            click.echo("Step 1/3: Initializing benchmark environment...")
-            try:
-                # Remove existing directory if it exists
-                c.run("cd /home/ubuntu && rm -rf ArmoniK.Microbench", warn=True)
+@study.command("list")
+@click.option("--name", help="Glob pattern on the study name")
+@click.option("--core-version", help="Glob pattern on the core version, e.g. '0.25.*'")
+@click.option("--component", help="Glob pattern on the benchmark component")
+@click.option("--status", help="Benchmark status, e.g. 'failed'")
+@click.option("--runner", "runner_name", help="Glob pattern on the runner name")
+def list_studies(
+    name: str | None,
+    core_version: str | None,
+    component: str | None,
+    status: str | None,
+    runner_name: str | None,
+):
+    """
+    List the studies of the catalog.
+    With a benchmark filter (--component, --status, --runner), list the matching benchmarks instead.
+    Patterns are case insensitive.
+    """
+    conditions = []
+    parameters = []
+    for column, pattern in [
+        ("s.name", name),
+        ("s.core_version", core_version),
+        ("b.component", component),
+        ("b.status", status),
+        ("b.runner", runner_name),
+    ]:
+        if pattern:
+            conditions.append(f"lower({column}) GLOB lower(?)")
+            parameters.append(pattern)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-                # Clone and setup the repository
-                c.run(
-                    f"cd /home/ubuntu && "
-                    f"git clone --recurse-submodules {repo_url} && "
-                    f"cd ArmoniK.Microbench && "
-                    f"git checkout {repo_branch} && "
-                    f"cd benchmark_runner && "
-                    f"dotnet restore ./BenchmoniK.sln"
+    with open_catalog() as db:
+        import_legacy_studies(db)
+        if component or status or runner_name:
+            rows = db.execute(
+                f"""SELECT s.name AS study, s.core_version, b.run_index, r.date, b.name,
+                    b.component, b.status, b.runner, b.duration
+                FROM benchmarks b
+                JOIN studies s ON s.name = b.study
+                JOIN runs r ON r.study = b.study AND r.run_index = b.run_index
+                {where}
+                ORDER BY r.date, b.position""",
+                parameters,
+            ).fetchall()
+            table = Table(title=f"{len(rows)} benchmark(s)")
+            for column in [
+                "Study",
+                "Core",
+                "Run",
+                "Date",
+                "Benchmark",
+                "Component",
+                "Status",
+                "Runner",
+                "Duration",
+            ]:
+                table.add_column(column)
+            for row in rows:
+                table.add_row(
+                    row["study"],
+                    row["core_version"],
+                    str(row["run_index"]),
+                    row["date"],
+                    row["name"],
+                    row["component"],
+                    row["status"],
+                    row["runner"],
+                    format_duration(row["duration"]),
                 )
-
-                click.echo("Environment initialization completed successfully")
-            except Exception as e:
-                raise click.ClickException(f"Failed to initialize environment: {e}")
         else:
-            click.echo("Step 1/3: Skipping initialization (--skip-init)")
+            rows = db.execute(
+                f"""SELECT s.name, s.core_version, s.creation_date,
+                    COUNT(DISTINCT b.run_index) AS runs,
+                    COUNT(b.name) AS benchmarks,
+                    COALESCE(SUM(b.status = 'success'), 0) AS successful
+                FROM studies s
+                LEFT JOIN benchmarks b ON b.study = s.name
+                {where}
+                GROUP BY s.name
+                ORDER BY s.creation_date""",
+                parameters,
+            ).fetchall()
+            table = Table(title=f"{len(rows)} stud{'y' if len(rows) == 1 else 'ies'}")
+            for column in ["Study", "Core", "Created", "Runs", "Benchmarks", "Successful"]:
+                table.add_column(column)
+            for row in rows:
+                table.add_row(
+                    row["name"],
+                    row["core_version"],
+                    row["creation_date"],
+                    str(row["runs"]),
+                    str(row["benchmarks"]),
+                    str(row["successful"]),
+                )
+    Console().print(table)
 
-        # Step 2: Build ArmoniK.Core (like runner build-core)
-        if not skip_build:
-            click.echo(
-                f"Step 2/3: Building ArmoniK.Core version '{study_data['core_version']}'..."
-            )
-            try:
-                core_version = study_data["core_version"]
-                if core_version == "latest":
-                    core_version = "main"
 
-                c.run(
-                    f"cd /home/ubuntu/ArmoniK.Microbench/ArmoniK.Core && "
-                    f"git checkout {core_version} && "
-                    f"dotnet restore ArmoniK.Core.sln && "
-                    f"dotnet build -c Release"
+@study.command("show")
+@click.argument("study_name")
+@click.option("--run-index", type=int, help="Only show this run")
+def show_study(study_name: str, run_index: int | None):
+    """Show the runs and benchmarks of a study"""
+    load_study(study_name)
+    console = Console()
+    with open_catalog() as db:
+        study_row = db.execute(
+            "SELECT * FROM studies WHERE name = ?", (study_name,)
+        ).fetchone()
+        console.print(
+            f"[bold]{study_name}[/bold]: core {study_row['core_version']}, "
+            f"runner {study_row['benchmark_runner_version']}, created {study_row['creation_date']}"
+        )
+        runs = db.execute(
+            "SELECT * FROM runs WHERE study = ? AND (? IS NULL OR run_index = ?) ORDER BY run_index",
+            (study_name, run_index, run_index),
+        ).fetchall()
+        if not runs:
+            console.print("No runs")
+        for run in runs:
+            table = Table(title=f"Run {run['run_index']} ({run['date']})")
+            for column in [
+                "Benchmark",
+                "Component",
+                "Status",
+                "Runner",
+                "Duration",
+                "Config",
+                "Error",
+            ]:
+                table.add_column(column)
+            for row in db.execute(
+                "SELECT * FROM benchmarks WHERE study = ? AND run_index = ? ORDER BY position",
+                (study_name, run["run_index"]),
+            ):
+                status = row["status"]
+                cached_from = json.loads(row["extra"]).get("cached_from")
+                if cached_from:
+                    status += f" (reused from {cached_from['study']} run {cached_from['run_index']})"
+                table.add_row(
+                    row["name"],
+                    row["component"],
+                    status,
+                    row["runner"],
+                    format_duration(row["duration"]),
+                    (row["source_hash"] or "")[:12],
+                    row["error"],
+                )
+            console.print(table)
+            for runner_name, environment in json.loads(run["extra"]).get("environment", {}).items():
+                fingerprint = environment["fingerprint"]
+                console.print(
+                    f"{runner_name}: {fingerprint['instance_type'] or fingerprint['cpu_model']}, "
+                    f"kernel {fingerprint['kernel']}, governor {fingerprint['cpu_governor']}, "
+                    f".NET SDK {fingerprint['dotnet_sdk'] or 'unknown'}, sha256 {environment['cpu']['sha256_mb_s']:.0f} MB/s"
                 )
 
-                click.echo("Core build completed successfully")
-            except Exception as e:
-                raise click.ClickException(f"Failed to build ArmoniK.Core: {e}")
-        else:
-            click.echo("Step 2/3: Skipping core build (--skip-build)")
 
-        for config_file in benchmark_configs:
-            config_path = Path(config_file)
-            config_name = config_path.stem
+def get_benchmark_durations(study_data: dict) -> dict:
+    """Collect the most recent successful duration (in seconds) of each benchmark config across previous runs"""
+    durations = {}
+    for run in study_data.get("runs", []):
+        for benchmark_name, benchmark_data in run.get("benchmarks", {}).items():
+            if benchmark_data.get("status") == "success" and benchmark_data.get(
+                "duration"
+            ):
+                durations[benchmark_name] = benchmark_data["duration"]
+    return durations
 
-            click.echo(f"Running benchmark: {config_name}")
 
-            # Read config file contents
-            with open(config_file, "r", encoding="utf-8") as f:
-                config_contents = f.read()
+def order_longest_first(benchmark_configs: list, durations: dict) -> list:
+    """Order benchmark configs longest-first (LPT) so that a pool of runners finishes as early as possible.
 
-            # Upload config file to remote machine
-            remote_config_path = f"/tmp/{config_path.name}"
-            c.put(config_file, remote_config_path)
+    Configs without a recorded duration are scheduled first, since they could be the longest ones.
+    """
+    return sorted(
+        benchmark_configs,
+        key=lambda config_file: durations.get(Path(config_file).name, float("inf")),
+        reverse=True,
+    )
 
-            # Generate unique result paths
-            timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            results_key = f"{study_name}/{run_timestamp.split('T')[0]}/{config_name}_{timestamp_str}_results.zip"
-            logs_key = f"{study_name}/{run_timestamp.split('T')[0]}/{config_name}_{timestamp_str}_logs.txt"
 
-            try:
-                # Run the benchmark
-                result = c.run(
-                    f"cd /home/ubuntu/ArmoniK.Microbench/benchmark_runner && "
-                    f"dotnet run -c RELEASE --project ./BenchmoniK/BenchmoniK.csproj -- "
-                    f"-c {remote_config_path} --armonik-core /home/ubuntu/ArmoniK.Microbench/ArmoniK.Core/ "
-                    f"2>&1 | tee /tmp/{config_name}_logs.txt",
-                    warn=True,
-                )
+def partition_longest_first(
+    benchmark_configs: list, durations: dict, runner_names: list
+) -> dict:
+    """Assign each config to the least loaded runner, longest first, for runners that work through a fixed batch"""
+    known = [durations[Path(c).name] for c in benchmark_configs if Path(c).name in durations]
+    default_duration = sum(known) / len(known) if known else 1.0
+    loads = {runner_name: 0.0 for runner_name in runner_names}
+    assignment = {runner_name: [] for runner_name in runner_names}
+    for config_file in order_longest_first(benchmark_configs, durations):
+        runner_name = min(loads, key=loads.get)
+        assignment[runner_name].append(config_file)
+        loads[runner_name] += durations.get(Path(config_file).name, default_duration)
+    return assignment
 
-                # Upload logs to S3
-                c.run(
-                    f"aws s3 cp /tmp/{config_name}_logs.txt s3://{s3_bucket}/{logs_key}"
-                )
 
-                # TODO: No more zipping, just send it as is with some nice clean relevant renaming.
-                # Zip and upload results with unique naming
-                remote_zip_path = f"/tmp/{config_name}_{timestamp_str}_results.zip"
-                c.run(
-                    f"cd /home/ubuntu/ArmoniK.Microbench/benchmark_runner && "
-                    f"zip -r {remote_zip_path} BenchmarkDotNet.Artifacts"
+def get_runner_pool(runner_configs: tuple) -> dict:
+    """Load a pool of runner configs, keyed by a unique runner name"""
+    pool = {}
+    # Local runners sharing a directory would share their clone and overwrite each other's artifacts
+    local_homes = {}
+    for runner_config in runner_configs:
+        with open(runner_config, "r", encoding="utf-8") as f:
+            runner_config_contents = json.load(f)
+        runner_name = Path(runner_config).stem
+        if runner_name in pool:
+            runner_name = f"{runner_name}-{runner_config_contents.get('host', 'local')}"
+        if runner_name in pool:
+            raise click.UsageError(f"Runner config {runner_config} was given twice")
+        if runner_config_contents.get("backend", "ssh") == "local":
+            home = local_runner_home(runner_config_contents)
+            if home in local_homes:
+                raise click.UsageError(
+                    f"Local runners {local_homes[home]} and {runner_name} both use {home}, "
+                    f"give each one its own \"home\""
                 )
+            local_homes[home] = runner_name
+        pool[runner_name] = {
+            "config": runner_config,
+            "contents": runner_config_contents,
+        }
+    return pool
 
-                c.run(f"aws s3 cp {remote_zip_path} s3://{s3_bucket}/{results_key}")
 
-                # Clean up remote files
-                c.run(
-                    f"rm -f {remote_config_path} {remote_zip_path} /tmp/{config_name}_logs.txt"
-                )
-                c.run(
-                    "cd /home/ubuntu/ArmoniK.Microbench/benchmark_runner && rm -rf BenchmarkDotNet.Artifacts"
-                )
+def resolve_commit(repo_url: str, ref: str) -> str:
+    """Resolve a branch, tag or full commit SHA of a remote repository to a commit SHA"""
+    if re.fullmatch(r"[0-9a-f]{40}", ref):
+        return ref
+    try:
+        output = subprocess.run(
+            ["git", "ls-remote", repo_url, ref, f"{ref}^{{}}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise click.ClickException(f"Failed to list the refs of {repo_url}: {e}")
 
-                # Store benchmark info
-                run_entry["benchmarks"][config_path.name] = {
-                    "source": config_contents,
-                    "results": f"s3://{s3_bucket}/{results_key}",
-                    "logs": f"s3://{s3_bucket}/{logs_key}",
-                    "status": "success" if result.return_code == 0 else "failed",
-                }
+    refs = {}
+    for line in output.splitlines():
+        sha, name = line.split("\t", 1)
+        refs[name] = sha
+    # Annotated tags are peeled to the commit they point to
+    for name in [f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", f"refs/heads/{ref}"]:
+        if name in refs:
+            return refs[name]
+    raise click.ClickException(
+        f"Cannot resolve '{ref}' in {repo_url} (short SHAs are not supported)"
+    )
 
-                click.echo(f"Completed benchmark: {config_name}")
 
-            except Exception as e:
-                click.echo(f"Failed to run benchmark {config_name}: {e}")
-                run_entry["benchmarks"][config_path.name] = {
-                    "source": config_contents,
-                    "results": "",
-                    "logs": f"s3://{s3_bucket}/{logs_key}"
-                    if "logs_key" in locals()
-                    else "",
-                    "status": "failed",
-                    "error": str(e),
-                }
+class LocalRunner:
+    """A runner on this machine, standing in for the SSH connection to a remote runner.
 
-    # Add run to study and save
-    study_data["runs"].append(run_entry)
-    save_study(study_name, study_data)
+    Commands run in a local shell with HOME set to the runner directory, so that the runner layout lives there.
+    """
 
-    successful_runs = sum(
-        1 for b in run_entry["benchmarks"].values() if b.get("status") == "success"
-    )
-    total_runs = len(run_entry["benchmarks"])
-    click.echo(
-        f"Study run completed: {successful_runs}/{total_runs} benchmarks successful"
-    )
+    def __init__(self, home: str | Path):
+        from invoke import Config as InvokeConfig, Context
 
+        self.home = Path(home).expanduser().resolve()
+        self.home.mkdir(parents=True, exist_ok=True)
+        self.context = Context(
+            InvokeConfig(overrides={"run": {"env": {"HOME": str(self.home)}}})
+        )
 
-@study.command("sync")
-@click.argument("study_name")
-@click.option(
-    "--output-dir", default="./results", help="Local directory to download results to"
-)
-@click.option(
-    "--profile", envvar="AWS_PROFILE", default="default", help="AWS profile to use"
-)
-@click.option("--no-profile", "no_profile", is_flag=True, default=False)
-@click.option(
-    "--run-index", type=int, help="Specific run index to sync (default: all runs)"
-)
-def sync_study(
-    study_name: str, output_dir: str, profile: str, no_profile: bool, run_index: int
-):
-    """Download study run results from S3"""
-    study_data = load_study(study_name)
+    def run(self, command: str, **kwargs):
+        """Run a shell command, with the options of fabric's `Connection.run`"""
+        return self.context.run(command, **kwargs)
 
-    if not study_data["runs"]:
-        raise click.ClickException(f"No runs found for study '{study_name}'")
+    def remote_path(self, path: str) -> Path:
+        """Local path of a runner path, relative paths and ~ being in the runner directory"""
+        if path == "~" or path.startswith("~/"):
+            path = path[2:]
+        return self.home / path
 
-    # Determine which runs to sync
-    runs_to_sync = []
-    if run_index is not None:
-        if run_index >= len(study_data["runs"]):
-            raise click.ClickException(
-                f"Run index {run_index} not found (max: {len(study_data['runs']) - 1})"
-            )
-        runs_to_sync = [study_data["runs"][run_index]]
-    else:
-        runs_to_sync = study_data["runs"]
+    def put(self, local: str, remote: str):
+        remote_path = self.remote_path(remote)
+        remote_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(local, remote_path)
 
-    # Create output directory structure
-    output_path = Path(output_dir) / study_name
-    output_path.mkdir(parents=True, exist_ok=True)
+    def popen(self, command: str) -> subprocess.Popen:
+        """Start a command in the background with its output piped, like an SSH channel"""
+        return subprocess.Popen(
+            ["bash", "-c", command],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, "HOME": str(self.home)},
+        )
 
-    # Initialize S3 client
-    if no_profile:
-        session = boto3.Session()
-    else:
-        session = boto3.Session(profile_name=profile)
-    s3 = session.client("s3")
+    def open(self):
+        pass
 
-    click.echo(f"Syncing {len(runs_to_sync)} run(s) for study '{study_name}'")
+    def close(self):
+        pass
 
-    for i, run in enumerate(runs_to_sync):
-        run_dir = (
-            output_path
-            / f"run_{i if run_index is None else run_index}_{run['date'].split('T')[0]}"
-        )
-        run_dir.mkdir(exist_ok=True)
+    def __enter__(self):
+        return self
 
-        click.echo(f"Syncing run {i if run_index is None else run_index} to {run_dir}")
+    def __exit__(self, *exc_info):
+        self.close()
 
-        for benchmark_name, benchmark_data in run["benchmarks"].items():
+
+def local_runner_home(contents: dict) -> Path:
+    """Directory of a local runner config"""
+    return Path(contents.get("home", LOCAL_RUNNER_HOME)).expanduser().resolve()
+
+
+def connect_runner(runner: dict) -> Connection | LocalRunner:
+    """Connect to a runner of a runner pool: over SSH, or on this machine for `"backend": "local"` configs"""
+    contents = runner["contents"]
+    if contents.get("backend", "ssh") == "local":
+        return LocalRunner(local_runner_home(contents))
+    from fabric import Connection
+
+    return Connection(
+        host=contents["host"],
+        user="ubuntu",
+        connect_kwargs={"key_filename": contents["key"]},
+    )
+
+
+# Name of the timeline of the phases run on this machine rather than on a runner
+ORCHESTRATOR_TRACK = "orchestrator"
+# Name of the timeline of the background uploads of streamed artifacts
+UPLOADS_TRACK = "uploads"
+
+
+class PhaseTracer:
+    """Times the orchestration phases of a run on each runner, for a Chrome trace-event file and a summary.
+
+    The trace opens in Perfetto (ui.perfetto.dev) or chrome://tracing, with one track per runner.
+    """
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.origin = time.perf_counter()
+        self.events = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str, track: str, **args):
+        """Time the enclosed block as a phase of a track. The yielded args can be completed inside the block"""
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException:
+            args["failed"] = True
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                self.events.append((name, track, start - self.origin, duration, args))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def to_chrome_trace(self) -> dict:
+        """Trace-event JSON of the phases, as complete events in microseconds"""
+        with self.lock:
+            events = sorted(self.events, key=lambda e: e[2])
+        tracks = sorted({track for _, track, _, _, _ in events} - {ORCHESTRATOR_TRACK})
+        tids = {ORCHESTRATOR_TRACK: 0, **{track: i for i, track in enumerate(tracks, 1)}}
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": track}}
+            for track, tid in tids.items()
+        ]
+        trace_events += [
+            {
+                "name": name,
+                "cat": "orchestration",
+                "ph": "X",
+                "ts": round(start * 1e6),
+                "dur": round(duration * 1e6),
+                "pid": 1,
+                "tid": tids[track],
+                "args": args,
+            }
+            for name, track, start, duration, args in events
+        ]
+        return {
+            "traceEvents": trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"start": datetime.fromtimestamp(self.start_time).isoformat()},
+        }
+
+    def summary(self) -> dict:
+        """Count, total, mean and max duration in seconds of every phase, longest total first"""
+        durations = {}
+        with self.lock:
+            for name, _, _, duration, _ in self.events:
+                durations.setdefault(name, []).append(duration)
+        return {
+            name: {
+                "count": len(values),
+                "total": sum(values),
+                "mean": statistics.fmean(values),
+                "max": max(values),
+            }
+            for name, values in sorted(durations.items(), key=lambda item: -sum(item[1]))
+        }
+
+
+def save_phase_trace(
+    tracer: PhaseTracer,
+    store: "ArtifactStore",
+    study_name: str,
+    run_index: int,
+    run_entry: dict,
+):
+    """Store the trace of the phases and record their summary in the run entry, then print it"""
+    key = (
+        f"{study_name}/{run_entry['date'].split('T')[0]}/"
+        f"run_{run_index}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_trace.json"
+    )
+    orchestration = {"wall_clock": tracer.elapsed(), "phases": tracer.summary()}
+    try:
+        store.upload_fileobj(io.BytesIO(json.dumps(tracer.to_chrome_trace()).encode()), key)
+        orchestration["trace"] = store.uri(key)
+    except Exception as e:
+        click.echo(f"Failed to store the phase trace: {e}")
+    run_entry.setdefault("orchestration", []).append(orchestration)
+
+    table = Table(title=f"Orchestration phases ({orchestration['wall_clock']:.1f}s wall clock)")
+    for column in ("Phase", "Count", "Total (s)", "Mean (s)", "Max (s)", "Share"):
+        table.add_column(column, justify="left" if column == "Phase" else "right")
+    traced = sum(p["total"] for p in orchestration["phases"].values()) or 1
+    for name, p in orchestration["phases"].items():
+        table.add_row(
+            name,
+            str(p["count"]),
+            f"{p['total']:.1f}",
+            f"{p['mean']:.2f}",
+            f"{p['max']:.2f}",
+            f"{p['total'] / traced:.1%}",
+        )
+    Console().print(table)
+
+
+def prepare_runner(
+    c: Connection,
+    runner_name: str,
+    core_commit: str,
+    repo_url: str,
+    runner_commit: str,
+    core_repo_url: str,
+    skip_init: bool,
+    skip_build: bool,
+    hide: bool,
+    tracer: PhaseTracer,
+):
+    """Update the benchmark environment and build ArmoniK.Core on a runner, reusing what is already there"""
+    # Step 1: Initialize the benchmark environment (like runner init), incrementally
+    if not skip_init:
+        click.echo(
+            f"[{runner_name}] Step 1/3: Updating benchmark environment to {runner_commit[:12]}..."
+        )
+        try:
+            with tracer.phase("init", runner_name):
+                c.run(
+                    f"cd {RUNNER_HOME} && "
+                    f"if [ -d ArmoniK.Microbench/.git ]; then "
+                    f"cd ArmoniK.Microbench && git remote set-url origin {repo_url} && git fetch --prune origin; "
+                    f"else rm -rf ArmoniK.Microbench && git clone {repo_url} ArmoniK.Microbench && cd ArmoniK.Microbench; "
+                    f"fi && "
+                    f"(git cat-file -e {runner_commit}^{{commit}} || git fetch origin {runner_commit}) && "
+                    f"git checkout --force --detach {runner_commit} && "
+                    f"install -D microbench_agent.py {AGENT_PATH}",
+                    hide=hide,
+                )
+            with tracer.phase("restore", runner_name):
+                c.run(
+                    f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && "
+                    f"dotnet restore ./BenchmoniK.sln",
+                    hide=hide,
+                )
+
+            click.echo(
+                f"[{runner_name}] Environment initialization completed successfully"
+            )
+        except Exception as e:
+            raise click.ClickException(
+                f"[{runner_name}] Failed to initialize environment: {e}"
+            )
+    else:
+        click.echo(f"[{runner_name}] Step 1/3: Skipping initialization (--skip-init)")
+
+    # Step 2: Build ArmoniK.Core (like runner build-core), once per commit
+    if not skip_build:
+        click.echo(
+            f"[{runner_name}] Step 2/3: Building ArmoniK.Core commit {core_commit[:12]}..."
+        )
+        build_dir = f"{CORE_BUILDS_DIR}/{core_commit}"
+        core_link = f"{RUNNER_HOME}/ArmoniK.Microbench/ArmoniK.Core"
+        try:
+            with tracer.phase("build", runner_name, commit=core_commit[:12]) as build_args:
+                # The worktree is used through the submodule path, so that BenchmoniK and ArmoniK.Core are
+                # built with the same project paths and the cached outputs stay valid
+                c.run(
+                    f"mkdir -p {CORE_BUILDS_DIR} && "
+                    f"if [ -d {CORE_MIRROR_DIR} ]; then "
+                    f"git -C {CORE_MIRROR_DIR} remote set-url origin {core_repo_url}; "
+                    f"else git clone --bare {core_repo_url} {CORE_MIRROR_DIR}; "
+                    f"fi && "
+                    f"rm -rf {core_link} && ln -s {build_dir} {core_link}",
+                    hide=hide,
+                )
+                cached = c.run(
+                    f"test -f {build_dir}/{CORE_BUILD_MARKER}", warn=True, hide=True
+                ).ok
+                build_args["cached"] = cached
+                if cached:
+                    click.echo(f"[{runner_name}] Reusing the cached ArmoniK.Core build")
+                else:
+                    c.run(
+                        f"cd {CORE_MIRROR_DIR} && "
+                        f"(git cat-file -e {core_commit}^{{commit}} || "
+                        f"git fetch origin '+refs/heads/*:refs/heads/*' '+refs/tags/*:refs/tags/*' {core_commit}) && "
+                        f"git worktree prune && "
+                        f"([ -d {build_dir} ] || git worktree add --force --detach {build_dir} {core_commit}) && "
+                        f"cd {core_link} && "
+                        f"dotnet restore ArmoniK.Core.sln && "
+                        f"dotnet build -c Release && "
+                        f"git rev-parse HEAD > {CORE_BUILD_MARKER}",
+                        hide=hide,
+                    )
+                    click.echo(f"[{runner_name}] Core build completed successfully")
+
+                # Evict the least recently used builds
+                c.run(
+                    f"touch {build_dir} && cd {CORE_BUILDS_DIR} && "
+                    f"ls -t | tail -n +{CORE_BUILD_CACHE_SIZE + 1} | xargs -r rm -rf && "
+                    f"git -C {CORE_MIRROR_DIR} worktree prune",
+                    hide=True,
+                    warn=True,
+                )
+        except Exception as e:
+            raise click.ClickException(f"[{runner_name}] Failed to build ArmoniK.Core: {e}")
+    else:
+        click.echo(f"[{runner_name}] Step 2/3: Skipping core build (--skip-build)")
+
+
+# Keys of the backend endpoints in the benchmark configs, with the port used when the endpoint has none
+BACKEND_ENDPOINT_KEYS = {
+    "Redis:EndpointUrl": 6379,
+    "S3:EndpointUrl": 443,
+    "SQS:ServiceURL": 443,
+    "Amqp:Host": 5672,
+}
+
+
+def calibration_targets(sources: list) -> tuple[list, list]:
+    """Backend endpoints (`COMPONENT=HOST:PORT`) and local storage directories of benchmark config sources"""
+    endpoints, disks = [], []
+    for source in sources:
+        try:
+            config = json.loads(source)
+        except ValueError:
+            continue
+        component = config.get("Component", "")
+        for key, default_port in BACKEND_ENDPOINT_KEYS.items():
+            value = str(config.get(key, ""))
+            if not value:
+                continue
+            parsed = urlparse(value if "://" in value else f"//{value}")
+            port = parsed.port
+            if key == "Amqp:Host":
+                port = port or config.get("Amqp:Port")
+            port = port or {"http": 80, "https": 443}.get(parsed.scheme, default_port)
+            endpoint = f"{component}={parsed.hostname}:{port}"
+            if parsed.hostname and endpoint not in endpoints:
+                endpoints.append(endpoint)
+        if config.get("LocalStorage:Path") and config["LocalStorage:Path"] not in disks:
+            disks.append(config["LocalStorage:Path"])
+    return endpoints, disks
+
+
+def calibrate_runner(c: Connection | LocalRunner, runner_name: str, sources: list) -> dict | None:
+    """Environment fingerprint and calibration of a runner, by its agent. None if the calibration failed"""
+    endpoints, disks = calibration_targets(sources)
+    arguments = [f"--endpoint {shlex.quote(e)}" for e in endpoints]
+    arguments += [f"--disk {shlex.quote(d)}" for d in disks]
+    result = c.run(
+        f"python3 {AGENT_PATH} calibrate {' '.join(arguments)}", hide=True, warn=True
+    )
+    try:
+        environment = json.loads(result.stdout)
+    except ValueError:
+        click.echo(f"[{runner_name}] Calibration failed: {result.stderr.strip()}")
+        return None
+
+    summary = [
+        f"sha256 {environment['cpu']['sha256_mb_s']:.0f} MB/s",
+        *(
+            f"{d['path']} write {d['write_mb_s']:.0f} MB/s" if "error" not in d else f"{d['path']} failed"
+            for d in environment["disks"]
+        ),
+        *(
+            f"{e['component']} {e['connect_ms']:.2f} ms" if "error" not in e else f"{e['component']} unreachable"
+            for e in environment["endpoints"]
+        ),
+    ]
+    click.echo(f"[{runner_name}] Calibration: {', '.join(summary)}")
+    return environment
+
+
+class LiveBenchmarkView:
+    """Live terminal table showing the progress of the benchmark running on each runner"""
+
+    def __init__(self):
+        self.rows = {}
+        self.lock = threading.Lock()
+
+    def track(self, runner_name: str, config_name: str, parser: BenchmarkLogParser):
+        with self.lock:
+            self.rows[runner_name] = (config_name, parser, "running")
+
+    def finish(self, runner_name: str, status: str):
+        with self.lock:
+            config_name, parser, _ = self.rows[runner_name]
+            self.rows[runner_name] = (config_name, parser, status)
+
+    def __rich__(self):
+        table = Table(title="Benchmarks in progress")
+        for column in [
+            "Runner",
+            "Benchmark",
+            "Case",
+            "Launch",
+            "Iteration",
+            "Mean/op",
+            "Ops/s",
+            "Exceptions",
+            "Status",
+        ]:
+            table.add_column(column)
+
+        with self.lock:
+            rows = list(self.rows.items())
+        for runner_name, (config_name, parser, status) in rows:
+            with parser.lock:
+                case = parser.current_case
+                if case is None:
+                    table.add_row(runner_name, config_name, "-", "-", "-", "-", "-", "-", status)
+                    continue
+                iterations, mean_ns = parser.case_stats(case)
+                table.add_row(
+                    runner_name,
+                    config_name,
+                    parser.case_name(case),
+                    str(parser.launch),
+                    f"{iterations}/{case['iteration_count'] or '?'}",
+                    f"{mean_ns / 1e6:.3f} ms" if mean_ns else "-",
+                    f"{1e9 / mean_ns:.2f}" if mean_ns else "-",
+                    str(case["exceptions"]),
+                    "aborting" if parser.abort_reason and status == "running" else status,
+                )
+        return table
+
+
+def file_uri_path(uri: str) -> Path:
+    """Local path of a file:// URI"""
+    return Path(unquote(urlparse(uri).path))
+
+
+@dataclass
+class ArtifactStore:
+    """Where the artifacts of the benchmarks are stored.
+
+    Either an S3 bucket (`s3://bucket`), possibly on an S3-compatible server such as MinIO given by `endpoint_url`,
+    or a directory of this machine (`file:///path`), only reachable by local runners.
+    """
+
+    url: str
+    endpoint_url: str | None = None
+    profile: str = "default"
+
+    def __post_init__(self):
+        self.url = self.url.rstrip("/")
+        self._s3 = None
+        self._s3_lock = threading.Lock()
+
+    @classmethod
+    def from_options(
+        cls,
+        s3_bucket: str,
+        artifact_store: str | None,
+        endpoint_url: str | None,
+        profile: str,
+    ) -> "ArtifactStore":
+        """Store given by --artifact-store (a URI or a local directory), defaulting to --s3-bucket"""
+        if artifact_store is None:
+            return cls(f"s3://{s3_bucket}", endpoint_url, profile)
+        if "://" not in artifact_store:
+            artifact_store = Path(artifact_store).resolve().as_uri()
+        elif not artifact_store.startswith(("s3://", "file://")):
+            raise click.BadParameter(
+                f"Unsupported artifact store {artifact_store}, expected s3://bucket or file:///path",
+                param_hint="--artifact-store",
+            )
+        return cls(artifact_store, endpoint_url, profile)
+
+    @property
+    def is_local(self) -> bool:
+        return self.url.startswith("file://")
+
+    def uri(self, key: str) -> str:
+        return f"{self.url}/{key}"
+
+    def key(self, uri: str) -> str:
+        """Key of an artifact URI of this store"""
+        return uri.removeprefix(f"{self.url}/")
+
+    def upload_command(self, path: str, key: str) -> str:
+        """Shell command storing a file of a runner under `key`"""
+        if self.is_local:
+            return f"install -D -m 644 {path} '{file_uri_path(self.uri(key))}'"
+        endpoint = f"--endpoint-url {self.endpoint_url} " if self.endpoint_url else ""
+        return f"aws s3 cp {endpoint}{path} {self.uri(key)}"
+
+    def s3_client(self):
+        """S3 client used for transfers made from this machine, created on first use"""
+        with self._s3_lock:
+            if self._s3 is None:
+                self._s3 = s3_session(self.profile).client(
+                    "s3", endpoint_url=self.endpoint_url
+                )
+            return self._s3
+
+    def upload_fileobj(self, fileobj, key: str):
+        """Store a file object of this machine under `key` and close it"""
+        if self.is_local:
+            # Renamed into place, so that a stored file is always complete
+            path = file_uri_path(self.uri(key))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with fileobj, open(tmp_path, "wb") as f:
+                shutil.copyfileobj(fileobj, f)
+            os.replace(tmp_path, path)
+        else:
+            bucket, key = parse_s3_uri(self.uri(key))
+            upload_and_close(self.s3_client(), fileobj, bucket, key)
+
+    def exists(self, key: str) -> bool:
+        if self.is_local:
+            return file_uri_path(self.uri(key)).exists()
+        from botocore.exceptions import ClientError
+
+        bucket, key = parse_s3_uri(self.uri(key))
+        try:
+            self.s3_client().head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def store_artifacts(self, root: Path, manifest_key: str) -> dict:
+        """Store the BenchmarkDotNet.Artifacts directory of `root`, on this machine, as blobs with a manifest.
+
+        The counterpart of the `store-artifacts` command of the runner agent: only the blobs the store does not
+        hold yet are uploaded. Returns the same counts.
+        """
+        manifest = artifacts_manifest(root, self.uri(BLOBS_PREFIX))
+        blobs = {entry["sha256"]: entry for entry in manifest["files"]}
+        uploaded = []
+        for sha256, entry in blobs.items():
+            key = self.key(blob_uri(manifest["blobs"], sha256))
+            if not self.exists(key):
+                self.upload_fileobj(open(root / entry["path"], "rb"), key)
+                uploaded.append(entry)
+        # The manifest goes last: every blob it lists is in the store
+        self.upload_fileobj(io.BytesIO(json.dumps(manifest).encode()), manifest_key)
+        return {
+            "files": len(manifest["files"]),
+            "bytes": sum(entry["size"] for entry in manifest["files"]),
+            "blobs": len(blobs),
+            "uploaded": len(uploaded),
+            "uploaded_bytes": sum(entry["size"] for entry in uploaded),
+        }
+
+    def store_artifacts_command(self, root: str, manifest_key: str) -> str:
+        """Shell command storing the BenchmarkDotNet.Artifacts directory of `root`, on a runner, with its agent"""
+        endpoint = f" --endpoint-url {self.endpoint_url}" if self.endpoint_url else ""
+        return (
+            f"python3 {AGENT_PATH} store-artifacts {root} '{self.uri(manifest_key)}' "
+            f"--store '{self.url}'{endpoint}"
+        )
+
+    def read(self, uri: str) -> bytes:
+        """Contents of a stored artifact"""
+        if uri.startswith("file://"):
+            return file_uri_path(uri).read_bytes()
+        bucket, key = parse_s3_uri(uri)
+        return self.s3_client().get_object(Bucket=bucket, Key=key)["Body"].read()
+
+
+@dataclass
+class StudyRunContext:
+    """Settings shared by every benchmark of a `study run`"""
+
+    study_name: str
+    run_timestamp: str
+    store: ArtifactStore
+    hide: bool
+    rules: AnomalyRules
+    view: LiveBenchmarkView | None = None
+    # "s3" zips the artifacts on the runner and uploads them, "ssh" streams them straight to `results_dir`
+    transfer: str = "s3"
+    results_dir: Path | None = None
+    tee_s3: bool = True
+    # Seconds between two host metrics samples on the runner, 0 disables sampling
+    metrics_interval: float = 0
+    # Target relative half-width of the confidence interval of each case mean, None disables extra launches
+    precision: float | None = None
+    max_launches: int = 1
+    # Background uploads of streamed artifacts to the store, as (benchmark entry, future) pairs
+    uploads: list = field(default_factory=list)
+    upload_executor: ThreadPoolExecutor | None = None
+    # With "s3", zip and upload the artifacts on the runner in the background while the next benchmark runs
+    pipeline: bool = False
+    # Background uploads running on each runner with `pipeline`, as (job directory, future) pairs
+    pipeline_jobs: dict = field(default_factory=dict)
+    tracer: PhaseTracer = field(default_factory=PhaseTracer)
+
+
+class TeeReader(io.RawIOBase):
+    """Readable stream copying everything read from `source` into `sink`"""
+
+    def __init__(self, source, sink=None):
+        self.source = source
+        self.sink = sink
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        buffer[: len(data)] = data
+        if self.sink is not None:
+            self.sink.write(data)
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def stream_artifacts(c: Connection | LocalRunner, local_dir: Path, sink=None) -> int:
+    """Stream the BenchmarkDotNet.Artifacts directory of a runner into `local_dir`, over the SSH connection.
+
+    The directory is sent as a gzipped tar on the command's stdout and extracted on the fly, so no archive is
+    written to the runner's disk. The compressed stream is copied to `sink` if given.
+    Returns the number of compressed bytes transferred.
+    """
+    command = (
+        f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && set -o pipefail && "
+        "tar -cf - BenchmarkDotNet.Artifacts | gzip -1"
+    )
+    if isinstance(c, LocalRunner):
+        process = c.popen(command)
+        stream = process.stdout
+    else:
+        c.open()
+        channel = c.client.get_transport().open_session()
+        channel.exec_command(command)
+        stream = channel.makefile("rb")
+    reader = TeeReader(stream, sink)
+    local_dir.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(fileobj=reader, mode="r|gz") as archive:
+        archive.extractall(local_dir, filter="data")
+    # Drain what tarfile did not need (padding, gzip trailer) so that the copy in `sink` is complete
+    while reader.read(SYNC_CHUNK_SIZE):
+        pass
+    if isinstance(c, LocalRunner):
+        exit_code = process.wait()
+        error_stream = process.stderr
+    else:
+        exit_code = channel.recv_exit_status()
+        error_stream = channel.makefile_stderr("rb")
+    if exit_code != 0:
+        error = error_stream.read().decode(errors="replace")
+        raise RuntimeError(f"Streaming artifacts failed with code {exit_code}: {error}")
+    return reader.bytes_read
+
+
+def upload_and_close(s3, fileobj, bucket: str, key: str):
+    """Upload a file object to S3 and close it"""
+    with fileobj:
+        s3.upload_fileobj(fileobj, bucket, key)
+
+
+def get_run_dir(output_path: Path, run_index: int, run: dict) -> Path:
+    """Local directory of a study run in a results tree"""
+    return output_path / f"run_{run_index}_{run['date'].split('T')[0]}"
+
+
+def measure_clock_offset(c: Connection):
+    """Offset of the runner clock relative to this machine, and its uncertainty (half the round trip), in seconds"""
+    before = time.time()
+    remote = float(c.run("date +%s.%N", hide=True).stdout)
+    after = time.time()
+    return remote - (before + after) / 2, (after - before) / 2
+
+
+def start_metrics_sampler(
+    c: Connection, config_name: str, output_path: str, interval: float
+) -> bool:
+    """Start sampling host metrics in the background on the runner, with the runner agent"""
+    result = c.run(
+        f"nohup python3 {AGENT_PATH} sample {output_path} --interval {interval} "
+        f"> /tmp/{config_name}_sampler.json 2> /tmp/{config_name}_sampler.log < /dev/null & "
+        f"echo $! > /tmp/{config_name}_sampler.pid",
+        hide=True,
+        warn=True,
+    )
+    if not result.ok:
+        click.echo(f"Could not start the host metrics sampler: {result.stderr.strip()}")
+    return result.ok
+
+
+def stop_metrics_sampler(c: Connection, config_name: str):
+    """Stop the host metrics sampler of a benchmark and return its summary"""
+    result = c.run(
+        f"pid=$(cat /tmp/{config_name}_sampler.pid) && kill -TERM $pid && "
+        f"while kill -0 $pid 2> /dev/null; do sleep 0.1; done && "
+        f"cat /tmp/{config_name}_sampler.json",
+        hide=True,
+        warn=True,
+    )
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        click.echo(f"Host metrics sampler of {config_name} failed")
+        return None
+
+
+def start_background_upload(
+    c: Connection | LocalRunner, store: ArtifactStore, job_name: str, results_key: str, hide: bool
+) -> str:
+    """
+    Move the artifacts of the last benchmark to a job directory, then store them in a detached process at the
+    lowest CPU and I/O priority, so that the next benchmark can start. Returns the job directory, whose `.status`
+    file gets the exit code of the job.
+    """
+    job_dir = f"{PIPELINE_DIR}/{job_name}"
+    job = (
+        f"({store.store_artifacts_command(job_dir, results_key)} && rm -rf {job_dir}); "
+        f"echo $? > {job_dir}.status"
+    )
+    c.run(
+        f"mkdir -p {job_dir} && "
+        f"mv {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner/BenchmarkDotNet.Artifacts {job_dir}/ && "
+        f"IONICE=$(ionice -c 3 true 2> /dev/null && echo 'ionice -c 3'); "
+        f"setsid nohup nice -n 19 $IONICE sh -c {shlex.quote(job)} > {job_dir}.log 2>&1 < /dev/null &",
+        hide=hide,
+    )
+    return job_dir
+
+
+def wait_background_uploads(c: Connection | LocalRunner, jobs: list):
+    """Wait for the background uploads of a runner, given as (job directory, future) pairs, and resolve them"""
+    pending = dict(jobs)
+    try:
+        while pending:
+            job_dirs = list(pending)
+            result = c.run(
+                "; ".join(f'echo "{i} $(cat {d}.status 2> /dev/null)"' for i, d in enumerate(job_dirs)),
+                hide=True,
+            )
+            for line in result.stdout.splitlines():
+                index, _, status = line.strip().partition(" ")
+                if not status:
+                    continue
+                job_dir = job_dirs[int(index)]
+                future = pending.pop(job_dir)
+                if status == "0":
+                    c.run(f"rm -f {job_dir}.status {job_dir}.log", hide=True)
+                    future.set_result(None)
+                else:
+                    log = c.run(f"tail -n 5 {job_dir}.log", warn=True, hide=True).stdout.strip()
+                    future.set_exception(RuntimeError(f"Background upload exited with {status}: {log}"))
+            if pending:
+                time.sleep(PIPELINE_POLL_INTERVAL)
+    except Exception as e:
+        for future in pending.values():
+            future.set_exception(e)
+
+
+def upload_json(
+    c: Connection, data: dict, remote_path: str, store: ArtifactStore, key: str, hide: bool
+):
+    """Store a JSON document under `key`, from a runner"""
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".json", encoding="utf-8", delete=False
+    ) as f:
+        json.dump(data, f)
+    c.put(f.name, remote_path)
+    os.unlink(f.name)
+    c.run(store.upload_command(remote_path, key), hide=hide)
+
+
+def traced_store_artifacts(
+    tracer: PhaseTracer, store: ArtifactStore, root: Path, manifest_key: str, config_name: str
+) -> dict:
+    """Store artifacts of this machine as a phase of the background uploads track"""
+    with tracer.phase("background_upload", UPLOADS_TRACK, benchmark=config_name):
+        return store.store_artifacts(root, manifest_key)
+
+
+def execute_benchmark(
+    c: Connection,
+    runner_name: str,
+    config_file: str,
+    ctx: StudyRunContext,
+    parser: BenchmarkLogParser | None = None,
+) -> dict:
+    """Run a single benchmark config on a runner and store its results, logs and parsed iterations.
+
+    The output is parsed by `parser` when given, so that the caller can use the parsed cases afterwards.
+    """
+    config_path = Path(config_file)
+    config_name = config_path.stem
+    study_name, run_timestamp, store = ctx.study_name, ctx.run_timestamp, ctx.store
+    hide, view = ctx.hide, ctx.view
+
+    def phase(name: str):
+        return ctx.tracer.phase(name, runner_name, benchmark=config_name)
+
+    click.echo(f"[{runner_name}] Running benchmark: {config_name}")
+
+    # Read config file contents
+    with open(config_file, "r", encoding="utf-8") as f:
+        config_contents = f.read()
+
+    # Upload config file to remote machine
+    remote_config_path = f"/tmp/{config_path.name}"
+    with phase("upload_config"):
+        c.put(config_file, remote_config_path)
+
+    # Generate unique result paths
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_key = f"{study_name}/{run_timestamp.split('T')[0]}/{config_name}_{timestamp_str}{MANIFEST_SUFFIX}"
+    logs_key = f"{study_name}/{run_timestamp.split('T')[0]}/{config_name}_{timestamp_str}_logs.txt"
+    iterations_key = f"{study_name}/{run_timestamp.split('T')[0]}/{config_name}_{timestamp_str}_iterations.json"
+    metrics_key = f"{study_name}/{run_timestamp.split('T')[0]}/{config_name}_{timestamp_str}_metrics.csv.gz"
+    remote_metrics_path = f"/tmp/{config_name}_metrics.csv.gz"
+
+    # The remote output is parsed as it arrives, and only echoed when there is no live view
+    if parser is None:
+        parser = BenchmarkLogParser(ctx.rules, echo=not hide and view is None)
+    if view is not None:
+        view.track(runner_name, config_name, parser)
+
+    sampling = False
+    try:
+        # Iteration times are taken on this machine and host metrics on the runner
+        with phase("clock_offset"):
+            clock_offset, clock_uncertainty = measure_clock_offset(c)
+        with phase("metrics_sampler"):
+            sampling = ctx.metrics_interval > 0 and start_metrics_sampler(
+                c, config_name, remote_metrics_path, ctx.metrics_interval
+            )
+
+        # Run the benchmark in its own session, so that the whole process group can be killed on abort
+        with phase("benchmark"):
+            start = time.monotonic()
+            promise = c.run(
+                f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && set -o pipefail && "
+                f"setsid bash -c 'echo $$ > /tmp/{config_name}.pid && "
+                f"exec dotnet run -c RELEASE --project ./BenchmoniK/BenchmoniK.csproj -- "
+                f"-c {remote_config_path} --armonik-core {RUNNER_HOME}/ArmoniK.Microbench/ArmoniK.Core/' "
+                f"2>&1 | tee /tmp/{config_name}_logs.txt",
+                warn=True,
+                out_stream=parser,
+                asynchronous=True,
+            )
+            while not promise.runner.process_is_finished:
+                parser.check_stall()
+                if parser.abort_reason:
+                    click.echo(
+                        f"[{runner_name}] Aborting benchmark {config_name}: {parser.abort_reason}"
+                    )
+                    c.run(
+                        f"kill -TERM -- -$(cat /tmp/{config_name}.pid)", warn=True, hide=True
+                    )
+                    break
+                time.sleep(0.5)
+            result = promise.join()
+            duration = time.monotonic() - start
+        with phase("metrics_sampler"):
+            metrics_summary = stop_metrics_sampler(c, config_name) if sampling else None
+
+        if parser.abort_reason:
+            status = "aborted"
+        elif result.return_code == 0:
+            status = "success"
+        else:
+            status = "failed"
+
+        # Store the logs
+        with phase("upload_logs"):
+            c.run(store.upload_command(f"/tmp/{config_name}_logs.txt", logs_key), hide=hide)
+
+        # Upload the parsed iterations next to the logs
+        remote_iterations_path = f"/tmp/{config_name}_iterations.json"
+        with phase("upload_iterations"):
+            upload_json(
+                c,
+                {
+                    **parser.to_dict(),
+                    "clock_offset": clock_offset,
+                    "clock_uncertainty": clock_uncertainty,
+                },
+                remote_iterations_path,
+                store,
+                iterations_key,
+                hide,
+            )
+        if metrics_summary is not None:
+            with phase("upload_metrics"):
+                c.run(store.upload_command(remote_metrics_path, metrics_key), hide=hide)
+
+        local_results = None
+        pipeline_upload = None
+        artifacts = None
+        if ctx.transfer == "ssh":
+            # Stream the artifacts straight into the local results tree, stored from there in the background
+            local_results = ctx.results_dir / config_name
+            with phase("stream_artifacts"):
+                transferred = stream_artifacts(c, local_results)
+            click.echo(
+                f"[{runner_name}] Streamed {transferred / 1e6:.1f} MB of artifacts to {local_results}"
+            )
+        elif ctx.pipeline:
+            # The runner moves on to the next benchmark while the artifacts are stored
+            with phase("snapshot_artifacts"):
+                job_dir = start_background_upload(
+                    c, store, f"{runner_name}_{config_name}_{timestamp_str}", results_key, hide
+                )
+            pipeline_upload = Future()
+            ctx.pipeline_jobs.setdefault(runner_name, []).append((job_dir, pipeline_upload))
+        else:
+            # Only the artifact files that the store does not hold yet are uploaded
+            with phase("store_artifacts"):
+                result = c.run(
+                    store.store_artifacts_command(
+                        f"{RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner", results_key
+                    ),
+                    hide=True,
+                )
+                artifacts = json.loads(result.stdout)
+            click.echo(
+                f"[{runner_name}] Stored {artifacts['files']} artifact file(s), uploaded "
+                f"{artifacts['uploaded']} new blob(s) ({artifacts['uploaded_bytes'] / 1e6:.1f} of "
+                f"{artifacts['bytes'] / 1e6:.1f} MB)"
+            )
+
+        # Clean up remote files
+        with phase("cleanup"):
+            c.run(
+                f"rm -f {remote_config_path} {remote_iterations_path} "
+                f"{remote_metrics_path} /tmp/{config_name}_sampler.* "
+                f"/tmp/{config_name}_logs.txt /tmp/{config_name}.pid",
+                hide=hide,
+            )
+            c.run(
+                f"cd {RUNNER_HOME}/ArmoniK.Microbench/benchmark_runner && rm -rf BenchmarkDotNet.Artifacts",
+                hide=hide,
+            )
+
+        click.echo(f"[{runner_name}] Completed benchmark: {config_name} ({status})")
+        if view is not None:
+            view.finish(runner_name, status)
+
+        # Store benchmark info
+        benchmark_entry = {
+            "source": config_contents,
+            "results": store.uri(results_key),
+            "logs": store.uri(logs_key),
+            "iterations": store.uri(iterations_key),
+            "status": status,
+            "runner": runner_name,
+            "duration": duration,
+        }
+        if parser.abort_reason:
+            benchmark_entry["error"] = parser.abort_reason
+        if metrics_summary is not None:
+            benchmark_entry["metrics"] = store.uri(metrics_key)
+            benchmark_entry["metrics_overhead"] = metrics_summary.get("cpu_overhead")
+        if artifacts is not None:
+            benchmark_entry["artifacts"] = artifacts
+        if pipeline_upload is not None:
+            ctx.uploads.append((benchmark_entry, pipeline_upload))
+        if local_results is not None:
+            benchmark_entry["local_results"] = str(local_results)
+            if not ctx.tee_s3:
+                benchmark_entry["results"] = ""
+            else:
+                # The upload finishes in the background while the runner moves on to the next benchmark
+                ctx.uploads.append(
+                    (
+                        benchmark_entry,
+                        ctx.upload_executor.submit(
+                            traced_store_artifacts, ctx.tracer, store, local_results, results_key, config_name
+                        ),
+                    )
+                )
+        return benchmark_entry
+
+    except Exception as e:
+        click.echo(f"[{runner_name}] Failed to run benchmark {config_name}: {e}")
+        if sampling:
+            c.run(
+                f"kill -TERM $(cat /tmp/{config_name}_sampler.pid)", warn=True, hide=True
+            )
+        if view is not None:
+            view.finish(runner_name, "failed")
+        return {
+            "source": config_contents,
+            "results": "",
+            "logs": store.uri(logs_key),
+            "status": "failed",
+            "error": str(e),
+            "runner": runner_name,
+        }
+
+
+# Confidence level of the precision target of `study run --precision`
+PRECISION_CONFIDENCE = 0.95
+
+
+# Exact 0.975 quantiles of Student's t distribution for the degrees of freedom where the expansion is too small
+T_QUANTILES_975 = {
+    1: 12.7062,
+    2: 4.3027,
+    3: 3.1824,
+    4: 2.7764,
+    5: 2.5706,
+    6: 2.4469,
+    7: 2.3646,
+    8: 2.3060,
+    9: 2.2622,
+    10: 2.2281,
+}
+
+
+def t_quantile(p: float, dof: int) -> float:
+    """Quantile of Student's t distribution.
+
+    The 0.975 quantile is tabulated up to 10 degrees of freedom, the others use the Cornish-Fisher expansion,
+    within 1% from 3 degrees of freedom and well below that from 10.
+    """
+    if p == 0.975 and dof in T_QUANTILES_975:
+        return T_QUANTILES_975[dof]
+    z = statistics.NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z**3 + z) / (4 * dof)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * dof**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * dof**3)
+    )
+
+
+def case_samples(case: dict) -> list:
+    """Time per operation (ns) of the measured iterations of a parsed case"""
+    stages = {m["stage"] for m in case["measurements"]}
+    stage = "WorkloadResult" if "WorkloadResult" in stages else "WorkloadActual"
+    return [m["ns"] / max(m["ops"], 1) for m in case["measurements"] if m["stage"] == stage]
+
+
+def relative_half_width(samples: list) -> float | None:
+    """Half-width of the confidence interval of the mean, relative to the mean, or None below two samples"""
+    if len(samples) < 2:
+        return None
+    mean = statistics.fmean(samples)
+    if mean <= 0:
+        return None
+    half_width = t_quantile((1 + PRECISION_CONFIDENCE) / 2, len(samples) - 1) * (
+        statistics.stdev(samples) / len(samples) ** 0.5
+    )
+    return half_width / mean
+
+
+def execute_benchmark_to_precision(
+    c: Connection, runner_name: str, config_file: str, ctx: StudyRunContext
+) -> dict:
+    """
+    Run a benchmark config, then launch again the cases whose confidence interval is still wider than the
+    precision target, up to `ctx.max_launches` launches. The achieved precision of every case is recorded.
+    """
+    parser = BenchmarkLogParser(ctx.rules, echo=not ctx.hide and ctx.view is None)
+    benchmark_entry = execute_benchmark(c, runner_name, config_file, ctx, parser)
+    if ctx.precision is None:
+        return benchmark_entry
+
+    samples = {}
+    launches = {}
+    all_cases = []
+
+    def add_launch(cases: list, launch: int):
+        for case in cases:
+            name = BenchmarkLogParser.case_name(case)
+            samples.setdefault(name, []).extend(case_samples(case))
+            launches[name] = launches.get(name, 0) + 1
+            if launch > 1:
+                # Host metrics and clock offset are those of the first launch, do not align these iterations
+                case["measurements"] = [
+                    {k: v for k, v in m.items() if k != "time"} | {"launch": launch}
+                    for m in case["measurements"]
+                ]
+            all_cases.append(case)
+
+    add_launch(parser.cases, 1)
+    config_path = Path(config_file)
+    extra_launches = []
+    with tempfile.TemporaryDirectory() as launch_dir:
+        for launch in range(2, ctx.max_launches + 1):
+            if benchmark_entry["status"] != "success":
+                break
+            unconverged = [
+                name
+                for name, values in samples.items()
+                if (precision := relative_half_width(values)) is None
+                or precision > ctx.precision
+            ]
+            if not unconverged:
+                break
+            click.echo(
+                f"[{runner_name}] Launch {launch} of {config_path.stem} for "
+                f"{len(unconverged)} case(s) above the precision target"
+            )
+
+            # Same config, restricted to the unconverged cases
+            config = json.loads(benchmark_entry["source"])
+            config["Benchmark"] = {**config.get("Benchmark", {}), "Cases": unconverged}
+            launch_file = Path(launch_dir) / f"{config_path.stem}_launch{launch}.json"
+            launch_file.write_text(json.dumps(config, indent=2), encoding="utf-8")
+
+            parser = BenchmarkLogParser(ctx.rules, echo=not ctx.hide and ctx.view is None)
+            launch_entry = execute_benchmark(c, runner_name, str(launch_file), ctx, parser)
+            del launch_entry["source"]
+            extra_launches.append({"launch": launch, "cases": unconverged, **launch_entry})
+            benchmark_entry["duration"] = benchmark_entry.get("duration", 0) + launch_entry.get(
+                "duration", 0
+            )
+            if launch_entry["status"] != "success":
+                benchmark_entry["error"] = (
+                    f"Launch {launch} {launch_entry['status']}: {launch_entry.get('error', '')}"
+                )
+                break
+            add_launch(parser.cases, launch)
+
+        # The iterations of every launch replace those of the first one, for the analysis tools
+        if extra_launches and benchmark_entry.get("iterations"):
+            with ctx.tracer.phase(
+                "upload_iterations", runner_name, benchmark=config_path.stem
+            ):
+                clock_offset, clock_uncertainty = measure_clock_offset(c)
+                upload_json(
+                    c,
+                    {
+                        "cases": all_cases,
+                        "abort_reason": None,
+                        "launches": len(extra_launches) + 1,
+                        "clock_offset": clock_offset,
+                        "clock_uncertainty": clock_uncertainty,
+                    },
+                    f"/tmp/{config_path.stem}_iterations.json",
+                    ctx.store,
+                    ctx.store.key(benchmark_entry["iterations"]),
+                    ctx.hide,
+                )
+                c.run(f"rm -f /tmp/{config_path.stem}_iterations.json", hide=ctx.hide)
+
+    if extra_launches:
+        benchmark_entry["extra_launches"] = extra_launches
+    benchmark_entry["precision"] = {
+        name: {
+            "launches": launches[name],
+            "samples": len(values),
+            "mean_ns": statistics.fmean(values) if values else None,
+            "ci_half_width": (precision := relative_half_width(values)),
+            "converged": precision is not None and precision <= ctx.precision,
+        }
+        for name, values in samples.items()
+    }
+    converged = sum(p["converged"] for p in benchmark_entry["precision"].values())
+    click.echo(
+        f"[{runner_name}] {config_path.stem}: {converged}/{len(samples)} case(s) within "
+        f"±{ctx.precision:.1%} after {len(extra_launches) + 1} launch(es)"
+    )
+    return benchmark_entry
+
+
+# Options selecting and preparing the runners
+RUNNER_OPTIONS = [
+    click.option(
+        "--runner",
+        "runner_configs",
+        multiple=True,
+        default=["./infrastructure/benchmark_configs/runners/benchmark_runner.json"],
+        help="Path to runner config file. Can be given multiple times to dispatch benchmarks over a pool of runners",
+    ),
+    click.option(
+        "--s3-bucket",
+        default="armonik-microbench-results",
+        help="S3 bucket to store results",
+    ),
+    click.option(
+        "--artifact-store",
+        help="Where to store results instead of --s3-bucket: s3://bucket, or file:///path (or a local directory) with local runners",
+    ),
+    click.option(
+        "--endpoint-url",
+        envvar="AWS_ENDPOINT_URL",
+        help="Custom S3 endpoint of the artifact store (e.g. a local MinIO)",
+    ),
+    click.option(
+        "--repo-url",
+        type=str,
+        help="URL of the Git repository to clone.",
+        default="https://github.com/aneoconsulting/ArmoniK.Microbench.git",
+    ),
+    click.option(
+        "--repo-branch",
+        type=str,
+        default="main",
+        help="Branch, tag or commit of the repository to checkout. Defaults to main.",
+    ),
+    click.option(
+        "--core-repo-url",
+        type=str,
+        default=CORE_REPO_URL,
+        help="URL of the ArmoniK.Core repository the study core version is resolved and built from.",
+    ),
+    click.option(
+        "--skip-init",
+        is_flag=True,
+        help="Skip initialization step (assume environment is already set up)",
+    ),
+    click.option(
+        "--skip-build",
+        is_flag=True,
+        help="Skip core build step (assume core is already built)",
+    ),
+    click.option(
+        "--calibrate/--no-calibrate",
+        default=True,
+        show_default=True,
+        help="Record the environment fingerprint of every runner and calibrate its CPU, disk and network to the backends before the benchmarks",
+    ),
+]
+
+# Options of the artifact transfer when benchmarks are driven over SSH
+TRANSFER_OPTIONS = [
+    click.option(
+        "--profile", envvar="AWS_PROFILE", default="default", help="AWS profile to use"
+    ),
+    click.option(
+        "--transfer",
+        type=click.Choice(["s3", "ssh"]),
+        default="s3",
+        show_default=True,
+        help="How artifacts are retrieved: zipped and uploaded to S3 by the runner, or streamed over SSH into --output-dir",
+    ),
+    click.option(
+        "--output-dir",
+        default="./results",
+        show_default=True,
+        help="Local results directory used by --transfer ssh (same layout as study sync)",
+    ),
+    click.option(
+        "--tee-s3/--no-tee-s3",
+        default=True,
+        show_default=True,
+        help="With --transfer ssh, also upload the streamed archive to S3 in the background",
+    ),
+    click.option(
+        "--pipeline",
+        is_flag=True,
+        help="With --transfer s3, zip and upload the artifacts of each benchmark in the background at the lowest CPU and I/O priority while the runner starts the next one",
+    ),
+]
+
+# Options of the terminal output
+LIVE_OPTIONS = [
+    click.option(
+        "--live/--no-live",
+        default=None,
+        help="Show a live progress table instead of the raw benchmark output. Defaults to on in a terminal",
+    ),
+]
+
+# Options of the host metrics sampling on the runners
+METRICS_OPTIONS = [
+    click.option(
+        "--metrics-interval",
+        type=click.FloatRange(min=0),
+        default=1.0,
+        show_default=True,
+        help="Seconds between two samples of the runner CPU, memory, disk and network counters (0 to disable)",
+    ),
+]
+
+# Options of the extra launches of imprecise benchmark cases
+PRECISION_OPTIONS = [
+    click.option(
+        "--precision",
+        type=click.FloatRange(min=0, min_open=True),
+        help="Target half-width of the 95% confidence interval of each case mean, relative to the mean. "
+        "Cases above it are launched again, up to --max-launches",
+    ),
+    click.option(
+        "--max-launches",
+        type=click.IntRange(min=1),
+        default=3,
+        show_default=True,
+        help="Launches of a benchmark config allowed to reach --precision",
+    ),
+]
+
+# Options of the reuse of results from other studies
+CACHE_OPTIONS = [
+    click.option(
+        "--force",
+        is_flag=True,
+        help="Run every benchmark, even those whose results another study already has for the same commits, config and runner type",
+    ),
+]
+
+# Options of the anomaly rules aborting broken benchmarks
+ANOMALY_OPTIONS = [
+    click.option(
+        "--max-exceptions",
+        type=click.IntRange(min=0),
+        default=AnomalyRules.max_exceptions,
+        show_default=True,
+        help="Abort a benchmark after this many exceptions in a single case (0 to disable)",
+    ),
+    click.option(
+        "--max-empty-iterations",
+        type=click.IntRange(min=0),
+        default=AnomalyRules.max_empty_iterations,
+        show_default=True,
+        help="Abort a benchmark after this many consecutive iterations doing no work (0 to disable)",
+    ),
+    click.option(
+        "--stall-timeout",
+        type=click.FloatRange(min=0),
+        default=AnomalyRules.stall_timeout,
+        show_default=True,
+        help="Abort a benchmark silent for this many seconds (0 to disable)",
+    ),
+]
+
+
+def add_options(*option_lists):
+    """Decorator adding lists of click options to a command"""
+
+    def decorator(command):
+        for options in reversed(option_lists):
+            for option in reversed(options):
+                command = option(command)
+        return command
+
+    return decorator
+
+
+# Options shared by the commands executing the benchmarks of a study over SSH
+run_options = add_options(
+    RUNNER_OPTIONS,
+    TRANSFER_OPTIONS,
+    LIVE_OPTIONS,
+    ANOMALY_OPTIONS,
+    METRICS_OPTIONS,
+    PRECISION_OPTIONS,
+    CACHE_OPTIONS,
+)
+
+
+def save_run(study_name: str, run_index: int, run_entry: dict):
+    """Save a run entry and all its benchmarks into the catalog"""
+    with open_catalog() as db:
+        write_run(db, study_name, run_index, run_entry)
+
+
+def save_benchmark(
+    study_name: str, run_index: int, benchmark_name: str, benchmark_entry: dict
+):
+    """Atomically save the outcome of a single benchmark of a run into the catalog"""
+    with open_catalog() as db:
+        row = db.execute(
+            """SELECT COALESCE(
+                (SELECT position FROM benchmarks WHERE study = ? AND run_index = ? AND name = ?),
+                (SELECT COALESCE(MAX(position) + 1, 0) FROM benchmarks WHERE study = ? AND run_index = ?)
+            ) AS position""",
+            (study_name, run_index, benchmark_name, study_name, run_index),
+        ).fetchone()
+        write_benchmark(
+            db, study_name, run_index, row["position"], benchmark_name, benchmark_entry
+        )
+
+
+def runner_type(runner: dict) -> str:
+    """Hardware of a runner: the instance and volume types of Terraform-generated configs, the host otherwise"""
+    contents = runner["contents"]
+    if contents.get("backend", "ssh") == "local":
+        return f"local:{socket.gethostname()}"
+    metadata = contents.get("ResourceMetadata", {})
+    if "NodeType" in metadata:
+        return f"{metadata['NodeType']}:{metadata.get('VolumeType', '')}"
+    return f"host:{contents.get('host', '')}"
+
+
+def benchmark_fingerprint(
+    core_commit: str, runner_commit: str, source: str, runner: dict, precision: float | None
+) -> str:
+    """Hash of everything that determines the results of a benchmark config"""
+    return hashlib.sha256(
+        json.dumps(
+            {
+                "core_commit": core_commit,
+                "runner_commit": runner_commit,
+                "config": hashlib.sha256(source.encode("utf-8")).hexdigest(),
+                "runner_type": runner_type(runner),
+                "precision": precision,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def find_cached_benchmark(study_name: str, fingerprints: set):
+    """Latest successful benchmark of another study with one of the fingerprints, as (study, run index, entry)"""
+    with open_catalog() as db:
+        row = db.execute(
+            f"""SELECT b.* FROM benchmarks b JOIN runs r ON r.study = b.study AND r.run_index = b.run_index
+            WHERE json_extract(b.extra, '$.fingerprint') IN ({", ".join("?" * len(fingerprints))})
+            AND b.study != ? AND b.status = 'success' AND COALESCE(b.results, '') != ''
+            ORDER BY r.date DESC LIMIT 1""",
+            (*fingerprints, study_name),
+        ).fetchone()
+        if row is None:
+            return None
+        return row["study"], row["run_index"], read_benchmark(db, row)
+
+
+def link_cached_benchmarks(
+    study_name: str,
+    run_index: int,
+    run_entry: dict,
+    benchmark_configs: list,
+    runner_pool: dict,
+    precision: float | None,
+) -> list:
+    """
+    Record the results of other studies for the benchmarks they already ran with the same fingerprint on the
+    type of one of the runners. Returns the configs left to execute.
+    """
+    to_execute = []
+    for config_file in benchmark_configs:
+        benchmark_name = Path(config_file).name
+        source = run_entry["benchmarks"][benchmark_name]["source"]
+        fingerprints = {
+            benchmark_fingerprint(
+                run_entry["core_commit"], run_entry["runner_commit"], source, runner, precision
+            )
+            for runner in runner_pool.values()
+        }
+        cached = find_cached_benchmark(study_name, fingerprints)
+        if cached is None:
+            to_execute.append(config_file)
+            continue
+        cached_study, cached_run_index, cached_entry = cached
+        cached_entry.pop("local_results", None)
+        cached_entry.setdefault("cached_from", {"study": cached_study, "run_index": cached_run_index})
+        run_entry["benchmarks"][benchmark_name] = cached_entry
+        save_benchmark(study_name, run_index, benchmark_name, cached_entry)
+        click.echo(
+            f"Benchmark {Path(config_file).stem}: reusing the results of run {cached_run_index} of study '{cached_study}'"
+        )
+    return to_execute
+
+
+def check_store_reachable(store: ArtifactStore, runner_pool: dict):
+    """Refuse a local artifact store when some runners are remote machines, which cannot write to it"""
+    if store.is_local:
+        remote = [
+            name
+            for name, runner in runner_pool.items()
+            if runner["contents"].get("backend", "ssh") != "local"
+        ]
+        if remote:
+            raise click.ClickException(
+                f"Artifact store {store.url} is a local directory, but runner(s) {', '.join(remote)} are not local"
+            )
+
+
+def start_run(
+    study_name: str,
+    study_data: dict,
+    run_index: int,
+    benchmark_configs: list,
+    runner_configs: tuple,
+    repo_url: str,
+    repo_branch: str,
+    core_repo_url: str,
+):
+    """
+    Load the runner pool, resolve the commits to benchmark and record the configs as pending in a run entry.
+    Returns the runner pool and the resolved ArmoniK.Core and ArmoniK.Microbench commits.
+    """
+    run_entry = study_data["runs"][run_index]
+
+    # Load the runner pool (connection details and config contents)
+    runner_pool = get_runner_pool(runner_configs)
+    run_entry.setdefault("runners", {}).update(runner_pool)
+
+    # Resolve the versions to commits once for all runners. The core commit is locked in the study on its
+    # first run so that every run of a "latest" study benchmarks the same code, resumed runs keep theirs
+    lock_core_commit = "core_commit" not in study_data
+    if lock_core_commit:
+        core_version = study_data["core_version"]
+        study_data["core_commit"] = resolve_commit(
+            core_repo_url, "main" if core_version == "latest" else core_version
+        )
+    if "core_commit" not in run_entry:
+        run_entry["core_commit"] = study_data["core_commit"]
+        run_entry["runner_commit"] = resolve_commit(repo_url, repo_branch)
+    click.echo(
+        f"ArmoniK.Core {study_data['core_version']} is {run_entry['core_commit'][:12]}, "
+        f"ArmoniK.Microbench {repo_branch} is {run_entry['runner_commit'][:12]}"
+    )
+
+    for config_file in benchmark_configs:
+        with open(config_file, "r", encoding="utf-8") as f:
+            run_entry["benchmarks"][Path(config_file).name] = {
+                "source": f.read(),
+                "status": "pending",
+            }
+    # Only the run entry changed, plus the locked core commit of the study on its first run
+    with open_catalog() as db:
+        if lock_core_commit:
+            db.execute(
+                "UPDATE studies SET extra = json_set(extra, '$.core_commit', ?) WHERE name = ?",
+                (study_data["core_commit"], study_name),
+            )
+        write_run(db, study_name, run_index, run_entry)
+    return runner_pool, run_entry["core_commit"], run_entry["runner_commit"]
+
+
+def execute_run(
+    study_name: str,
+    study_data: dict,
+    run_index: int,
+    benchmark_configs: list,
+    runner_configs: tuple,
+    s3_bucket: str,
+    artifact_store: str | None,
+    endpoint_url: str | None,
+    profile: str,
+    skip_init: bool,
+    skip_build: bool,
+    calibrate: bool,
+    force: bool,
+    repo_url: str,
+    repo_branch: str,
+    core_repo_url: str,
+    transfer: str,
+    output_dir: str,
+    tee_s3: bool,
+    pipeline: bool,
+    live: bool | None,
+    max_exceptions: int,
+    max_empty_iterations: int,
+    stall_timeout: float,
+    metrics_interval: float,
+    precision: float | None,
+    max_launches: int,
+):
+    """
+    Execute benchmark configs within a run entry of a study.
+    The configs are recorded as pending first, then each outcome is saved as soon as the benchmark completes.
+    """
+    from rich.live import Live
+
+    if pipeline and transfer != "s3":
+        raise click.UsageError("--pipeline only applies to --transfer s3")
+    store = ArtifactStore.from_options(s3_bucket, artifact_store, endpoint_url, profile)
+    check_store_reachable(store, get_runner_pool(runner_configs))
+    tracer = PhaseTracer()
+    run_entry = study_data["runs"][run_index]
+    with tracer.phase("resolve", ORCHESTRATOR_TRACK):
+        runner_pool, core_commit, runner_commit = start_run(
+            study_name,
+            study_data,
+            run_index,
+            benchmark_configs,
+            runner_configs,
+            repo_url,
+            repo_branch,
+            core_repo_url,
+        )
+
+    # Benchmarks another study already ran with the same commits, config and runner type are not run again
+    configs_to_run = benchmark_configs
+    if not force:
+        with tracer.phase("cache_lookup", ORCHESTRATOR_TRACK):
+            configs_to_run = link_cached_benchmarks(
+                study_name, run_index, run_entry, benchmark_configs, runner_pool, precision
+            )
+        if not configs_to_run:
+            click.echo(
+                f"Study run completed: all {len(benchmark_configs)} benchmark(s) reused, use --force to run them again"
+            )
+            return
+
+    # Longest benchmarks first, using the durations recorded by previous runs
+    pending_configs = queue.Queue()
+    for config_file in order_longest_first(
+        configs_to_run, get_benchmark_durations(study_data)
+    ):
+        pending_configs.put(config_file)
+    run_entry_lock = threading.Lock()
+    sources = [run_entry["benchmarks"][Path(c).name]["source"] for c in configs_to_run]
+
+    click.echo(
+        f"Running {len(configs_to_run)} benchmark(s) for study '{study_name}' "
+        f"on {len(runner_pool)} runner(s)"
+    )
+
+    # Interleaved remote output from several runners is unreadable, only stream it with a single runner
+    hide = len(runner_pool) > 1
+    if live is None:
+        live = sys.stdout.isatty()
+    ctx = StudyRunContext(
+        study_name=study_name,
+        run_timestamp=run_entry["date"],
+        store=store,
+        hide=hide,
+        rules=AnomalyRules(max_exceptions, max_empty_iterations, stall_timeout),
+        view=LiveBenchmarkView() if live else None,
+        transfer=transfer,
+        results_dir=get_run_dir(Path(output_dir) / study_name, run_index, run_entry),
+        tee_s3=tee_s3,
+        pipeline=pipeline,
+        metrics_interval=metrics_interval,
+        precision=precision,
+        max_launches=max_launches,
+        upload_executor=ThreadPoolExecutor(max_workers=2),
+        tracer=tracer,
+    )
+
+    def run_on_runner(runner_name: str, runner: dict):
+        with connect_runner(runner) as c:
+            prepare_runner(
+                c,
+                runner_name,
+                core_commit,
+                repo_url,
+                runner_commit,
+                core_repo_url,
+                skip_init,
+                skip_build,
+                hide,
+                tracer,
+            )
+            if calibrate:
+                with tracer.phase("calibrate", runner_name):
+                    environment = calibrate_runner(c, runner_name, sources)
+                if environment is not None:
+                    with run_entry_lock:
+                        run_entry.setdefault("environment", {})[runner_name] = environment
+
+            # One benchmark at a time per runner, pulled from the shared queue
+            try:
+                while True:
+                    try:
+                        config_file = pending_configs.get_nowait()
+                    except queue.Empty:
+                        break
+                    benchmark_entry = execute_benchmark_to_precision(
+                        c, runner_name, config_file, ctx
+                    )
+                    benchmark_entry["fingerprint"] = benchmark_fingerprint(
+                        core_commit, runner_commit, benchmark_entry["source"], runner, precision
+                    )
+                    benchmark_name = Path(config_file).name
+                    with run_entry_lock:
+                        run_entry["benchmarks"][benchmark_name] = benchmark_entry
+                        save_benchmark(study_name, run_index, benchmark_name, benchmark_entry)
+            finally:
+                # Barrier: the connection stays open until the background uploads of the runner are done
+                jobs = ctx.pipeline_jobs.pop(runner_name, [])
+                if jobs:
+                    with tracer.phase("upload_barrier", runner_name):
+                        wait_background_uploads(c, jobs)
+
+    with (
+        Live(ctx.view, refresh_per_second=2) if ctx.view is not None else nullcontext(),
+        ThreadPoolExecutor(max_workers=len(runner_pool)) as executor,
+    ):
+        futures = {
+            executor.submit(run_on_runner, runner_name, runner): runner_name
+            for runner_name, runner in runner_pool.items()
+        }
+        runner_errors = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                click.echo(f"Runner {futures[future]} failed: {e}")
+                runner_errors.append(e)
+
+    if len(runner_errors) == len(runner_pool):
+        save_phase_trace(tracer, store, study_name, run_index, run_entry)
+        save_run(study_name, run_index, run_entry)
+        raise click.ClickException(
+            f"All runners failed, no benchmark was run. Use 'study resume {study_name}' to retry"
+        )
+
+    # Configs left over if some runners failed before picking up work, they stay pending
+    while not pending_configs.empty():
+        config_file = pending_configs.get_nowait()
+        click.echo(f"Benchmark {Path(config_file).stem} was not run")
+
+    # Wait for the background uploads of streamed artifacts
+    with tracer.phase("upload_wait", ORCHESTRATOR_TRACK):
+        for benchmark_entry, upload in ctx.uploads:
+            try:
+                artifacts = upload.result()
+                if artifacts is not None:
+                    benchmark_entry["artifacts"] = artifacts
+            except Exception as e:
+                click.echo(f"Failed to upload {benchmark_entry['results']}: {e}")
+                benchmark_entry["results"] = ""
+                benchmark_entry["error"] = f"Artifact upload failed: {e}"
+    ctx.upload_executor.shutdown()
+    save_phase_trace(tracer, store, study_name, run_index, run_entry)
+    save_run(study_name, run_index, run_entry)
+
+    executed = [run_entry["benchmarks"][Path(c).name] for c in benchmark_configs]
+    successful_runs = sum(1 for b in executed if b.get("status") == "success")
+    click.echo(
+        f"Study run completed: {successful_runs}/{len(executed)} benchmarks successful"
+    )
+
+
+def collect_benchmark_configs(config_files: tuple, config_dir: str | None) -> list:
+    """Benchmark config files given with --config and found in --directory"""
+    # Validate inputs
+    if not config_files and not config_dir:
+        raise click.UsageError("Either --config (-c) or --directory must be provided.")
+
+    # Collect all config files to run
+    benchmark_configs = []
+    if config_files:
+        benchmark_configs.extend(config_files)
+
+    if config_dir:
+        config_dir_path = Path(config_dir)
+        benchmark_configs.extend(
+            [
+                str(f)
+                for f in config_dir_path.iterdir()
+                if f.is_file() and f.suffix.lower() in [".json", ".yaml", ".yml"]
+            ]
+        )
+
+    if not benchmark_configs:
+        raise click.ClickException("No benchmark configuration files found")
+    return benchmark_configs
+
+
+# Benchmark config selection of the commands starting a new run
+CONFIG_OPTIONS = [
+    click.option(
+        "-c",
+        "--config",
+        "config_files",
+        multiple=True,
+        type=click.Path(exists=True, file_okay=True, dir_okay=False),
+        help="Individual benchmark config files to run",
+    ),
+    click.option(
+        "--directory",
+        "config_dir",
+        type=click.Path(exists=True, file_okay=False, dir_okay=True),
+        help="Directory containing benchmark config files",
+    ),
+]
+
+
+@study.command("run")
+@click.argument("study_name")
+@add_options(CONFIG_OPTIONS)
+@run_options
+def run_study(study_name: str, config_files: tuple, config_dir: str, **options):
+    """Run benchmarks for a study"""
+    # Load existing study
+    study_data = load_study(study_name)
+    benchmark_configs = collect_benchmark_configs(config_files, config_dir)
+
+    # Create new run entry
+    study_data["runs"].append(
+        {"runners": {}, "date": datetime.now().isoformat(), "benchmarks": {}}
+    )
+    execute_run(
+        study_name, study_data, len(study_data["runs"]) - 1, benchmark_configs, **options
+    )
+
+
+def rerun_benchmarks(study_name: str, run_index: int, statuses: set, options: dict):
+    """Execute again the benchmarks of a run whose status is in `statuses`, from their recorded source"""
+    study_data = load_study(study_name)
+    if not study_data["runs"]:
+        raise click.ClickException(f"No runs found for study '{study_name}'")
+    if not -len(study_data["runs"]) <= run_index < len(study_data["runs"]):
+        raise click.ClickException(
+            f"Run index {run_index} not found (max: {len(study_data['runs']) - 1})"
+        )
+    run_index %= len(study_data["runs"])
+    run_entry = study_data["runs"][run_index]
+
+    benchmark_names = []
+    for benchmark_name, benchmark in run_entry["benchmarks"].items():
+        if benchmark.get("status") not in statuses:
+            continue
+        if "source" not in benchmark:
+            click.echo(f"Skipping {benchmark_name}: no recorded config source")
+            continue
+        benchmark_names.append(benchmark_name)
+
+    if not benchmark_names:
+        click.echo(f"Nothing to run in run {run_index} of study '{study_name}'")
+        return
+
+    # The configs are executed from their snapshot, the original files may have changed or be gone
+    with tempfile.TemporaryDirectory() as config_dir:
+        benchmark_configs = []
+        for benchmark_name in benchmark_names:
+            config_file = Path(config_dir) / benchmark_name
+            config_file.write_text(
+                run_entry["benchmarks"][benchmark_name]["source"], encoding="utf-8"
+            )
+            benchmark_configs.append(str(config_file))
+        execute_run(study_name, study_data, run_index, benchmark_configs, **options)
+
+
+@study.command("resume")
+@click.argument("study_name")
+@click.option(
+    "--run-index",
+    type=int,
+    default=-1,
+    help="Run to resume (default: the last one)",
+)
+@run_options
+def resume_study(study_name: str, run_index: int, **options):
+    """Execute the benchmarks of a run that were interrupted or never started"""
+    rerun_benchmarks(study_name, run_index, {"pending"}, options)
+
+
+@study.command("rerun-failed")
+@click.argument("study_name")
+@click.option(
+    "--run-index",
+    type=int,
+    default=-1,
+    help="Run to complete (default: the last one)",
+)
+@run_options
+def rerun_failed(study_name: str, run_index: int, **options):
+    """Execute again the benchmarks of a run that failed, were aborted or never completed"""
+    rerun_benchmarks(study_name, run_index, {"pending", "failed", "aborted"}, options)
+
+
+# Benchmark parameter explored by `study sweep`, and the parameters multiplying the work of one operation
+SWEEP_CONCURRENCY_PARAM = "NumConcurrentRunners"
+SWEEP_WORK_PARAMS = ("NumObjectsPerRunner", "NumMessages")
+
+
+def parse_sweep_param(spec: str):
+    """Parse a `Name=V1,V2` parameter of `study sweep`, pairs being written `A:B` (e.g. TransferParameters)"""
+    name, sep, values = spec.partition("=")
+    if not sep or not name.strip() or not values.strip():
+        raise click.BadParameter(f"Expected NAME=V1,V2,... got '{spec}'")
+    try:
+        parsed = [
+            [int(v) for v in value.split(":")] if ":" in value else int(value)
+            for value in values.split(",")
+        ]
+    except ValueError:
+        raise click.BadParameter(f"Values of {name} must be integers or A:B pairs")
+    return name.strip(), parsed
+
+
+def format_sweep_value(value) -> str:
+    return "x".join(map(str, value)) if isinstance(value, list) else str(value)
+
+
+def case_throughput(case: dict) -> float | None:
+    """Items (objects or messages) processed per second by a benchmark case of `iterations.json`"""
+    per_op = case_samples(case)
+    if not per_op or not sum(per_op):
+        return None
+    work = 1
+    for name in (SWEEP_CONCURRENCY_PARAM, *SWEEP_WORK_PARAMS):
+        if name in case["params"]:
+            work *= int(case["params"][name])
+    return work * 1e9 / (sum(per_op) / len(per_op))
+
+
+@dataclass
+class SweepSeries:
+    """Concurrency search of one combination of the fixed parameters of a base config"""
+
+    config: str
+    params: dict
+    # Throughput per method, by concurrency
+    points: dict = field(default_factory=dict)
+    benchmarks: dict = field(default_factory=dict)
+    doubling: bool = True
+
+    @property
+    def label(self) -> str:
+        values = [format_sweep_value(v) for v in self.params.values()]
+        return "-".join([Path(self.config).stem, *values])
+
+    def benchmark_name(self, concurrency: int) -> str:
+        return f"{self.label}-c{concurrency}.json"
+
+    def saturation(self) -> dict:
+        """Concurrency of the highest throughput of each method, and that throughput"""
+        best = {}
+        for concurrency, throughputs in sorted(self.points.items()):
+            for method, throughput in throughputs.items():
+                if method not in best or throughput > best[method][1]:
+                    best[method] = (concurrency, throughput)
+        return best
+
+    def next_doubling(self, concurrency: int, min_gain: float) -> bool:
+        """Whether any method still gained more than `min_gain` at `concurrency` over lower concurrencies"""
+        current = self.points.get(concurrency)
+        if not current:
+            return False
+        lower = [c for c in self.points if c < concurrency]
+        if not lower:
+            return True
+        return any(
+            throughput
+            > (1 + min_gain) * max(self.points[c].get(method, 0) for c in lower)
+            for method, throughput in current.items()
+        )
+
+    def refinements(self) -> set:
+        """Untested concurrencies halfway between the best one of each method and its tested neighbours"""
+        tested = sorted(self.points)
+        candidates = set()
+        for concurrency, _ in self.saturation().values():
+            i = tested.index(concurrency)
+            for neighbour in tested[max(i - 1, 0) : i + 2]:
+                midpoint = (concurrency + neighbour) // 2
+                if midpoint not in (concurrency, neighbour) and midpoint not in self.benchmarks:
+                    candidates.add(midpoint)
+        return candidates
+
+
+def sweep_entry(series_list: list, space: dict) -> dict:
+    """Summary of a sweep recorded in its run entry"""
+    return {
+        **space,
+        "series": {
+            s.label: {
+                "config": Path(s.config).name,
+                "params": s.params,
+                "benchmarks": {str(c): name for c, name in sorted(s.benchmarks.items())},
+                "throughput": {str(c): t for c, t in sorted(s.points.items())},
+                "saturation": {
+                    method: {"concurrency": c, "throughput": t}
+                    for method, (c, t) in s.saturation().items()
+                },
+            }
+            for s in series_list
+        },
+    }
+
+
+@study.command("sweep")
+@click.argument("study_name")
+@add_options(CONFIG_OPTIONS)
+@click.option(
+    "--param",
+    "param_specs",
+    multiple=True,
+    help="Fixed benchmark parameter values, as NAME=V1,V2 (pairs as A:B, e.g. TransferParameters=65536:1048576). "
+    "Every combination is searched separately",
+)
+@click.option(
+    "--min-concurrency",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=f"First {SWEEP_CONCURRENCY_PARAM} value",
+)
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help=f"Largest {SWEEP_CONCURRENCY_PARAM} value tried",
+)
+@click.option(
+    "--min-gain",
+    type=click.FloatRange(min=0),
+    default=0.05,
+    show_default=True,
+    help="Relative throughput gain below which doubling the concurrency stops",
+)
+@click.option(
+    "--refine-rounds",
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help="Bisection rounds around the best concurrency once doubling stopped",
+)
+@run_options
+def sweep_study(
+    study_name: str,
+    config_files: tuple,
+    config_dir: str,
+    param_specs: tuple,
+    min_concurrency: int,
+    max_concurrency: int,
+    min_gain: float,
+    refine_rounds: int,
+    **options,
+):
+    """Search the saturation concurrency of benchmarks adaptively
+
+    The concurrency is doubled until the throughput stops improving, then refined by bisection around the best
+    value, for every combination of the --param values. All the points are benchmarks of a single new run.
+    """
+    study_data = load_study(study_name)
+    benchmark_configs = collect_benchmark_configs(config_files, config_dir)
+    if any(Path(c).suffix.lower() != ".json" for c in benchmark_configs):
+        raise click.UsageError("study sweep only supports JSON benchmark configs")
+    params = dict(parse_sweep_param(spec) for spec in param_specs)
+    if SWEEP_CONCURRENCY_PARAM in params:
+        raise click.UsageError(
+            f"{SWEEP_CONCURRENCY_PARAM} is searched by the sweep, use --min-concurrency/--max-concurrency"
+        )
+
+    series_list = [
+        SweepSeries(config_file, dict(zip(params, values)))
+        for config_file in benchmark_configs
+        for values in itertools.product(*params.values())
+    ]
+    space = {
+        "params": params,
+        "min_concurrency": min_concurrency,
+        "max_concurrency": max_concurrency,
+        "min_gain": min_gain,
+    }
+
+    study_data["runs"].append(
+        {"runners": {}, "date": datetime.now().isoformat(), "benchmarks": {}}
+    )
+    run_index = len(study_data["runs"]) - 1
+    run_entry = study_data["runs"][run_index]
+    store = ArtifactStore.from_options(
+        options["s3_bucket"],
+        options["artifact_store"],
+        options["endpoint_url"],
+        options["profile"],
+    )
+
+    def run_points(points: list, config_dir: Path):
+        """Run (series, concurrency) points as benchmarks of the sweep run and record their throughput"""
+        benchmark_configs = []
+        for series, concurrency in points:
+            with open(series.config, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            config["Benchmark"] = {
+                **config.get("Benchmark", {}),
+                **{name: [value] for name, value in series.params.items()},
+                SWEEP_CONCURRENCY_PARAM: [concurrency],
+            }
+            config_file = config_dir / series.benchmark_name(concurrency)
+            config_file.write_text(json.dumps(config, indent=2), encoding="utf-8")
+            series.benchmarks[concurrency] = config_file.name
+            benchmark_configs.append(str(config_file))
+
+        execute_run(study_name, study_data, run_index, benchmark_configs, **options)
+        # The runners are ready and calibrated for the next rounds
+        options.update(skip_init=True, skip_build=True, calibrate=False)
+
+        for series, concurrency in points:
+            benchmark = run_entry["benchmarks"][series.benchmark_name(concurrency)]
+            if benchmark.get("status") != "success" or not benchmark.get("iterations"):
+                continue
+            try:
+                iterations = json.loads(store.read(benchmark["iterations"]))
+            except Exception as e:
+                click.echo(f"Failed to download {benchmark['iterations']}: {e}")
+                continue
+            throughputs = {}
+            for case in iterations["cases"]:
+                throughput = case_throughput(case)
+                if throughput is not None:
+                    throughputs[case["method"]] = throughput
+            if throughputs:
+                series.points[concurrency] = throughputs
+
+        run_entry["sweep"] = sweep_entry(series_list, space)
+        save_run(study_name, run_index, run_entry)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Doubling: all the series advance together, each round is a single run over the runner pool
+        concurrency = min_concurrency
+        while concurrency <= max_concurrency:
+            active = [s for s in series_list if s.doubling]
+            if not active:
+                break
+            click.echo(f"Sweep: {SWEEP_CONCURRENCY_PARAM}={concurrency} for {len(active)} series")
+            run_points([(s, concurrency) for s in active], Path(config_dir))
+            for s in active:
+                s.doubling = s.next_doubling(concurrency, min_gain)
+            concurrency *= 2
+
+        # Refinement around the knee of each series
+        for refine_round in range(refine_rounds):
+            points = [
+                (s, c)
+                for s in series_list
+                for c in sorted(s.refinements())
+                if min_concurrency <= c <= max_concurrency
+            ]
+            if not points:
+                break
+            click.echo(f"Sweep: refinement {refine_round + 1}, {len(points)} point(s)")
+            run_points(points, Path(config_dir))
+
+    table = Table(title=f"Saturation points of run {run_index}")
+    for column in ["Series", "Method", SWEEP_CONCURRENCY_PARAM, "Items/s", "Points"]:
+        table.add_column(column)
+    for s in series_list:
+        for method, (c, throughput) in sorted(s.saturation().items()):
+            table.add_row(s.label, method, str(c), f"{throughput:,.0f}", str(len(s.points)))
+    Console().print(table)
+    click.echo(
+        f"Sweep completed with {sum(len(s.benchmarks) for s in series_list)} benchmark(s) "
+        f"for {len(series_list)} series"
+    )
+
+
+def agent_command(c: Connection, *args: str) -> dict:
+    """Run a command of the runner agent and parse its JSON output"""
+    result = c.run(f"python3 {AGENT_PATH} {' '.join(args)}", hide=True)
+    return json.loads(result.stdout)
+
+
+class AgentBatchView:
+    """Live terminal table showing the progress of the agent batch of each runner"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def update(self, runner_name: str, batch_status: dict | None, error: str = ""):
+        self.rows[runner_name] = (batch_status, error)
+
+    def __rich__(self):
+        table = Table(title="Agent batches")
+        for column in [
+            "Runner",
+            "Done",
+            "Benchmark",
+            "Case",
+            "Iteration",
+            "Mean/op",
+            "Exceptions",
+            "Status",
+        ]:
+            table.add_column(column)
+        for runner_name, (batch_status, error) in self.rows.items():
+            if batch_status is None:
+                table.add_row(runner_name, "-", "-", "-", "-", "-", "-", error)
+                continue
+            jobs = batch_status["jobs"]
+            done = sum(1 for job in jobs if job["status"] in AGENT_TERMINAL_STATUSES)
+            running = next((job for job in jobs if job["status"] == "running"), None)
+            progress = (running or {}).get("progress") or {}
+            mean_ns = progress.get("mean_ns")
+            table.add_row(
+                runner_name,
+                f"{done}/{len(jobs)}",
+                Path(running["name"]).stem if running else "-",
+                progress.get("case", "-"),
+                f"{progress['iterations']}/{progress['iteration_count'] or '?'}"
+                if progress
+                else "-",
+                f"{mean_ns / 1e6:.3f} ms" if mean_ns else "-",
+                str(progress.get("exceptions", "-")),
+                error
+                or ("running" if running else "done" if done == len(jobs) else "queued"),
+            )
+        return table
+
+
+@study.command("submit")
+@click.argument("study_name")
+@add_options(CONFIG_OPTIONS, RUNNER_OPTIONS, ANOMALY_OPTIONS, METRICS_OPTIONS)
+@click.option(
+    "--detach",
+    is_flag=True,
+    help="Return once the batches are submitted instead of following them",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=1),
+    default=5,
+    show_default=True,
+    help="Seconds between two status requests to each runner when following the batches",
+)
+@add_options(LIVE_OPTIONS)
+def submit_study(
+    study_name: str,
+    config_files: tuple,
+    config_dir: str,
+    runner_configs: tuple,
+    s3_bucket: str,
+    artifact_store: str | None,
+    endpoint_url: str | None,
+    repo_url: str,
+    repo_branch: str,
+    core_repo_url: str,
+    skip_init: bool,
+    skip_build: bool,
+    calibrate: bool,
+    max_exceptions: int,
+    max_empty_iterations: int,
+    stall_timeout: float,
+    metrics_interval: float,
+    detach: bool,
+    poll_interval: float,
+    live: bool | None,
+):
+    """
+    Submit benchmarks for a study to the agents of the runners, which execute them without staying connected.
+    The configs are partitioned over the runners longest-first. Use 'study attach' to follow them later.
+    """
+    study_data = load_study(study_name)
+    benchmark_configs = collect_benchmark_configs(config_files, config_dir)
+    # The agents upload with the AWS credentials of their runner
+    store = ArtifactStore.from_options(s3_bucket, artifact_store, endpoint_url, "default")
+    check_store_reachable(store, get_runner_pool(runner_configs))
+    tracer = PhaseTracer()
+
+    study_data["runs"].append(
+        {"runners": {}, "date": datetime.now().isoformat(), "benchmarks": {}}
+    )
+    run_index = len(study_data["runs"]) - 1
+    run_entry = study_data["runs"][run_index]
+    with tracer.phase("resolve", ORCHESTRATOR_TRACK):
+        runner_pool, core_commit, runner_commit = start_run(
+            study_name,
+            study_data,
+            run_index,
+            benchmark_configs,
+            runner_configs,
+            repo_url,
+            repo_branch,
+            core_repo_url,
+        )
+    assignment = partition_longest_first(
+        benchmark_configs, get_benchmark_durations(study_data), list(runner_pool)
+    )
+    rules = AnomalyRules(max_exceptions, max_empty_iterations, stall_timeout)
+    hide = len(runner_pool) > 1
+    run_entry["agent_batches"] = {}
+    run_entry_lock = threading.Lock()
+
+    def submit_to_runner(runner_name: str, runner: dict):
+        runner_configs = assignment[runner_name]
+        if not runner_configs:
+            return
+        with connect_runner(runner) as c:
+            prepare_runner(
+                c,
+                runner_name,
+                core_commit,
+                repo_url,
+                runner_commit,
+                core_repo_url,
+                skip_init,
+                skip_build,
+                hide,
+                tracer,
+            )
+            if calibrate:
+                with tracer.phase("calibrate", runner_name):
+                    environment = calibrate_runner(
+                        c,
+                        runner_name,
+                        [run_entry["benchmarks"][Path(f).name]["source"] for f in runner_configs],
+                    )
+                if environment is not None:
+                    with run_entry_lock:
+                        run_entry.setdefault("environment", {})[runner_name] = environment
+            batch = {
+                "study": study_name,
+                "run_index": run_index,
+                "key_prefix": f"{study_name}/{run_entry['date'].split('T')[0]}",
+                "s3_bucket": s3_bucket,
+                "artifact_store": store.url,
+                "endpoint_url": endpoint_url,
+                "rules": asdict(rules),
+                "metrics_interval": metrics_interval,
+                "jobs": [
+                    {
+                        "name": Path(config_file).name,
+                        "source": run_entry["benchmarks"][Path(config_file).name]["source"],
+                    }
+                    for config_file in runner_configs
+                ],
+            }
+            with tracer.phase("submit_batch", runner_name):
+                with tempfile.NamedTemporaryFile(
+                    "w", suffix=".json", encoding="utf-8", delete=False
+                ) as f:
+                    json.dump(batch, f)
+                remote_batch_path = f"/tmp/microbench_batch_{runner_name}.json"
+                c.put(f.name, remote_batch_path)
+                os.unlink(f.name)
+                batch_id = agent_command(c, "submit", remote_batch_path)["batch"]
+                c.run(f"rm -f {remote_batch_path}", hide=True)
+
+        click.echo(
+            f"[{runner_name}] Submitted {len(runner_configs)} benchmark(s) as batch {batch_id}"
+        )
+        with run_entry_lock:
+            run_entry["agent_batches"][runner_name] = batch_id
+            for config_file in runner_configs:
+                run_entry["benchmarks"][Path(config_file).name]["runner"] = runner_name
+
+    with ThreadPoolExecutor(max_workers=len(runner_pool)) as executor:
+        futures = {
+            executor.submit(submit_to_runner, runner_name, runner): runner_name
+            for runner_name, runner in runner_pool.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                click.echo(f"Runner {futures[future]} failed: {e}")
+    save_phase_trace(tracer, store, study_name, run_index, run_entry)
+    save_run(study_name, run_index, run_entry)
+
+    if not run_entry["agent_batches"]:
+        raise click.ClickException(
+            f"No batch was submitted. Use 'study resume {study_name}' to run the benchmarks over SSH"
+        )
+    if detach:
+        click.echo(f"Follow the benchmarks with: study attach {study_name}")
+        return
+    attach_run(study_name, study_data, run_index, poll_interval, live)
+
+
+def attach_run(
+    study_name: str,
+    study_data: dict,
+    run_index: int,
+    poll_interval: float,
+    live: bool | None,
+):
+    """Follow the agent batches of a run, saving each benchmark into the catalog once it completes"""
+    from rich.live import Live
+
+    run_entry = study_data["runs"][run_index]
+    batches = run_entry.get("agent_batches")
+    if not batches:
+        raise click.ClickException(
+            f"Run {run_index} of study '{study_name}' was not submitted to runner agents"
+        )
+    if live is None:
+        live = sys.stdout.isatty()
+    view = AgentBatchView()
+    connections = {
+        runner_name: connect_runner(run_entry["runners"][runner_name])
+        for runner_name in batches
+    }
+    unfinished = set(batches)
+
+    try:
+        with Live(view, refresh_per_second=1) if live else nullcontext():
+            while unfinished:
+                for runner_name in sorted(unfinished):
+                    c = connections[runner_name]
+                    try:
+                        batch_status = agent_command(c, "status", batches[runner_name])
+                    except Exception as e:
+                        # The runner may be rebooting or the network down, keep polling
+                        view.update(runner_name, None, f"unreachable: {e}")
+                        continue
+
+                    # Cancelled jobs stay pending in the study, so that they can be resumed
+                    for job in batch_status["jobs"]:
+                        benchmark = run_entry["benchmarks"][job["name"]]
+                        if (
+                            job["status"] in AGENT_TERMINAL_STATUSES - {"cancelled"}
+                            and benchmark["status"] == "pending"
+                        ):
+                            benchmark_entry = {
+                                "source": benchmark["source"],
+                                "results": job.get("results", ""),
+                                "logs": job.get("logs", ""),
+                                "iterations": job.get("iterations", ""),
+                                "status": job["status"],
+                                "runner": runner_name,
+                                "duration": job.get("duration"),
+                            }
+                            if job.get("error"):
+                                benchmark_entry["error"] = job["error"]
+                            if job.get("metrics"):
+                                benchmark_entry["metrics"] = job["metrics"]
+                                benchmark_entry["metrics_overhead"] = job.get(
+                                    "metrics_overhead"
+                                )
+                            if job.get("artifacts"):
+                                benchmark_entry["artifacts"] = job["artifacts"]
+                            run_entry["benchmarks"][job["name"]] = benchmark_entry
+                            save_benchmark(
+                                study_name, run_index, job["name"], benchmark_entry
+                            )
+                            if not live:
+                                click.echo(
+                                    f"[{runner_name}] Completed benchmark: "
+                                    f"{Path(job['name']).stem} ({job['status']})"
+                                )
+
+                    finished = all(
+                        job["status"] in AGENT_TERMINAL_STATUSES
+                        for job in batch_status["jobs"]
+                    )
+                    if finished:
+                        unfinished.discard(runner_name)
+                    elif not batch_status["alive"]:
+                        # The worker died (e.g. the runner rebooted), it picks up where it stopped
+                        agent_command(c, "start", batches[runner_name])
+                    view.update(runner_name, batch_status)
+                if unfinished:
+                    time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        click.echo(
+            f"Detached, the benchmarks keep running. Reattach with: study attach {study_name}"
+        )
+        return
+    finally:
+        for c in connections.values():
+            c.close()
+
+    statuses = [b.get("status") for b in run_entry["benchmarks"].values()]
+    click.echo(
+        f"Study run completed: {statuses.count('success')}/{len(statuses)} benchmarks successful"
+    )
+
+
+@study.command("attach")
+@click.argument("study_name")
+@click.option(
+    "--run-index",
+    type=int,
+    default=-1,
+    help="Run to follow (default: the last one)",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=1),
+    default=5,
+    show_default=True,
+    help="Seconds between two status requests to each runner",
+)
+@add_options(LIVE_OPTIONS)
+def attach_study(
+    study_name: str, run_index: int, poll_interval: float, live: bool | None
+):
+    """Follow the benchmarks of a run submitted to the runner agents, until they all complete"""
+    study_data = load_study(study_name)
+    if not study_data["runs"]:
+        raise click.ClickException(f"No runs found for study '{study_name}'")
+    if not -len(study_data["runs"]) <= run_index < len(study_data["runs"]):
+        raise click.ClickException(
+            f"Run index {run_index} not found (max: {len(study_data['runs']) - 1})"
+        )
+    attach_run(
+        study_name, study_data, run_index % len(study_data["runs"]), poll_interval, live
+    )
+
+
+def parse_s3_uri(s3_uri: str):
+    """Split an s3://bucket/key URI into its bucket and key"""
+    bucket, key = s3_uri.replace("s3://", "").split("/", 1)
+    return bucket, key
+
+
+def file_md5(path: Path) -> str:
+    """MD5 hex digest of a local file, read in chunks"""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(SYNC_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncState:
+    """Records the ETag and size of every file downloaded by `study sync`, to skip them on the next sync"""
+
+    def __init__(self, output_path: Path):
+        self.state_file = output_path / ".sync_state.json"
+        self.lock = threading.Lock()
+        self.files = {}
+        if self.state_file.exists():
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.files = json.load(f)
+
+    def is_up_to_date(self, local_path: Path, etag: str, size: int) -> bool:
+        if not local_path.exists() or local_path.stat().st_size != size:
+            return False
+        with self.lock:
+            known = self.files.get(str(local_path))
+        if known is not None:
+            return known["etag"] == etag
+        # Files downloaded before the state existed: single part uploads have the MD5 as ETag
+        if "-" not in etag and file_md5(local_path) == etag:
+            self.record(local_path, etag, size)
+            return True
+        return False
+
+    def record(self, local_path: Path, etag: str, size: int):
+        with self.lock:
+            self.files[str(local_path)] = {"etag": etag, "size": size}
+
+    def save(self):
+        with self.lock:
+            tmp_file = self.state_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.files, f, indent=4)
+            os.replace(tmp_file, self.state_file)
+
+
+def download_s3_object(
+    s3, bucket: str, key: str, local_path: Path, state: SyncState, on_bytes
+) -> int:
+    """Download an S3 object unless it is already up to date locally, resuming partial downloads.
+
+    `on_bytes` is called with the size of every chunk received. Returns the number of bytes actually transferred.
+    """
+    head = s3.head_object(Bucket=bucket, Key=key)
+    etag = head["ETag"].strip('"')
+    size = head["ContentLength"]
+
+    if state.is_up_to_date(local_path, etag, size):
+        return 0
+
+    # Partial downloads are kept next to their ETag, and only resumed if the object didn't change since
+    part_path = local_path.with_name(local_path.name + ".part")
+    part_etag_path = local_path.with_name(local_path.name + ".part.etag")
+    offset = 0
+    if (
+        part_path.exists()
+        and part_etag_path.exists()
+        and part_etag_path.read_text(encoding="utf-8") == etag
+        and part_path.stat().st_size <= size
+    ):
+        offset = part_path.stat().st_size
+    else:
+        part_path.unlink(missing_ok=True)
+        part_etag_path.write_text(etag, encoding="utf-8")
+
+    transferred = 0
+    if offset < size:
+        response = s3.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={offset}-", IfMatch=head["ETag"]
+        )
+        with open(part_path, "ab") as f:
+            for chunk in response["Body"].iter_chunks(SYNC_CHUNK_SIZE):
+                f.write(chunk)
+                transferred += len(chunk)
+                on_bytes(len(chunk))
+    else:
+        part_path.touch()
+
+    os.replace(part_path, local_path)
+    part_etag_path.unlink(missing_ok=True)
+    state.record(local_path, etag, size)
+    return transferred
+
+
+def copy_local_artifact(
+    source: Path, local_path: Path, state: SyncState, on_bytes
+) -> int:
+    """Copy an artifact of a local artifact store unless it is already up to date. Returns the bytes copied"""
+    stat = source.stat()
+    etag = f"{stat.st_mtime_ns}-{stat.st_size}"
+    if state.is_up_to_date(local_path, etag, stat.st_size):
+        return 0
+
+    part_path = local_path.with_name(local_path.name + ".part")
+    transferred = 0
+    with open(source, "rb") as src, open(part_path, "wb") as dst:
+        for chunk in iter(lambda: src.read(SYNC_CHUNK_SIZE), b""):
+            dst.write(chunk)
+            transferred += len(chunk)
+            on_bytes(len(chunk))
+    os.replace(part_path, local_path)
+    state.record(local_path, etag, stat.st_size)
+    return transferred
+
+
+def download_artifact(s3, uri: str, local_path: Path, state: SyncState, on_bytes) -> int:
+    """Download an artifact from S3 or copy it from a local artifact store"""
+    if uri.startswith("file://"):
+        return copy_local_artifact(file_uri_path(uri), local_path, state, on_bytes)
+    bucket, key = parse_s3_uri(uri)
+    return download_s3_object(s3, bucket, key, local_path, state, on_bytes)
+
+
+def manifest_targets(benchmark_dir: Path, manifest: dict, state: SyncState) -> list:
+    """(local path, manifest entry) of the files of an artifacts manifest that are not up to date locally"""
+    targets = []
+    for entry in manifest["files"]:
+        target = benchmark_dir / entry["path"]
+        if benchmark_dir.resolve() not in target.resolve().parents:
+            raise ValueError(f"{entry['path']} is outside of the benchmark directory")
+        if state.is_up_to_date(target, entry["sha256"], entry["size"]):
+            continue
+        # Artifacts streamed over SSH by study run are already there
+        if target.exists() and target.stat().st_size == entry["size"] and file_sha256(target) == entry["sha256"]:
+            state.record(target, entry["sha256"], entry["size"])
+            continue
+        targets.append((target, entry))
+    return targets
+
+
+def materialize_blob(blob_path: Path, target: Path, entry: dict, state: SyncState):
+    """Hard link a downloaded blob to its path in the artifacts layout, or copy it across file systems"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    part_path = target.with_name(target.name + ".part")
+    part_path.unlink(missing_ok=True)
+    try:
+        os.link(blob_path, part_path)
+    except OSError:
+        shutil.copyfile(blob_path, part_path)
+    os.replace(part_path, target)
+    state.record(target, entry["sha256"], entry["size"])
+
+
+@study.command("sync")
+@click.argument("study_name")
+@click.option(
+    "--output-dir", default="./results", help="Local directory to download results to"
+)
+@click.option(
+    "--profile", envvar="AWS_PROFILE", default="default", help="AWS profile to use"
+)
+@click.option("--no-profile", "no_profile", is_flag=True, default=False)
+@click.option(
+    "--run-index", type=int, help="Specific run index to sync (default: all runs)"
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of concurrent downloads",
+)
+@click.option(
+    "--endpoint-url",
+    envvar="AWS_ENDPOINT_URL",
+    help="Custom S3 endpoint (e.g. a local MinIO)",
+)
+def sync_study(
+    study_name: str,
+    output_dir: str,
+    profile: str,
+    no_profile: bool,
+    run_index: int,
+    jobs: int,
+    endpoint_url: str | None,
+):
+    """Download study run results from S3 (or copy them from a local artifact store)"""
+    from botocore.config import Config as BotoConfig
+    from rich.progress import (
+        DownloadColumn,
+        Progress,
+        TextColumn,
+        TimeElapsedColumn,
+        TransferSpeedColumn,
+    )
+
+    study_data = load_study(study_name)
+    if not study_data["runs"]:
+        raise click.ClickException(f"No runs found for study '{study_name}'")
+
+    # Determine which runs to sync
+    runs_to_sync = []
+    if run_index is not None:
+        if run_index >= len(study_data["runs"]):
+            raise click.ClickException(
+                f"Run index {run_index} not found (max: {len(study_data['runs']) - 1})"
+            )
+        runs_to_sync = [study_data["runs"][run_index]]
+    else:
+        runs_to_sync = study_data["runs"]
+
+    # Create output directory structure, with a snapshot of the study for the analysis tools
+    output_path = Path(output_dir) / study_name
+    output_path.mkdir(parents=True, exist_ok=True)
+    with open(output_path / "study.json", "w", encoding="utf-8") as f:
+        json.dump(study_data, f, indent=4, ensure_ascii=False)
+
+    click.echo(f"Syncing {len(runs_to_sync)} run(s) for study '{study_name}'")
+
+    # Collect the objects to download, the artifacts manifests and the benchmarks whose iterations were not recorded
+    downloads = []
+    manifests = []
+    logs_only = []
+    for i, run in enumerate(runs_to_sync):
+        run_dir = get_run_dir(output_path, i if run_index is None else run_index, run)
+        run_dir.mkdir(exist_ok=True)
+
+        for benchmark_name, benchmark_data in run["benchmarks"].items():
             benchmark_dir = run_dir / Path(benchmark_name).stem
             benchmark_dir.mkdir(exist_ok=True)
 
@@ -711,34 +3786,354 @@ def sync_study(
             with open(source_file, "w", encoding="utf-8") as f:
                 f.write(benchmark_data["source"])
 
-            # Download results if available
-            if benchmark_data.get("results") and benchmark_data["results"].startswith(
-                "s3://"
-            ):
-                try:
-                    s3_url = benchmark_data["results"]
-                    bucket, key = s3_url.replace("s3://", "").split("/", 1)
-                    results_file = benchmark_dir / "results.zip"
-                    s3.download_file(bucket, key, str(results_file))
-                    click.echo(f"Downloaded results for {benchmark_name}")
-                except Exception as e:
-                    click.echo(f"Failed to download results for {benchmark_name}: {e}")
-
-            # Download logs if available
-            if benchmark_data.get("logs") and benchmark_data["logs"].startswith(
-                "s3://"
-            ):
-                try:
-                    s3_url = benchmark_data["logs"]
-                    bucket, key = s3_url.replace("s3://", "").split("/", 1)
-                    logs_file = benchmark_dir / "logs.txt"
-                    s3.download_file(bucket, key, str(logs_file))
-                    click.echo(f"Downloaded logs for {benchmark_name}")
-                except Exception as e:
-                    click.echo(f"Failed to download logs for {benchmark_name}: {e}")
+            results_file = "results.zip"
+            if benchmark_data.get("results", "").endswith(".tar.gz"):
+                results_file = "results.tar.gz"
+                # Artifacts streamed over SSH by study run are already extracted here
+                if (benchmark_dir / "BenchmarkDotNet.Artifacts").is_dir():
+                    results_file = None
+            elif benchmark_data.get("results", "").endswith(MANIFEST_SUFFIX):
+                results_file = "manifest.json"
+                manifests.append((benchmark_name, benchmark_dir))
+
+            for field, filename in [
+                ("results", results_file),
+                ("logs", "logs.txt"),
+                ("iterations", "iterations.json"),
+                ("metrics", "metrics.csv.gz"),
+            ]:
+                if (
+                    filename
+                    and benchmark_data.get(field)
+                    and benchmark_data[field].startswith(("s3://", "file://"))
+                ):
+                    downloads.append(
+                        (benchmark_name, field, benchmark_data[field], benchmark_dir / filename)
+                    )
+            if not benchmark_data.get("iterations"):
+                logs_only.append(benchmark_dir)
+
+        # Traces of the orchestration phases of every `study run` (or resume) of the run
+        for n, orchestration in enumerate(run.get("orchestration", [])):
+            if orchestration.get("trace", "").startswith(("s3://", "file://")):
+                downloads.append(
+                    (run_dir.name, "trace", orchestration["trace"], run_dir / f"trace_{n}.json")
+                )
+
+    # Initialize S3 client, shared by all download threads, unless everything is in a local artifact store
+    s3 = None
+    if any(uri.startswith("s3://") for _, _, uri, _ in downloads):
+        if no_profile:
+            session = s3_session()
+        else:
+            session = s3_session(profile)
+        s3 = session.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            config=BotoConfig(max_pool_connections=jobs),
+        )
+
+    state = SyncState(output_path)
+    blob_dir = Path(output_dir) / BLOB_CACHE_DIR
+    blobs = {}
+    materialized = 0
+    transferred = 0
+    failures = 0
+    start = time.monotonic()
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeElapsedColumn(),
+    ) as progress:
+        task_id = progress.add_task(
+            f"Downloading 0/{len(downloads)} file(s)", total=None
+        )
+
+        def on_bytes(n: int):
+            progress.advance(task_id, n)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+
+            def download_all(downloads: list) -> int:
+                """Download (benchmark name, field, URI, local path) objects concurrently. Returns the failures"""
+                nonlocal transferred
+                failed = 0
+                futures = {
+                    executor.submit(
+                        download_artifact, s3, uri, local_path, state, on_bytes
+                    ): (benchmark_name, field)
+                    for benchmark_name, field, uri, local_path in downloads
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    benchmark_name, field = futures[future]
+                    try:
+                        transferred += future.result()
+                    except Exception as e:
+                        failed += 1
+                        progress.console.print(
+                            f"Failed to download {field} for {benchmark_name}: {e}"
+                        )
+                    progress.update(
+                        task_id,
+                        description=f"Downloading {done}/{len(downloads)} file(s)",
+                    )
+                return failed
+
+            try:
+                failures += download_all(downloads)
 
+                # Content-addressed artifacts: only the blobs of the files missing locally are downloaded, once
+                links = []
+                for benchmark_name, benchmark_dir in manifests:
+                    manifest_file = benchmark_dir / "manifest.json"
+                    if not manifest_file.exists():
+                        continue
+                    try:
+                        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+                        targets = manifest_targets(benchmark_dir, manifest, state)
+                    except (OSError, ValueError, KeyError) as e:
+                        failures += 1
+                        progress.console.print(f"Invalid artifacts manifest for {benchmark_name}: {e}")
+                        continue
+                    for target, entry in targets:
+                        blob_path = blob_dir / entry["sha256"][:2] / entry["sha256"]
+                        links.append((blob_path, target, entry))
+                        if not blob_path.exists() and entry["sha256"] not in blobs:
+                            blob_path.parent.mkdir(parents=True, exist_ok=True)
+                            blobs[entry["sha256"]] = (
+                                benchmark_name,
+                                entry["path"],
+                                blob_uri(manifest["blobs"], entry["sha256"]),
+                                blob_path,
+                            )
+                failures += download_all(list(blobs.values()))
+                for blob_path, target, entry in links:
+                    if blob_path.exists():
+                        materialize_blob(blob_path, target, entry, state)
+                        materialized += 1
+            finally:
+                state.save()
+
+    # Runs older than iterations.json: parse their console output with the parser of the runner agent
+    for benchmark_dir in logs_only:
+        logs_file = benchmark_dir / "logs.txt"
+        iterations_file = benchmark_dir / "iterations.json"
+        if logs_file.exists() and not iterations_file.exists():
+            iterations = parse_benchmark_log(logs_file.read_text(encoding="utf-8", errors="replace"))
+            with open(iterations_file, "w", encoding="utf-8") as f:
+                json.dump({**iterations, "source": "logs.txt"}, f)
+
+    elapsed = time.monotonic() - start
+    click.echo(
+        f"Downloaded {transferred / 1e6:.1f} MB in {elapsed:.1f}s "
+        f"({transferred / 1e6 / max(elapsed, 1e-9):.1f} MB/s), "
+        f"{len(downloads) + len(blobs) - failures}/{len(downloads) + len(blobs)} file(s) up to date"
+    )
+    if manifests:
+        click.echo(
+            f"Materialized {materialized} artifact file(s) of {len(manifests)} benchmark(s) "
+            f"from {len(blobs)} new blob(s) in {blob_dir}"
+        )
     click.echo(f"Sync completed. Results available in: {output_path}")
 
 
+def run_analysis(*args: str, extras: tuple = ()):
+    """Run a command of the microbench-analysis project with uv, exiting with its status if it fails"""
+    analysis_dir = Path(__file__).resolve().parent / "microbench-analysis"
+    command = ["uv", "run", "--project", str(analysis_dir)]
+    for extra in extras:
+        command += ["--extra", extra]
+    try:
+        result = subprocess.run([*command, str(analysis_dir / "main.py"), *args])
+    except FileNotFoundError:
+        raise click.ClickException(
+            "uv command not found. Is uv installed and in your PATH?"
+        )
+    if result.returncode:
+        sys.exit(result.returncode)
+
+
+def archive_arguments(
+    run_index: int | None,
+    benchmark_patterns: tuple,
+    profile: str,
+    no_profile: bool,
+    endpoint_url: str | None,
+) -> list:
+    """Options of the microbench-analysis commands reading results archives"""
+    arguments = []
+    if run_index is not None:
+        arguments += ["--run", str(run_index)]
+    for pattern in benchmark_patterns:
+        arguments += ["--benchmark", pattern]
+    if not no_profile:
+        arguments += ["--profile", profile]
+    if endpoint_url:
+        arguments += ["--endpoint-url", endpoint_url]
+    return arguments
+
+
+# Options of the commands reading members of the results archives
+ARCHIVE_OPTIONS = [
+    click.option(
+        "--run-index", type=int, help="Only read this run (default: every run)"
+    ),
+    click.option(
+        "--benchmark",
+        "benchmark_patterns",
+        multiple=True,
+        help="Only read the benchmarks whose name matches this glob. Can be given multiple times",
+    ),
+    click.option(
+        "--profile", envvar="AWS_PROFILE", default="default", help="AWS profile to use"
+    ),
+    click.option("--no-profile", "no_profile", is_flag=True, default=False),
+    click.option(
+        "--endpoint-url",
+        envvar="AWS_ENDPOINT_URL",
+        help="Custom S3 endpoint (e.g. a local MinIO)",
+    ),
+]
+
+
+@study.command("cat")
+@click.argument("study_name")
+@click.argument("patterns", nargs=-1, required=True)
+@add_options(ARCHIVE_OPTIONS)
+def cat_study(
+    study_name: str,
+    patterns: tuple,
+    run_index: int | None,
+    benchmark_patterns: tuple,
+    profile: str,
+    no_profile: bool,
+    endpoint_url: str | None,
+):
+    """Print the files of the results archives matching glob patterns, without downloading the archives.
+
+    Each file is announced on stderr, so that stdout only holds the file contents. The archives are read by the
+    microbench-analysis project, run with uv.
+    """
+    study_data = load_study(study_name)
+    with tempfile.TemporaryDirectory() as results_dir:
+        (Path(results_dir) / study_name).mkdir()
+        with open(Path(results_dir) / study_name / "study.json", "w", encoding="utf-8") as f:
+            json.dump(study_data, f, ensure_ascii=False)
+        run_analysis(
+            "cat",
+            study_name,
+            *patterns,
+            "--results-dir",
+            results_dir,
+            *archive_arguments(run_index, benchmark_patterns, profile, no_profile, endpoint_url),
+            extras=("s3",),
+        )
+
+
+@study.command("extract")
+@click.argument("study_name")
+@click.argument("patterns", nargs=-1, required=True)
+@click.option(
+    "--output-dir", default="./results", help="Local results directory to extract into"
+)
+@add_options(ARCHIVE_OPTIONS)
+def extract_study(
+    study_name: str,
+    patterns: tuple,
+    output_dir: str,
+    run_index: int | None,
+    benchmark_patterns: tuple,
+    profile: str,
+    no_profile: bool,
+    endpoint_url: str | None,
+):
+    """Extract the files of the results archives matching glob patterns into the results tree.
+
+    Only the central directory and the matching files of each zip are transferred, e.g. `'*-report.csv'` for
+    `microbench-analysis ingest`. The files land where `study sync` would have extracted them. The archives are
+    read by the `fetch` command of the microbench-analysis project, run with uv.
+    """
+    study_data = load_study(study_name)
+    output_path = Path(output_dir) / study_name
+    output_path.mkdir(parents=True, exist_ok=True)
+    with open(output_path / "study.json", "w", encoding="utf-8") as f:
+        json.dump(study_data, f, indent=4, ensure_ascii=False)
+
+    patterns = [argument for pattern in patterns for argument in ("--pattern", pattern)]
+    run_analysis(
+        "fetch",
+        study_name,
+        *patterns,
+        "--results-dir",
+        output_dir,
+        *archive_arguments(run_index, benchmark_patterns, profile, no_profile, endpoint_url),
+        extras=("s3",),
+    )
+    click.echo(f"Files available in: {output_path}")
+
+
+@study.command("compare")
+@click.argument("baseline_study")
+@click.argument("candidate_study", required=False)
+@click.option(
+    "--results-dir", default="./results", help="Local directory the studies were synced to"
+)
+@click.option(
+    "--baseline-run",
+    type=int,
+    help="Run index of the baseline (default: every run of the baseline study)",
+)
+@click.option(
+    "--candidate-run",
+    type=int,
+    help="Run index of the candidate (default: every run of the candidate study)",
+)
+@click.option(
+    "--threshold",
+    default=0.05,
+    show_default=True,
+    help="Relative slowdown above which a significant change is a regression",
+)
+@click.option(
+    "--alpha", default=0.05, show_default=True, help="Significance level of the tests"
+)
+@click.option(
+    "--json", "json_output", help="Write the full comparison to this JSON file"
+)
+def compare_study(
+    baseline_study: str,
+    candidate_study: str | None,
+    results_dir: str,
+    baseline_run: int | None,
+    candidate_run: int | None,
+    threshold: float,
+    alpha: float,
+    json_output: str | None,
+):
+    """
+    Compares two synced runs or studies and exits with a non-zero status on a significant regression.
+    The statistics are computed by the microbench-analysis project, run with uv.
+    """
+    arguments = [
+        "compare",
+        baseline_study,
+        *([candidate_study] if candidate_study else []),
+        "--results-dir",
+        results_dir,
+        "--threshold",
+        str(threshold),
+        "--alpha",
+        str(alpha),
+    ]
+    if baseline_run is not None:
+        arguments.extend(["--baseline-run", str(baseline_run)])
+    if candidate_run is not None:
+        arguments.extend(["--candidate-run", str(candidate_run)])
+    if json_output:
+        arguments.extend(["--json", json_output])
+    run_analysis(*arguments)
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# microbenchmark.py and microbench_agent.py are scripts at the root of the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
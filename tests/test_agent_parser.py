@@ -0,0 +1,126 @@
+import pytest
+
+from microbench_agent import AnomalyRules, BenchmarkLogParser, parse_benchmark_log
+
+CASE_HEADER = (
+    "// Benchmark: RedisThroughputBenchmark.AddObject: Job-ABCDEF(IterationCount=12, WarmupCount=1) "
+    "[TransferParameters=(1, 2), NumConcurrentRunners=5]"
+)
+
+
+def feed(parser: BenchmarkLogParser, *lines: str):
+    parser.write("\n".join(lines) + "\n")
+
+
+def test_parses_cases_and_iterations():
+    parser = BenchmarkLogParser(AnomalyRules())
+    feed(
+        parser,
+        CASE_HEADER,
+        "// Launch: 1 / 2",
+        "WorkloadActual   1: 4 op, 1,000,000.50 ns, 250.0001 us/op",
+        "// Launch: 2 / 2",
+        "WorkloadResult   1: 4 op, 2000000 ns, 500 us/op",
+        "// Benchmark Process 1234 has exited with code 0",
+    )
+    [case] = parser.cases
+    assert case["type"] == "RedisThroughputBenchmark"
+    assert case["method"] == "AddObject"
+    assert case["params"] == {"TransferParameters": "(1, 2)", "NumConcurrentRunners": "5"}
+    assert case["iteration_count"] == 12
+    assert case["exit_codes"] == [0]
+    assert [(m["launch"], m["stage"], m["ops"], m["ns"]) for m in case["measurements"]] == [
+        (1, "WorkloadActual", 4, 1000000.5),
+        (2, "WorkloadResult", 4, 2000000.0),
+    ]
+    assert parser.abort_reason is None
+
+
+def test_lines_split_across_chunks():
+    parser = BenchmarkLogParser(AnomalyRules())
+    text = CASE_HEADER + "\r\nWorkloadActual   1: 1 op, 5000 ns\r\n"
+    for i in range(0, len(text), 7):
+        parser.write(text[i : i + 7])
+    assert [m["ns"] for m in parser.cases[0]["measurements"]] == [5000.0]
+
+
+def test_output_before_the_first_case_is_ignored():
+    parser = BenchmarkLogParser(AnomalyRules(max_exceptions=1))
+    feed(parser, "WorkloadActual   1: 1 op, 5000 ns", "System.InvalidOperationException: boom")
+    assert parser.cases == []
+    assert parser.abort_reason is None
+
+
+def test_aborts_after_too_many_exceptions():
+    parser = BenchmarkLogParser(AnomalyRules(max_exceptions=2))
+    feed(parser, CASE_HEADER, "Unhandled exception. System.Exception: boom")
+    assert parser.abort_reason is None
+    feed(parser, "  StackExchange.Redis.RedisConnectionException: refused")
+    assert parser.abort_reason == "2 exceptions in AddObject(TransferParameters=(1, 2), NumConcurrentRunners=5)"
+
+
+def test_aborts_after_consecutive_empty_iterations():
+    parser = BenchmarkLogParser(AnomalyRules(max_empty_iterations=2))
+    feed(
+        parser,
+        CASE_HEADER,
+        "WorkloadActual   1: 1 op, 10 ns",
+        "WorkloadActual   2: 1 op, 5000000 ns",
+        "WorkloadActual   3: 1 op, 10 ns",
+    )
+    assert parser.abort_reason is None
+    feed(parser, "WorkloadActual   4: 1 op, 10 ns")
+    assert parser.abort_reason.startswith("2 consecutive iterations did no work")
+
+
+def test_stall_timeout():
+    parser = BenchmarkLogParser(AnomalyRules(stall_timeout=30))
+    parser.check_stall()
+    assert parser.abort_reason is None
+    parser.last_output -= 31
+    parser.check_stall()
+    assert parser.abort_reason == "No output for 31s"
+
+
+@pytest.mark.parametrize("rules", [AnomalyRules(0, 0, 0)])
+def test_disabled_rules_never_abort(rules):
+    parser = BenchmarkLogParser(rules)
+    feed(parser, CASE_HEADER, *["System.Exception: boom"] * 100, *["WorkloadActual   1: 1 op, 1 ns"] * 10)
+    parser.last_output -= 3600
+    parser.check_stall()
+    assert parser.abort_reason is None
+
+
+def test_first_abort_reason_is_kept():
+    parser = BenchmarkLogParser(AnomalyRules())
+    parser.abort("first")
+    parser.abort("second")
+    assert parser.to_dict()["abort_reason"] == "first"
+
+
+def test_parse_benchmark_log_has_no_parse_time():
+    parsed = parse_benchmark_log(CASE_HEADER + "\nWorkloadResult   1: 2 op, 4000 ns")
+    [measurement] = parsed["cases"][0]["measurements"]
+    assert "time" not in measurement
+    assert measurement["ns"] == 4000.0
+
+
+def test_latency_histograms_go_with_the_next_iteration():
+    parser = BenchmarkLogParser(AnomalyRules())
+    feed(
+        parser,
+        CASE_HEADER,
+        "// LatencyHistogram: operation=AddOrUpdateAsync runner=0 bits=7 counts=2301:1,15:2",
+        "WorkloadWarmup   1: 1 op, 5000000 ns",
+        "// LatencyHistogram: operation=AddOrUpdateAsync runner=0 bits=7 counts=2300:3",
+        "// LatencyHistogram: operation=AddOrUpdateAsync runner=1 bits=7 counts=2290:1,2:2",
+        "WorkloadActual   1: 1 op, 5000000 ns",
+        "WorkloadResult   1: 1 op, 5000000 ns",
+    )
+    warmup, actual, result = parser.cases[0]["measurements"]
+    assert [h["counts"] for h in warmup["latencies"]] == ["2301:1,15:2"]
+    assert [(h["operation"], h["runner"], h["bits"], h["counts"]) for h in actual["latencies"]] == [
+        ("AddOrUpdateAsync", 0, 7, "2300:3"),
+        ("AddOrUpdateAsync", 1, 7, "2290:1,2:2"),
+    ]
+    assert "latencies" not in result
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from microbench_agent import store_artifacts
+from microbenchmark import ArtifactStore, SyncState, manifest_targets, materialize_blob
+
+
+def make_artifacts(root, files: dict):
+    for path, contents in files.items():
+        target = root / "BenchmarkDotNet.Artifacts" / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(contents)
+    return root
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore((tmp_path / "store").as_uri())
+
+
+def test_store_artifacts_uploads_each_blob_once(tmp_path, store):
+    template = b"<html>report template</html>" * 100
+    first = make_artifacts(tmp_path / "first", {"results/a-report.html": template, "results/a-report.csv": b"1"})
+    second = make_artifacts(tmp_path / "second", {"results/b-report.html": template, "results/b-report.csv": b"2"})
+
+    stats = store_artifacts(first, store.uri("study/first_manifest.json"), store.url)
+    assert stats == {
+        "files": 2,
+        "bytes": len(template) + 1,
+        "blobs": 2,
+        "uploaded": 2,
+        "uploaded_bytes": len(template) + 1,
+    }
+    # The template is already stored
+    stats = store_artifacts(second, store.uri("study/second_manifest.json"), store.url)
+    assert (stats["uploaded"], stats["uploaded_bytes"]) == (1, 1)
+    blobs = [p for p in (tmp_path / "store" / "blobs").rglob("*") if p.is_file()]
+    assert len(blobs) == 3
+
+    manifest = json.loads((tmp_path / "store" / "study" / "second_manifest.json").read_text())
+    assert manifest["blobs"] == store.uri("blobs")
+    assert [entry["path"] for entry in manifest["files"]] == [
+        "BenchmarkDotNet.Artifacts/results/b-report.csv",
+        "BenchmarkDotNet.Artifacts/results/b-report.html",
+    ]
+    assert not (second / "manifest.json").exists()
+
+    # Artifacts stored from this machine share the blobs of the runners
+    third = make_artifacts(tmp_path / "third", {"results/c-report.html": template})
+    assert store.store_artifacts(third, "study/third_manifest.json")["uploaded"] == 0
+
+
+def test_sync_materializes_the_missing_files(tmp_path, store):
+    root = make_artifacts(tmp_path / "runner", {"results/a-report.csv": b"report", "logs/run.log": b"log"})
+    store_artifacts(root, store.uri("study/a_manifest.json"), store.url)
+    manifest = json.loads((tmp_path / "store" / "study" / "a_manifest.json").read_text())
+
+    benchmark_dir = tmp_path / "results" / "study" / "run_0" / "a"
+    # Already streamed over SSH
+    make_artifacts(benchmark_dir, {"logs/run.log": b"log"})
+    state = SyncState(tmp_path / "results" / "study")
+    targets = manifest_targets(benchmark_dir, manifest, state)
+    assert [entry["path"] for _, entry in targets] == ["BenchmarkDotNet.Artifacts/results/a-report.csv"]
+
+    for target, entry in targets:
+        sha256 = entry["sha256"]
+        materialize_blob(tmp_path / "store" / "blobs" / sha256[:2] / sha256, target, entry, state)
+    assert (benchmark_dir / "BenchmarkDotNet.Artifacts" / "results" / "a-report.csv").read_bytes() == b"report"
+    assert manifest_targets(benchmark_dir, manifest, state) == []
+
+
+def test_manifest_paths_stay_in_the_benchmark_directory(tmp_path):
+    manifest = {"files": [{"path": "../../escape", "sha256": "0" * 64, "size": 1}]}
+    benchmark_dir = tmp_path / "results" / "study" / "run_0" / "a"
+    benchmark_dir.mkdir(parents=True)
+    with pytest.raises(ValueError):
+        manifest_targets(benchmark_dir, manifest, SyncState(tmp_path))
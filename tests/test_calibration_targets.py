@@ -0,0 +1,25 @@
+import json
+
+from microbenchmark import calibration_targets
+
+
+def test_calibration_targets():
+    sources = [
+        {"Component": "Redis", "Redis:EndpointUrl": "redis.cache:6380"},
+        {"Component": "S3", "S3:EndpointUrl": "http://minio:9000"},
+        {"Component": "SQS", "SQS:ServiceURL": "https://sqs.eu-west-3.amazonaws.com"},
+        {"Component": "RabbitMQ", "Amqp:Host": "10.0.1.2", "Amqp:Port": 5671},
+        {"Component": "LocalStorage", "LocalStorage:Path": "/mnt/efs"},
+        # Same endpoint twice, and default port
+        {"Component": "Redis", "Redis:EndpointUrl": "redis.cache:6380"},
+        {"Component": "Redis", "Redis:EndpointUrl": "redis2"},
+    ]
+    endpoints, disks = calibration_targets([json.dumps(s) for s in sources] + ["not json"])
+    assert endpoints == [
+        "Redis=redis.cache:6380",
+        "S3=minio:9000",
+        "SQS=sqs.eu-west-3.amazonaws.com:443",
+        "RabbitMQ=10.0.1.2:5671",
+        "Redis=redis2:6379",
+    ]
+    assert disks == ["/mnt/efs"]
@@ -0,0 +1,104 @@
+import json
+
+import click
+import pytest
+
+from microbenchmark import (
+    import_legacy_studies,
+    load_study,
+    open_catalog,
+    save_benchmark,
+    save_run,
+    save_study,
+    study_exists,
+)
+
+STUDY = {
+    "name": "release-0.25.1",
+    "core_version": "0.25.1",
+    "benchmark_runner_version": "main",
+    "creation_date": "2026-02-15T10:00:00",
+    "core_commit": "a" * 40,
+    "runs": [
+        {
+            "runners": {"runner": {"config": "runner.json", "contents": {"host": "h", "key": "k"}}},
+            "date": "2026-02-15T10:05:00",
+            "core_commit": "a" * 40,
+            "benchmarks": {
+                "redis.json": {
+                    "source": '{"Component": "Redis"}',
+                    "status": "success",
+                    "runner": "runner",
+                    "duration": 12.5,
+                    "results": "s3://bucket/key_results.zip",
+                    "precision": {"AddObject()": 0.01},
+                },
+                "s3.json": {"source": '{"Component": "S3"}', "status": "pending"},
+            },
+        }
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def studies_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "studies"
+
+
+def test_round_trip():
+    save_study(STUDY["name"], STUDY)
+    assert load_study(STUDY["name"]) == STUDY
+    assert study_exists(STUDY["name"])
+    assert not study_exists("other")
+
+
+def test_save_run_and_benchmark():
+    save_study(STUDY["name"], STUDY)
+    run = json.loads(json.dumps(STUDY["runs"][0]))
+    run["benchmarks"]["sqs.json"] = {"source": '{"Component": "SQS"}', "status": "pending"}
+    save_run(STUDY["name"], 1, run)
+    save_benchmark(STUDY["name"], 1, "sqs.json", {"source": '{"Component": "SQS"}', "status": "failed"})
+    save_benchmark(STUDY["name"], 1, "new.json", {"source": "{}", "status": "success"})
+
+    study_data = load_study(STUDY["name"])
+    assert study_data["runs"][0] == STUDY["runs"][0]
+    benchmarks = study_data["runs"][1]["benchmarks"]
+    # Benchmarks keep their position, new ones are appended
+    assert list(benchmarks) == ["redis.json", "s3.json", "sqs.json", "new.json"]
+    assert benchmarks["sqs.json"]["status"] == "failed"
+
+
+def test_sources_are_stored_once():
+    save_study(STUDY["name"], STUDY)
+    save_study("copy", {**STUDY, "name": "copy"})
+    with open_catalog() as db:
+        blobs = db.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+    # Two config sources and one runner pool
+    assert blobs == 3
+
+
+def test_legacy_study_is_imported_on_first_load(studies_dir):
+    studies_dir.mkdir()
+    (studies_dir / "legacy.json").write_text(json.dumps({**STUDY, "name": "legacy"}), encoding="utf-8")
+    assert study_exists("legacy")
+    assert load_study("legacy") == {**STUDY, "name": "legacy"}
+    (studies_dir / "legacy.json").unlink()
+    assert load_study("legacy")["runs"] == STUDY["runs"]
+
+
+def test_import_legacy_studies(studies_dir):
+    studies_dir.mkdir()
+    save_study("legacy", {**STUDY, "name": "legacy", "core_version": "catalog"})
+    (studies_dir / "legacy.json").write_text(json.dumps({**STUDY, "name": "legacy"}), encoding="utf-8")
+    (studies_dir / "other.json").write_text(json.dumps({**STUDY, "name": "other"}), encoding="utf-8")
+    with open_catalog() as db:
+        import_legacy_studies(db)
+    # Studies already in the catalog are not overwritten by their JSON file
+    assert load_study("legacy")["core_version"] == "catalog"
+    assert load_study("other") == {**STUDY, "name": "other"}
+
+
+def test_missing_study():
+    with pytest.raises(click.ClickException):
+        load_study("missing")
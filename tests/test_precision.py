@@ -0,0 +1,35 @@
+import pytest
+
+from microbenchmark import PRECISION_CONFIDENCE, relative_half_width, t_quantile
+
+# 0.975 quantiles of Student's t distribution
+T_975 = {1: 12.7062, 2: 4.3027, 3: 3.1824, 5: 2.5706, 10: 2.2281, 11: 2.2010, 20: 2.0860, 30: 2.0423}
+
+
+@pytest.mark.parametrize("dof, expected", T_975.items())
+def test_t_quantile(dof, expected):
+    assert t_quantile((1 + PRECISION_CONFIDENCE) / 2, dof) == pytest.approx(expected, rel=1e-3)
+
+
+def test_t_quantile_other_levels():
+    # 0.95 quantile, from the expansion
+    assert t_quantile(0.95, 30) == pytest.approx(1.6973, rel=1e-3)
+
+
+def test_relative_half_width():
+    # mean 2, standard deviation 1, t(0.975, 2) = 4.3027
+    assert relative_half_width([1.0, 2.0, 3.0]) == pytest.approx(4.3027 / 3**0.5 / 2, rel=1e-4)
+
+
+def test_relative_half_width_two_samples_is_wide():
+    # With a single degree of freedom the interval is 12.7 standard errors wide
+    assert relative_half_width([1.0, 1.1]) > 0.4
+
+
+def test_relative_half_width_constant_samples():
+    assert relative_half_width([5.0, 5.0, 5.0]) == 0
+
+
+@pytest.mark.parametrize("samples", [[], [1.0], [-1.0, 0.0, 1.0]])
+def test_relative_half_width_undefined(samples):
+    assert relative_half_width(samples) is None
@@ -0,0 +1,93 @@
+import click
+import pytest
+
+from microbenchmark import SweepSeries, case_throughput, parse_sweep_param
+
+
+def measure(series: SweepSeries, concurrency: int, curve):
+    """Record the throughput of the simulated benchmark at a concurrency, as `study sweep` does"""
+    series.benchmarks[concurrency] = series.benchmark_name(concurrency)
+    series.points[concurrency] = {"AddObject": curve(concurrency)}
+
+
+def sweep(curve, max_concurrency=256, min_gain=0.05, refine_rounds=3) -> SweepSeries:
+    """Doubling then refinement rounds of `study sweep` for a single series"""
+    series = SweepSeries(config="redis.json", params={"ObjectSizeBytes": 1024})
+    concurrency = 1
+    while concurrency <= max_concurrency and series.doubling:
+        measure(series, concurrency, curve)
+        series.doubling = series.next_doubling(concurrency, min_gain)
+        concurrency *= 2
+    for _ in range(refine_rounds):
+        points = sorted(c for c in series.refinements() if 1 <= c <= max_concurrency)
+        if not points:
+            break
+        for c in points:
+            measure(series, c, curve)
+    return series
+
+
+def peak_at(knee: int):
+    """Throughput rising linearly up to `knee`, then falling"""
+    return lambda c: 1000.0 * c if c <= knee else 1000.0 * knee * knee / c
+
+
+def test_doubling_stops_once_throughput_stops_growing():
+    series = sweep(peak_at(12), refine_rounds=0)
+    # 16 still gains over 8 past the peak at 12, 32 does not: the doubling stops there
+    assert sorted(series.points) == [1, 2, 4, 8, 16, 32]
+
+
+def test_refinement_bisects_towards_the_knee():
+    series = sweep(peak_at(12))
+    # Around 16 (12 and 24), then around 12 (10 and 14), then 11 and 13
+    assert sorted(series.points) == [1, 2, 4, 8, 10, 11, 12, 13, 14, 16, 24, 32]
+    assert series.saturation() == {"AddObject": (12, 12000.0)}
+
+
+def test_doubling_reaches_the_maximum_without_saturation():
+    series = sweep(lambda c: 1000.0 * c, max_concurrency=64, refine_rounds=0)
+    assert sorted(series.points) == [1, 2, 4, 8, 16, 32, 64]
+
+
+def test_next_doubling_needs_a_gain_for_any_method():
+    series = SweepSeries(config="sqs.json", params={})
+    series.points = {1: {"Push": 100.0, "Pull": 100.0}, 2: {"Push": 104.0, "Pull": 150.0}}
+    assert series.next_doubling(2, 0.05)
+    series.points[2]["Pull"] = 104.0
+    assert not series.next_doubling(2, 0.05)
+    # A failed point stops the series
+    assert not series.next_doubling(4, 0.05)
+
+
+def test_refinements_skip_tested_concurrencies():
+    series = SweepSeries(config="redis.json", params={})
+    for c, t in {4: 10.0, 8: 20.0, 16: 15.0}.items():
+        series.points[c] = {"AddObject": t}
+        series.benchmarks[c] = series.benchmark_name(c)
+    assert series.refinements() == {6, 12}
+    series.benchmarks[6] = series.benchmark_name(6)
+    assert series.refinements() == {12}
+
+
+def test_case_throughput():
+    case = {
+        "params": {"NumConcurrentRunners": "4", "NumObjectsPerRunner": "10", "ObjectSizeBytes": "1024"},
+        "measurements": [
+            {"stage": "WorkloadActual", "ops": 1, "ns": 5e9},
+            {"stage": "WorkloadResult", "ops": 1, "ns": 1e9},
+            {"stage": "WorkloadResult", "ops": 1, "ns": 3e9},
+        ],
+    }
+    # 40 objects in 2 seconds on average, WorkloadResult iterations taking precedence
+    assert case_throughput(case) == pytest.approx(20.0)
+    assert case_throughput({"params": {}, "measurements": []}) is None
+
+
+def test_parse_sweep_param():
+    assert parse_sweep_param("ObjectSizeBytes=1024,65536") == ("ObjectSizeBytes", [1024, 65536])
+    assert parse_sweep_param("TransferParameters=1:2,3:4") == ("TransferParameters", [[1, 2], [3, 4]])
+    with pytest.raises(click.BadParameter):
+        parse_sweep_param("ObjectSizeBytes")
+    with pytest.raises(click.BadParameter):
+        parse_sweep_param("ObjectSizeBytes=big")